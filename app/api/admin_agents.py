@@ -1,14 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from app.db.async_session import run_db
 from app.db.session import get_db
 from app.models.agent import Agent
-from app.api.deps import get_admin_from_token
-from app.core.security import hash_password
+from app.api.deps import get_admin_from_token, invalidate_principal
+from app.core.ids import format_agent_id, parse_agent_id
+from app.core.lead_routing import routing_engine
+from app.core.search_index import search_service
+from app.core.security import PasswordPoolBusy, hash_password_async
 from app.schemas.agent import AgentCreateRequest, AgentUpdateRequest, AgentRoutingRequest
 
 router = APIRouter(prefix="/api/admin", tags=["Admin - Agents"])
 
+SEARCH_MAX_AGENTS = 500
+
+
+def admin_agent_view(a) -> dict:
+    return {
+        "id": format_agent_id(a.id),
+        "agentName": a.agent_name,
+        "agencyName": a.agency_name,
+        "email": a.email,
+        "phone": a.phone or "",
+        "specialization": a.specialization or "",
+        "status": a.status or "active",
+        "routingEnabled": a.routing_enabled,
+        "createdAt": a.created_at.isoformat() if a.created_at else None,
+    }
+
 
 @router.get("/agents")
 def list_agents(
@@ -21,42 +41,39 @@ def list_agents(
     if status:
         q = q.filter(Agent.status == status)
     if search:
-        s = f"%{search}%"
-        q = q.filter(
-            (Agent.agent_name.ilike(s)) | (Agent.agency_name.ilike(s))
-        )
+        # Search index (name / agency / specialization / email / phone) — ranked order hata kar list wala order
+        _, hits, _ = search_service.search_agents(db, search.strip(), limit=SEARCH_MAX_AGENTS)
+        q = q.filter(Agent.id.in_([agent_id for agent_id, _ in hits]))
     agents = q.order_by(Agent.created_at.desc()).all()
-    return {
-        "agents": [
-            {
-                "id": f"A{a.id}",
-                "agentName": a.agent_name,
-                "agencyName": a.agency_name,
-                "email": a.email,
-                "phone": a.phone or "",
-                "specialization": a.specialization or "",
-                "status": a.status or "active",
-                "routingEnabled": a.routing_enabled,
-                "createdAt": a.created_at.isoformat() if a.created_at else None,
-            }
-            for a in agents
-        ]
-    }
+    return {"agents": [admin_agent_view(a) for a in agents]}
+
+
+async def _hash_password(password: str) -> str:
+    """bcrypt password pool pe (threadpool worker block nahi hota); queue full → 503."""
+    try:
+        return await hash_password_async(password)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=503, detail="Password hashing busy, try again shortly", headers={"Retry-After": "1"}
+        )
 
 
 @router.post("/agents")
-def create_agent(
+async def create_agent(
     data: AgentCreateRequest,
-    db: Session = Depends(get_db),
     admin=Depends(get_admin_from_token),
 ):
+    return await run_db(_create_agent, data, await _hash_password(data.password))
+
+
+def _create_agent(db: Session, data: AgentCreateRequest, password_hash: str) -> dict:
     if db.query(Agent).filter(Agent.email == data.email).first():
         raise HTTPException(status_code=400, detail="Email already registered")
     agent = Agent(
         agent_name=data.agent_name,
         agency_name=data.agency_name,
         email=data.email,
-        password_hash=hash_password(data.password),
+        password_hash=password_hash,
         phone=data.phone or None,
         specialization=data.specialization,
         status=data.status or "active",
@@ -65,10 +82,11 @@ def create_agent(
     db.add(agent)
     db.commit()
     db.refresh(agent)
+    routing_engine.invalidate()
     return {
         "success": True,
         "agent": {
-            "id": f"A{agent.id}",
+            "id": format_agent_id(agent.id),
             "agentName": agent.agent_name,
             "agencyName": agent.agency_name,
             "phone": agent.phone or "",
@@ -80,13 +98,19 @@ def create_agent(
 
 
 @router.patch("/agents/{agent_id}")
-def update_agent(
+async def update_agent(
     agent_id: str,
     data: AgentUpdateRequest,
-    db: Session = Depends(get_db),
     admin=Depends(get_admin_from_token),
 ):
-    aid = int(agent_id.replace("A", "")) if isinstance(agent_id, str) and agent_id.startswith("A") else int(agent_id)
+    password_hash = None
+    if data.password is not None and len(data.password) >= 6:
+        password_hash = await _hash_password(data.password)
+    return await run_db(_update_agent, agent_id, data, password_hash)
+
+
+def _update_agent(db: Session, agent_id: str, data: AgentUpdateRequest, password_hash: str | None) -> dict:
+    aid = parse_agent_id(agent_id)
     agent = db.query(Agent).filter(Agent.id == aid).first()
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
@@ -99,8 +123,8 @@ def update_agent(
         if existing:
             raise HTTPException(status_code=400, detail="Email already in use")
         agent.email = data.email
-    if data.password is not None and len(data.password) >= 6:
-        agent.password_hash = hash_password(data.password)
+    if password_hash is not None:
+        agent.password_hash = password_hash
     if data.phone is not None:
         agent.phone = data.phone
     if data.specialization is not None:
@@ -109,7 +133,9 @@ def update_agent(
         agent.status = data.status
     db.commit()
     db.refresh(agent)
-    return {"success": True, "agent": {"id": f"A{agent.id}", "agentName": agent.agent_name}}
+    invalidate_principal("partner", agent.id)  # suspend/update turant lage
+    routing_engine.invalidate()
+    return {"success": True, "agent": {"id": format_agent_id(agent.id), "agentName": agent.agent_name}}
 
 
 @router.delete("/agents/{agent_id}")
@@ -118,12 +144,15 @@ def delete_agent(
     db: Session = Depends(get_db),
     admin=Depends(get_admin_from_token),
 ):
-    aid = int(agent_id.replace("A", "")) if isinstance(agent_id, str) and agent_id.startswith("A") else int(agent_id)
+    aid = parse_agent_id(agent_id)
     agent = db.query(Agent).filter(Agent.id == aid).first()
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
+    deleted_id = agent.id
     db.delete(agent)
     db.commit()
+    invalidate_principal("partner", deleted_id)
+    routing_engine.invalidate()
     return {"success": True, "message": "Agent deleted"}
 
 
@@ -134,11 +163,13 @@ def toggle_agent_routing(
     db: Session = Depends(get_db),
     admin=Depends(get_admin_from_token),
 ):
-    aid = int(agent_id.replace("A", "")) if isinstance(agent_id, str) and agent_id.startswith("A") else int(agent_id)
+    aid = parse_agent_id(agent_id)
     agent = db.query(Agent).filter(Agent.id == aid).first()
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     agent.routing_enabled = data.active
     db.commit()
     db.refresh(agent)
-    return {"success": True, "agent": {"id": f"A{agent.id}", "routingEnabled": agent.routing_enabled}}
+    invalidate_principal("partner", agent.id)
+    routing_engine.invalidate()
+    return {"success": True, "agent": {"id": format_agent_id(agent.id), "routingEnabled": agent.routing_enabled}}
@@ -0,0 +1,144 @@
+"""Admin analytics dashboard — lead funnel, agent performance, time series.
+
+Sab numbers app.core.analytics ke `lead_stats` rollups se (leads table scan nahi); range `from` / `to`
+(YYYY-MM-DD, dono inclusive, UTC din), default pichle 30 din.
+"""
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from app.api.admin_leads import parse_date_param
+from app.api.deps import get_admin_from_token
+from app.core import analytics
+from app.core.ids import format_agent_id
+from app.db.replicas import read_session, request_pin_key
+from app.models.agent import Agent
+
+router = APIRouter(prefix="/api/admin/analytics", tags=["Admin - Analytics"])
+
+ANALYTICS_DEFAULT_DAYS = 30
+_MAX_POINTS = 400  # series mein buckets (day bucket pe ~13 mahine)
+
+
+def _range(from_date: str | None, to_date: str | None) -> tuple[date, date]:
+    end = parse_date_param(to_date, "to")
+    end = end.date() if end else datetime.now(timezone.utc).date()
+    start = parse_date_param(from_date, "from")
+    start = start.date() if start else end - timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="'from' must be on or before 'to'")
+    return start, end
+
+
+def _rate(n: int, d: int) -> float | None:
+    return round(n / d, 4) if d else None
+
+
+@router.get("/funnel")
+def funnel(
+    request: Request,
+    admin=Depends(get_admin_from_token),
+    from_date: str | None = Query(None, alias="from"),
+    to_date: str | None = Query(None, alias="to"),
+):
+    """created → assigned → accepted → site_visit → closed — har stage distinct leads (range mein pehli baar
+    pahunche), conversion pichli stage se aur created se. `reassigned` = dobara assignments (volume, funnel se bahar)."""
+    start, end = _range(from_date, to_date)
+    db = read_session(request_pin_key(request))
+    try:
+        t = analytics.totals(db, start, end)
+        by_source = analytics.totals(db, start, end, metrics=("created",), by="source")["created"]
+    finally:
+        db.close()
+    stages = [("created", "created"), ("assigned", "assigned"), ("accepted", "accepted"),
+              ("site_visit", "siteVisit"), ("closed", "closed")]
+    out = []
+    for i, (metric, key) in enumerate(stages):
+        out.append({
+            "stage": key,
+            "count": t[metric],
+            "fromPrevious": _rate(t[metric], t[stages[i - 1][0]]) if i else None,
+            "fromCreated": _rate(t[metric], t["created"]),
+        })
+    return {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "funnel": out,
+        "reassigned": t["reassigned"],
+        "rejected": t["rejected"],
+        "expired": t["expired"],
+        "bySource": dict(sorted(by_source.items(), key=lambda kv: -kv[1])),
+    }
+
+
+@router.get("/agents")
+def agent_performance(
+    request: Request,
+    admin=Depends(get_admin_from_token),
+    from_date: str | None = Query(None, alias="from"),
+    to_date: str | None = Query(None, alias="to"),
+):
+    """Har agent: assigned (us ko mile leads — pehla assignment + reassigned) / accepted / rejected / expired /
+    siteVisit / closed + accept / reject / expiry / close rates (assigned pe). Assigned DESC."""
+    start, end = _range(from_date, to_date)
+    metrics = ("assigned", "reassigned", "accepted", "rejected", "expired", "site_visit", "closed")
+    db = read_session(request_pin_key(request))
+    try:
+        t = analytics.totals(db, start, end, metrics=metrics, by="agent")
+        agent_ids = {a for m in metrics for a in t[m]} - {""}
+        names = dict(db.query(Agent.id, Agent.agent_name).filter(Agent.id.in_(agent_ids)).all()) if agent_ids else {}
+    finally:
+        db.close()
+    agents = []
+    for agent_id in agent_ids:
+        c = {m: t[m].get(agent_id, 0) for m in metrics}
+        received = c["assigned"] + c["reassigned"]
+        agents.append({
+            "agentId": format_agent_id(agent_id),
+            "agentName": names.get(agent_id),
+            "assigned": received,
+            "reassigned": c["reassigned"],
+            "accepted": c["accepted"],
+            "rejected": c["rejected"],
+            "expired": c["expired"],
+            "siteVisit": c["site_visit"],
+            "closed": c["closed"],
+            "acceptRate": _rate(c["accepted"], received),
+            "rejectRate": _rate(c["rejected"], received),
+            "expiryRate": _rate(c["expired"], received),
+            "closeRate": _rate(c["closed"], received),
+        })
+    agents.sort(key=lambda a: (-a["assigned"], a["agentId"]))
+    return {"from": start.isoformat(), "to": end.isoformat(), "agents": agents}
+
+
+@router.get("/series")
+def series(
+    request: Request,
+    admin=Depends(get_admin_from_token),
+    metric: str = Query("created"),
+    bucket: str = Query("day"),
+    by: str | None = Query(None),
+    from_date: str | None = Query(None, alias="from"),
+    to_date: str | None = Query(None, alias="to"),
+):
+    """?metric=created&bucket=day|week|month&by=source|agent — khali buckets 0 ke saath."""
+    if metric not in analytics.METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of {', '.join(analytics.METRICS)}")
+    if bucket not in ("day", "week", "month"):
+        raise HTTPException(status_code=400, detail="bucket must be day, week or month")
+    if by not in (None, "source", "agent"):
+        raise HTTPException(status_code=400, detail="by must be source or agent")
+    start, end = _range(from_date, to_date)
+    days = (end - start).days + 1
+    if days / {"day": 1, "week": 7, "month": 28}[bucket] > _MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"Range too long for bucket={bucket} (max {_MAX_POINTS} points)")
+    db = read_session(request_pin_key(request))
+    try:
+        points = analytics.series(db, metric, start, end, bucket=bucket, by=by)
+    finally:
+        db.close()
+    if by == "agent":
+        for p in points:
+            p["by"] = {format_agent_id(a) if a else "": n for a, n in p["by"].items()}
+    return {"metric": metric, "bucket": bucket, "from": start.isoformat(), "to": end.isoformat(), "series": points}
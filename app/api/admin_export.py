@@ -0,0 +1,141 @@
+"""Bulk export — leads (aur chahiye to har lead ka chat transcript) CSV / NDJSON stream.
+
+Rows DB se EXPORT_BATCH_SIZE ke keyset batches mein padhe jate hain aur turant response mein likhe jate hain —
+memory table size se independent. Har batch ke baad read transaction khatam (connection pool mein wapas),
+to slow download poori der ek DB connection nahi pakde rehta. Filters wahi jo GET /api/admin/leads ke.
+"""
+import csv
+import io
+import os
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
+
+from app.api.admin_leads import admin_lead_view, filter_leads, lead_rows_query, parse_date_param
+from app.api.deps import get_admin_from_token
+from app.core.responses import dumps
+from app.db.replicas import read_session, request_pin_key
+from app.models.chat_message import ChatMessage
+from app.models.lead import Lead
+
+router = APIRouter(prefix="/api/admin", tags=["Admin - Export"])
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+_CSV_FIELDS = [
+    "id", "userName", "name", "phone", "propertyInterest", "propertyId", "propertyLink", "budget", "leadScore",
+    "assignedAgent", "assignedAgentId", "assignedAt", "status", "aiSummary", "createdAt",
+]
+
+
+def _lead_batches(db, status, agent_id, from_date, to_date):
+    """(Lead, agent_id, agent_name) rows — created_at DESC, id DESC keyset batches (list_leads wala order)."""
+    q = filter_leads(lead_rows_query(db), status, agent_id, from_date, to_date)
+    after = None
+    while True:
+        page = q
+        if after:
+            page = page.filter(or_(
+                Lead.created_at < after[0],
+                and_(Lead.created_at == after[0], Lead.id < after[1]),
+            ))
+        rows = page.order_by(Lead.created_at.desc(), Lead.id.desc()).limit(EXPORT_BATCH_SIZE).all()
+        if not rows:
+            return
+        after = (rows[-1][0].created_at, rows[-1][0].id)
+        yield rows
+        if len(rows) < EXPORT_BATCH_SIZE:
+            return
+
+
+def _transcripts(db, thread_ids: list[str]) -> dict[str, list[dict]]:
+    """Batch ke threads ke messages ek query mein (ix_chat_messages_thread_id_id)."""
+    if not thread_ids:
+        return {}
+    out: dict[str, list[dict]] = {}
+    rows = (
+        db.query(ChatMessage.thread_id, ChatMessage.role, ChatMessage.content, ChatMessage.created_at)
+        .filter(ChatMessage.thread_id.in_(thread_ids))
+        .order_by(ChatMessage.thread_id, ChatMessage.id)
+        .all()
+    )
+    for thread_id, role, content, created_at in rows:
+        out.setdefault(thread_id, []).append({
+            "role": role,
+            "content": content,
+            "createdAt": created_at.isoformat() if created_at else None,
+        })
+    return out
+
+
+def _export_rows(pin_key, status, agent_id, from_date, to_date, transcripts: bool):
+    """Lead dicts stream — generator khatam / client disconnect pe session close."""
+    db = read_session(pin_key)
+    try:
+        for rows in _lead_batches(db, status, agent_id, from_date, to_date):
+            messages = _transcripts(db, list({L.thread_id for L, _, _ in rows if L.thread_id})) if transcripts else {}
+            db.expunge_all()  # rollback pe rows expire na hon (warna har attribute pe reload)
+            db.rollback()  # read transaction khatam — connection agle batch tak pool mein
+            for L, agent_id_, agent_name in rows:
+                item = admin_lead_view(L, agent_id_, agent_name)
+                if transcripts:
+                    item["threadId"] = L.thread_id
+                    item["transcript"] = messages.get(L.thread_id, []) if L.thread_id else []
+                yield item
+    finally:
+        db.close()
+
+
+def _csv_stream(items, transcripts: bool):
+    fields = _CSV_FIELDS + (["threadId", "transcript"] if transcripts else [])
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=fields, extrasaction="ignore")
+    buf.write("\ufeff")  # Excel ko UTF-8 (Urdu names) batane ke liye BOM
+    writer.writeheader()
+    count = 0
+    for item in items:
+        if transcripts:
+            item["transcript"] = "\n".join(f"{m['role']}: {m['content']}" for m in item["transcript"])
+        writer.writerow(item)
+        count += 1
+        if count % 100 == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def _ndjson_stream(items):
+    for item in items:
+        yield dumps(item) + b"\n"
+
+
+@router.get("/leads/export")
+def export_leads(
+    request: Request,
+    admin=Depends(get_admin_from_token),
+    format: str = Query("csv"),
+    transcripts: bool = Query(False),
+    status: str | None = Query(None),
+    agent_id: str | None = Query(None, alias="agentId"),
+    from_date: str | None = Query(None, alias="from"),
+    to_date: str | None = Query(None, alias="to"),
+):
+    """?format=csv|ndjson&transcripts=true — poori filtered lead table, rows jaise padhe waise bheje."""
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+    # Galat date ka 400 stream shuru hone se pehle
+    parse_date_param(from_date, "from")
+    parse_date_param(to_date, "to")
+    items = _export_rows(request_pin_key(request), status, agent_id, from_date, to_date, transcripts)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    if format == "csv":
+        body, media_type = _csv_stream(items, transcripts), "text/csv; charset=utf-8"
+    else:
+        body, media_type = _ndjson_stream(items), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="leads-{stamp}.{format}"'},
+    )
@@ -1,91 +1,375 @@
-from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, Query
+import base64
+import os
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
+from app.db.replicas import pin_primary, read_session, request_pin_key
 from app.models.lead import Lead
+from app.models.lead_event import LeadEvent
 from app.models.agent import Agent
 from app.api.deps import get_admin_from_token
-from app.schemas.lead import LeadRerouteRequest
+from app.core.lead_dedupe import MERGED_STATUS
+from app.core.lead_events import emit, emit_many, event_row, event_view
+from app.core.lead_expiry import expiry_sweeper
+from app.api.admin_settings import get_lead_expire_minutes
+from app.core.ids import format_agent_id, parse_agent_id, resolve_lead_id, resolve_lead_ids
+from app.core.lead_routing import routing_engine
+from app.core.lead_stream import lead_stream, partner_lead_view, publish_assigned
+from app.core.lead_versions import current_version, etag_matches, etag_needs_db, list_etag, stamp_bulk
+from app.schemas.lead import LeadBulkRequest, LeadRerouteRequest
 
 router = APIRouter(prefix="/api/admin", tags=["Admin - Leads"])
 
 
+ADMIN_LEADS_PAGE_SIZE = int(os.getenv("ADMIN_LEADS_PAGE_SIZE", "100"))
+ADMIN_LEADS_MAX_PAGE_SIZE = 1000
+ADMIN_LEADS_COUNT_CAP = int(os.getenv("ADMIN_LEADS_COUNT_CAP", "10000"))  # is se upar total "10000+" (estimate)
+
+
+def parse_date_param(value: str | None, name: str) -> datetime | None:
+    """`from` / `to` query — "2025-01-31" ya ISO datetime (pehle raw string DB se compare hoti thi)."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid '{name}' date (use YYYY-MM-DD or ISO datetime)")
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)  # DB created_at naive UTC
+    return dt
+
+
+def filter_leads(
+    q, status: str | None, agent_id: str | None, from_date: str | None, to_date: str | None, include_merged: bool = False
+):
+    """list_leads aur export dono ke filters — same semantics. Status na ho to merged duplicates chhupe."""
+    if status:
+        q = q.filter(Lead.status == status)
+    elif not include_merged:
+        q = q.filter(or_(Lead.status.is_(None), Lead.status != MERGED_STATUS))
+    aid_val = parse_agent_id(agent_id)
+    if aid_val:
+        q = q.filter(Lead.assigned_agent_id == aid_val)
+    start = parse_date_param(from_date, "from")
+    end = parse_date_param(to_date, "to")
+    if start:
+        q = q.filter(Lead.created_at >= start)
+    if end and len(to_date.strip()) == 10:
+        q = q.filter(Lead.created_at < end + timedelta(days=1))  # date-only `to` — poora din include
+    elif end:
+        q = q.filter(Lead.created_at <= end)
+    return q
+
+
+def lead_rows_query(db: Session):
+    """Lead + agent name ek hi query mein (har lead pe alag Agent lookup nahi)."""
+    return db.query(Lead, Agent.id, Agent.agent_name).outerjoin(Agent, Agent.id == Lead.assigned_agent_id)
+
+
+def admin_lead_view(L, agent_id: str | None, agent_name: str | None) -> dict:
+    return {
+        "id": L.id,
+        "userName": L.user_name or L.name or "",
+        "name": L.name or L.user_name or "",
+        "phone": L.phone or "",
+        "propertyInterest": L.property_interest or "",
+        "propertyId": L.property_id or "",
+        "propertyLink": L.property_link or "",
+        "budget": L.budget or "",
+        "leadScore": L.lead_score or 0,
+        "assignedAgent": agent_name or "",
+        "assignedAgentId": agent_id,
+        "assignedAt": L.assigned_at.isoformat() if L.assigned_at else None,
+        "status": L.status or "new",
+        "aiSummary": L.ai_summary or "",
+        "createdAt": L.created_at.isoformat() if L.created_at else None,
+    }
+
+
+def encode_cursor(created_at: datetime | None, lead_id: str) -> str:
+    raw = f"{created_at.isoformat() if created_at else ''}|{lead_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created, lead_id = raw.split("|", 1)
+        return datetime.fromisoformat(created), lead_id
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/leads")
 def list_leads(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
     admin=Depends(get_admin_from_token),
     status: str | None = Query(None),
     agent_id: str | None = Query(None, alias="agentId"),
     from_date: str | None = Query(None, alias="from"),
     to_date: str | None = Query(None, alias="to"),
+    limit: int = Query(ADMIN_LEADS_PAGE_SIZE, ge=1, le=ADMIN_LEADS_MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    since: int | None = Query(None, ge=0),
 ):
-    q = db.query(Lead)
-    if status:
-        q = q.filter(Lead.status == status)
-    if agent_id:
-        sid = str(agent_id)
-        aid_val = sid[1:] if sid.startswith("A") else sid  # Strip leading "A" to match DB value
-        q = q.filter(Lead.assigned_agent_id == aid_val)
-    if from_date:
-        q = q.filter(Lead.created_at >= from_date)
-    if to_date:
-        q = q.filter(Lead.created_at <= to_date)
-    leads = q.order_by(Lead.created_at.desc()).all()
-    out = []
-    for L in leads:
-        agent = db.query(Agent).filter(Agent.id == L.assigned_agent_id).first() if L.assigned_agent_id else None
-        out.append({
-            "id": L.id if isinstance(L.id, str) else f"L{L.id}",
-            "userName": L.user_name or L.name or "",
-            "name": L.name or L.user_name or "",
-            "phone": L.phone or "",
-            "propertyInterest": L.property_interest or "",
-            "propertyId": L.property_id or "",
-            "propertyLink": L.property_link or "",
-            "budget": L.budget or "",
-            "leadScore": L.lead_score or 0,
-            "assignedAgent": agent.agent_name if agent else "",
-            "assignedAgentId": agent.id if agent else None,
-            "assignedAt": L.assigned_at.isoformat() if L.assigned_at else None,
-            "status": L.status or "new",
-            "aiSummary": L.ai_summary or "",
-            "createdAt": L.created_at.isoformat() if L.created_at else None,
-        })
-    return {"leads": out}
+    """Keyset pagination (created_at DESC, id DESC) — `nextCursor` agla page; 100k leads pe bhi har page constant.
+    `total` ADMIN_LEADS_COUNT_CAP tak exact, us se upar estimate (`totalExact: false`).
+    ETag / If-None-Match → 304 (shared cache pe bina DB session ke, memory pe ek version read).
+    `since=<version>`: badle leads (har ek pe `matches` — filter se bahar gaya to list se hatao)."""
+    db = read_session(request_pin_key(request)) if etag_needs_db() else None
+    etag = list_etag(None, str(request.query_params), current_version(db) if db is not None else None)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        if db is not None:
+            db.close()
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    db = db or read_session(request_pin_key(request))
+    try:
+        if since is not None:
+            return _list_changed_leads(db, status, agent_id, from_date, to_date, since, limit)
+        return _list_leads(db, status, agent_id, from_date, to_date, limit, cursor)
+    finally:
+        db.close()
+
+
+def _list_leads(db: Session, status, agent_id, from_date, to_date, limit: int, cursor: str | None) -> dict:
+    version = current_version(db)  # leads se pehle, usi read transaction mein
+    q = filter_leads(lead_rows_query(db), status, agent_id, from_date, to_date)
+    total = filter_leads(db.query(Lead.id), status, agent_id, from_date, to_date).limit(ADMIN_LEADS_COUNT_CAP + 1).count()
+    if cursor:
+        after_created, after_id = decode_cursor(cursor)
+        q = q.filter(or_(
+            Lead.created_at < after_created,
+            and_(Lead.created_at == after_created, Lead.id < after_id),
+        ))
+    rows = q.order_by(Lead.created_at.desc(), Lead.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "leads": [admin_lead_view(*row) for row in rows],
+        "nextCursor": encode_cursor(rows[-1][0].created_at, rows[-1][0].id) if has_more else None,
+        "total": min(total, ADMIN_LEADS_COUNT_CAP),
+        "totalExact": total <= ADMIN_LEADS_COUNT_CAP,
+        "version": version,
+    }
+
+
+def _list_changed_leads(db: Session, status, agent_id, from_date, to_date, since: int, limit: int) -> dict:
+    """Delta — sync_version > since, version order mein. Status/agent filter SQL mein nahi (jo lead filter se
+    nikal gaya woh bhi aana chahiye), har row pe `matches`. Page transaction boundary pe katta hai."""
+    version = current_version(db)
+    if since > version:  # DB restore / reset — client poori list dobara le
+        return {**_list_leads(db, status, agent_id, from_date, to_date, limit, None), "delta": False}
+    q = filter_leads(lead_rows_query(db), None, None, from_date, to_date, include_merged=True).filter(
+        Lead.sync_version > since
+    )
+    rows = q.order_by(Lead.sync_version, Lead.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    if has_more:
+        cut = rows[limit][0].sync_version
+        rows = [r for r in rows if r[0].sync_version < cut]
+        if not rows:  # ek transaction hi limit se bara (bulk sweep) — poora lo
+            rows = q.filter(Lead.sync_version == cut).order_by(Lead.id).all()
+            cut += 1
+        version = cut - 1
+    aid_val = parse_agent_id(agent_id)
+    leads = []
+    for L, agent_id_, agent_name in rows:
+        item = admin_lead_view(L, agent_id_, agent_name)
+        item["matches"] = (L.status == status if status else L.status != MERGED_STATUS) and (not aid_val or L.assigned_agent_id == aid_val)
+        leads.append(item)
+    return {"leads": leads, "version": version, "delta": True, "hasMore": has_more}
+
+
+@router.get("/leads/{lead_id}/events")
+def lead_timeline(
+    lead_id: str,
+    request: Request,
+    admin=Depends(get_admin_from_token),
+    limit: int = Query(200, ge=1, le=1000),
+):
+    """Lead ki history (lead_events outbox) — purane pehle."""
+    db = read_session(request_pin_key(request))
+    try:
+        lead_id = resolve_lead_id(db, lead_id)
+        events = db.query(LeadEvent).filter(LeadEvent.lead_id == lead_id).order_by(LeadEvent.id).limit(limit).all()
+        return {"leadId": lead_id, "events": [event_view(e) for e in events]}
+    finally:
+        db.close()
 
 
 @router.post("/leads/{lead_id}/reroute")
 def reroute_lead(
     lead_id: str,
     data: LeadRerouteRequest,
+    request: Request,
     db: Session = Depends(get_db),
     admin=Depends(get_admin_from_token),
 ):
-    lid = str(lead_id)
-    lead = db.query(Lead).filter(Lead.id == lid).first()
-    if not lead and lid.startswith("L"):
-        lead = db.query(Lead).filter(Lead.id == lid[1:]).first()
+    lead = db.query(Lead).filter(Lead.id == resolve_lead_id(db, lead_id, follow_merged=True)).first()
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
-    aid = data.agent_id
-    if aid is None and data.agentId is not None:
-        sid = str(data.agentId)
-        aid = sid[1:] if sid.startswith("A") else sid  # Strip only leading "A", not all A's
+    aid = parse_agent_id(data.agent_id if data.agent_id is not None else data.agentId)
     if aid is None:
         raise HTTPException(status_code=400, detail="agentId required")
-    agent = db.query(Agent).filter(Agent.id == str(aid)).first()
+    agent = db.query(Agent).filter(Agent.id == aid).first()
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
+    previous_agent = lead.assigned_agent_id
     lead.assigned_agent_id = agent.id
     lead.assigned_at = datetime.now(timezone.utc)
+    emit(db, "assigned", lead.id, agent.id, lead.status, at=lead.assigned_at, previousAgentId=previous_agent, by="admin")
     db.commit()
     db.refresh(lead)
+    if lead.status == "new":  # is worker ke routing loads (cap = pending `new` leads)
+        routing_engine.release(previous_agent)
+        routing_engine.hold(agent.id)
+    expiry_sweeper.schedule(lead.id, lead.assigned_at)
+    if previous_agent and parse_agent_id(previous_agent) != agent.id:
+        lead_stream.publish(previous_agent, "unassigned", leadId=lead.id)
+    publish_assigned(db, lead.id, agent.id)
+    pin_primary(request_pin_key(request))  # admin ki agli list mein reroute turant dikhe
     return {
         "success": True,
         "lead": {
-            "id": lead.id if isinstance(lead.id, str) else f"L{lead.id}",
-            "assignedAgentId": f"A{agent.id}",
+            "id": lead.id,
+            "assignedAgentId": format_agent_id(agent.id),
             "assignedAgent": agent.agent_name,
         },
     }
+
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+_BULK_ACTIONS = ("reroute", "set_status", "unassign")
+_LEAD_STATUSES = ("new", "in_progress", "site_visit", "closed")
+
+
+def _bulk_target_chunks(db: Session, data: LeadBulkRequest, only_new: bool = False):
+    """Target lead ids BULK_CHUNK_SIZE ke chunks mein — id list ya filter (dono hon to intersection).
+    Filter mode id keyset pe chalta hai, to chunk update filter badal de tab bhi aage badhta hai.
+    only_new: sirf `new` leads (auto reroute — routing engine accepted leads assign nahi karta)."""
+    f = data.filter
+    base = db.query(Lead.id, Lead.assigned_agent_id)
+    if only_new:
+        base = base.filter(Lead.status == "new")
+    if data.ids is not None:
+        ids = resolve_lead_ids(db, data.ids, follow_merged=True)
+        for start in range(0, len(ids), BULK_CHUNK_SIZE):
+            q = base.filter(Lead.id.in_(ids[start:start + BULK_CHUNK_SIZE]))
+            if f:
+                q = filter_leads(q, f.status, f.agentId, f.from_date, f.to_date)
+            yield q.all()
+        return
+    q = filter_leads(base, f.status, f.agentId, f.from_date, f.to_date)
+    last = None
+    while True:
+        chunk = (q.filter(Lead.id > last) if last is not None else q).order_by(Lead.id).limit(BULK_CHUNK_SIZE).all()
+        if not chunk:
+            return
+        last = chunk[-1][0]
+        yield chunk
+
+
+@router.post("/leads/bulk")
+def bulk_leads(
+    data: LeadBulkRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    admin=Depends(get_admin_from_token),
+):
+    """Bulk reroute / set_status / unassign — chunked set-based UPDATEs, ek transaction.
+    Single-lead paths wale side effects: partner stream events, expiry schedule, list ETags, routing loads.
+    agentId="auto" sirf `new` leads pe — baaki status wale apne agent ke paas rehte hain."""
+    if data.action not in _BULK_ACTIONS:
+        raise HTTPException(status_code=400, detail=f"action must be one of {', '.join(_BULK_ACTIONS)}")
+    f = data.filter
+    if data.ids is None and not (f and any((f.status, f.agentId, f.from_date, f.to_date))):
+        # Khali filter = poori table — galti se bhi nahi
+        raise HTTPException(status_code=400, detail="ids or a non-empty filter required")
+    values: dict = {}
+    agent = None
+    auto = False
+    if data.action == "reroute":
+        if not data.agentId:
+            raise HTTPException(status_code=400, detail="agentId required")
+        auto = data.agentId == "auto"
+        if auto:
+            values = {"assigned_agent_id": None, "assigned_at": None}
+        else:
+            agent = db.query(Agent).filter(Agent.id == parse_agent_id(data.agentId)).first()
+            if not agent:
+                raise HTTPException(status_code=404, detail="Agent not found")
+            values = {"assigned_agent_id": agent.id, "assigned_at": datetime.now(timezone.utc)}
+    elif data.action == "set_status":
+        if data.status not in _LEAD_STATUSES:
+            raise HTTPException(status_code=400, detail="Invalid status")
+        values = {"status": data.status}
+    else:
+        values = {"assigned_agent_id": None, "assigned_at": None}
+
+    affected: list[tuple[str, str | None]] = []  # (lead_id, pichla agent) — events commit ke baad
+    chunks = 0
+    for chunk in _bulk_target_chunks(db, data, only_new=auto):
+        if not chunk:
+            continue
+        version = stamp_bulk(db, [a for _, a in chunk] + ([agent.id] if agent else []))
+        if data.action == "set_status":
+            previous = dict(db.query(Lead.id, Lead.status).filter(Lead.id.in_([i for i, _ in chunk])))
+        db.query(Lead).filter(Lead.id.in_([i for i, _ in chunk])).update(
+            {**values, "sync_version": version}, synchronize_session=False
+        )
+        if data.action == "set_status":
+            events = [
+                event_row("status_changed", i, a, data.status, previousStatus=previous.get(i), by="admin") for i, a in chunk
+            ]
+        elif agent is not None:
+            events = [
+                event_row("assigned", i, agent.id, at=values["assigned_at"], previousAgentId=a, by="admin") for i, a in chunk
+            ]
+        else:
+            events = [event_row("unassigned", i, a, by="admin") for i, a in chunk]
+        emit_many(db, events)
+        affected.extend(chunk)
+        chunks += 1
+    db.commit()
+
+    if data.action == "set_status":
+        for lead_id, prev in affected:
+            lead_stream.publish(prev, "status_changed", leadId=lead_id, status=data.status)
+    else:
+        for lead_id, prev in affected:
+            if prev and (agent is None or parse_agent_id(prev) != agent.id):
+                lead_stream.publish(prev, "unassigned", leadId=lead_id)
+    if agent is not None:
+        minutes = max(1, get_lead_expire_minutes(db)[0])
+        for start in range(0, len(affected), BULK_CHUNK_SIZE):
+            ids = [i for i, _ in affected[start:start + BULK_CHUNK_SIZE]]
+            for lead in db.query(Lead).filter(Lead.id.in_(ids)):
+                expiry_sweeper.schedule(lead.id, values["assigned_at"])
+                lead_stream.publish(agent.id, "assigned", lead=partner_lead_view(lead, minutes))
+            db.expunge_all()
+    routing_engine.rebuild(db)  # is worker ke agent loads DB se sahi
+    rerouted = 0
+    if auto:
+        # Routing engine har lead ke liye pick karta hai (area queue + load cap), pichla agent skip
+        for start in range(0, len(affected), BULK_CHUNK_SIZE):
+            part = dict(affected[start:start + BULK_CHUNK_SIZE])
+            rows = db.query(Lead.id, Lead.property_interest, Lead.context).filter(Lead.id.in_(list(part))).all()
+            for lead_id, interest, context in rows:
+                exclude = {parse_agent_id(part[lead_id])} if part[lead_id] else None
+                if routing_engine.assign(db, lead_id, " ".join(filter(None, [interest, context])), exclude=exclude):
+                    rerouted += 1
+            db.commit()
+    pin_primary(request_pin_key(request))
+    return {
+        "success": True,
+        "action": data.action,
+        "affected": len(affected),
+        "chunks": chunks,
+        **({"rerouted": rerouted} if auto else {}),
+    }
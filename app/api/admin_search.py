@@ -0,0 +1,73 @@
+"""Admin search — leads (naam, phone, property interest, AI summary) aur agents, ranked + paginated.
+
+Ranking app.core.search_index karta hai (trigram index / MySQL FULLTEXT / index build hone tak LIKE);
+yahan sirf page ke ids ke rows ek query mein, ranked order mein.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from app.api.admin_agents import admin_agent_view
+from app.api.admin_leads import admin_lead_view, lead_rows_query
+from app.api.deps import get_admin_from_token
+from app.core.ids import format_agent_id
+from app.core.search_index import search_service
+from app.db.replicas import read_session, request_pin_key
+from app.models.agent import Agent
+from app.models.lead import Lead
+
+router = APIRouter(prefix="/api/admin", tags=["Admin - Search"])
+
+SEARCH_MAX_LIMIT = 100
+
+
+def _lead_results(db, q: str, limit: int, offset: int) -> tuple[int, list[dict], str]:
+    total, hits, backend = search_service.search_leads(db, q, limit, offset)
+    rows = {row[0].id: row for row in lead_rows_query(db).filter(Lead.id.in_([i for i, _ in hits])).all()} if hits else {}
+    results = [
+        {"type": "lead", "id": lead_id, "score": score, "lead": admin_lead_view(*rows[lead_id])}
+        for lead_id, score in hits
+        if lead_id in rows  # index refresh aur delete ke beech ka gap
+    ]
+    return total, results, backend
+
+
+def _agent_results(db, q: str, limit: int, offset: int) -> tuple[int, list[dict], str]:
+    total, hits, backend = search_service.search_agents(db, q, limit, offset)
+    rows = {a.id: a for a in db.query(Agent).filter(Agent.id.in_([i for i, _ in hits])).all()} if hits else {}
+    results = [
+        {"type": "agent", "id": format_agent_id(agent_id), "score": score, "agent": admin_agent_view(rows[agent_id])}
+        for agent_id, score in hits
+        if agent_id in rows
+    ]
+    return total, results, backend
+
+
+@router.get("/search")
+def search(
+    request: Request,
+    admin=Depends(get_admin_from_token),
+    q: str = Query(..., min_length=1),
+    type: str = Query("all"),
+    limit: int = Query(20, ge=1, le=SEARCH_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+):
+    """?q=ahmed&type=leads|agents|all — score DESC (phir naye pehle). `all` pe dono ke alag totals,
+    page `limit` har type pe."""
+    if type not in ("leads", "agents", "all"):
+        raise HTTPException(status_code=400, detail="type must be leads, agents or all")
+    query = q.strip()
+    out = {"query": query, "results": [], "total": {}}
+    db = read_session(request_pin_key(request))
+    try:
+        if type in ("leads", "all"):
+            total, results, backend = _lead_results(db, query, limit, offset)
+            out["results"] += results
+            out["total"]["leads"] = total
+            out["backend"] = backend
+        if type in ("agents", "all"):
+            total, results, backend = _agent_results(db, query, limit, offset)
+            out["results"] += results
+            out["total"]["agents"] = total
+            out["backend"] = backend
+    finally:
+        db.close()
+    return out
@@ -2,6 +2,7 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.core.settings_provider import settings_provider
 from app.db.session import get_db
 from app.models.admin_settings import AdminSettings
 from app.api.deps import get_admin_from_token
@@ -14,14 +15,15 @@ SETTINGS_KEY_LEAD_EXPIRE = "lead_expire_minutes"
 
 
 def get_lead_expire_minutes(db: Session) -> tuple[int, datetime | None]:
-    """Returns (minutes, updated_at). Default 5, None for updated_at if never set."""
-    row = db.query(AdminSettings).filter(AdminSettings.key == SETTINGS_KEY_LEAD_EXPIRE).first()
-    if not row or row.value is None:
-        return DEFAULT_LEAD_EXPIRE_MINUTES, None
+    """Returns (minutes, updated_at). Default 5, None for updated_at if never set.
+    Settings provider se (memory) — save_settings ke baad sab workers reload karte hain."""
+    value, updated_at = settings_provider.admin_value(SETTINGS_KEY_LEAD_EXPIRE, db)
+    if value is None:
+        return DEFAULT_LEAD_EXPIRE_MINUTES, updated_at
     try:
-        return int(row.value), row.updated_at
+        return int(value), updated_at
     except ValueError:
-        return DEFAULT_LEAD_EXPIRE_MINUTES, row.updated_at
+        return DEFAULT_LEAD_EXPIRE_MINUTES, updated_at
 
 
 @router.get("/settings")
@@ -57,6 +59,7 @@ def save_settings(
         db.add(row)
     db.commit()
     db.refresh(row)
+    settings_provider.notify_changed()
     return {
         "success": True,
         "settings": {
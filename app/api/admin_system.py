@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_admin_from_token
+from app.core import startup_profile
+from app.core.cache import get_cache
+from app.core.lead_expiry import expiry_sweeper
+from app.core.lead_events import lead_events
+from app.core.lead_ingest import lead_ingest
+from app.core.lead_routing import routing_engine
+from app.core.lead_scoring import lead_scorer
+from app.core.lead_stream import lead_stream
+from app.core.search_index import search_service
+from app.core.settings_provider import settings_provider
+from app.db.pool import pool_stats
+from app.db.replicas import session_router
+
+router = APIRouter(prefix="/api/admin/system", tags=["Admin - System"])
+
+
+@router.get("/db-pool")
+def get_db_pool_stats(admin=Depends(get_admin_from_token)):
+    """Pool metrics — checked out, waits, timeouts (per engine)."""
+    return {"pools": pool_stats()}
+
+
+@router.get("/replicas")
+def get_replica_status(admin=Depends(get_admin_from_token)):
+    """Replica health + lag — unhealthy replicas se reads primary pe jati hain."""
+    return session_router.status()
+
+
+@router.get("/startup")
+def get_startup_profile(admin=Depends(get_admin_from_token)):
+    """Import/init time per module — LPG_STARTUP_PROFILE=1 ke saath process start ho to."""
+    return startup_profile.report()
+
+
+@router.get("/cache")
+def get_cache_stats(admin=Depends(get_admin_from_token)):
+    """Cache backend, hit/miss counters, namespace versions aur settings snapshot (is worker ke)."""
+    return {**get_cache().stats(), "settings": settings_provider.status()}
+
+
+@router.get("/lead-expiry")
+def get_lead_expiry_status(admin=Depends(get_admin_from_token)):
+    """Expiry sweeper (is worker ka) — heap size, agli expiry, sweeps/unlinked counters."""
+    return expiry_sweeper.status()
+
+
+@router.get("/routing")
+def get_routing_status(admin=Depends(get_admin_from_token)):
+    """Routing engine (is worker ka) — area queues, agent loads, assigned/unroutable counters."""
+    return routing_engine.status()
+
+
+@router.get("/lead-stream")
+def get_lead_stream_status(admin=Depends(get_admin_from_token)):
+    """Partner SSE stream (is worker ka) — connected agents, ring buffer, published counter."""
+    return lead_stream.status()
+
+
+@router.get("/search")
+def get_search_status(admin=Depends(get_admin_from_token)):
+    """Admin search index (is worker ka) — backend, ready/building, docs, tombstones, indexed lead version."""
+    return search_service.status()
+
+
+@router.get("/lead-ingest")
+def get_lead_ingest_status(admin=Depends(get_admin_from_token)):
+    """Public lead ingest journal — backlog (sab workers ka), is worker ke batch size / flush latency counters."""
+    return lead_ingest.status()
+
+
+@router.get("/lead-scoring")
+def get_lead_scoring_status(admin=Depends(get_admin_from_token)):
+    """Lead scoring (is worker ka) — interval, runs, pichle run ke scored / updated / leads per second."""
+    return lead_scorer.status()
+
+
+@router.get("/lead-events")
+def get_lead_events_status(admin=Depends(get_admin_from_token)):
+    """Lead events consumers (is worker ke) — har subscriber ki position, delivered, failures."""
+    return lead_events.status()
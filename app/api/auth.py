@@ -1,20 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Request
 
-from app.db.session import get_db
+from app.db.async_session import run_db
 from app.models.admin import Admin
 from app.models.agent import Agent
-from app.core.security import verify_password, create_token
+from app.core import login_throttle
+from app.core.ids import format_agent_id
+from app.core.security import (
+    PasswordPoolBusy,
+    create_token,
+    hash_password_async,
+    needs_rehash,
+    verify_password_async,
+)
 from app.schemas.auth import AdminLoginRequest, PartnerLoginRequest
 
 router = APIRouter(prefix="/api/auth", tags=["Auth"])
 
 
-@router.post("/admin/login")
-def admin_login(data: AdminLoginRequest, db: Session = Depends(get_db)):
-    admin = db.query(Admin).filter(Admin.email == data.email).first()
-    if not admin or not verify_password(data.password, admin.password_hash):
+def _find_by_email(db, model, email: str):
+    return db.query(model).filter(model.email == email).first()
+
+
+def _update_password_hash(db, model, row_id, password_hash: str) -> None:
+    db.query(model).filter(model.id == row_id).update({"password_hash": password_hash}, synchronize_session=False)
+    db.commit()
+
+
+async def _authenticate(request: Request, model, email: str, password: str):
+    """Throttle check → row lookup → bcrypt (process pool) → cost badla ho to rehash. Fail pe 401."""
+    ip = login_throttle.client_ip(request)
+    login_throttle.check(ip)
+    user = await run_db(_find_by_email, model, email)
+    try:
+        ok = bool(user) and await verify_password_async(password, user.password_hash)
+    except PasswordPoolBusy:
+        raise HTTPException(status_code=503, detail="Login busy, try again shortly")
+    if not ok:
+        login_throttle.record_failure(ip)
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    login_throttle.reset(ip)
+    if needs_rehash(user.password_hash):
+        try:
+            new_hash = await hash_password_async(password)
+            await run_db(_update_password_hash, model, user.id, new_hash)
+        except Exception as e:  # rehash best-effort — login fail nahi hona chahiye
+            print(f"[LPG] Password rehash skipped ({e})")
+    return user
+
+
+@router.post("/admin/login")
+async def admin_login(data: AdminLoginRequest, request: Request):
+    admin = await _authenticate(request, Admin, data.email, data.password)
     token = create_token({"sub": str(admin.id), "type": "admin"})
     return {
         "token": token,
@@ -27,17 +63,15 @@ def admin_login(data: AdminLoginRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/partner/login")
-def partner_login(data: PartnerLoginRequest, db: Session = Depends(get_db)):
-    agent = db.query(Agent).filter(Agent.email == data.email).first()
-    if not agent or not verify_password(data.password, agent.password_hash):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
+async def partner_login(data: PartnerLoginRequest, request: Request):
+    agent = await _authenticate(request, Agent, data.email, data.password)
     if agent.status == "suspended":
         raise HTTPException(status_code=403, detail="Account suspended")
     token = create_token({"sub": str(agent.id), "type": "partner"})
     return {
         "token": token,
         "agent": {
-            "id": f"A{agent.id}",
+            "id": format_agent_id(agent.id),
             "agentName": agent.agent_name,
             "agencyName": agent.agency_name,
             "email": agent.email,
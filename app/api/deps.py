@@ -1,19 +1,62 @@
-from fastapi import Depends, HTTPException, status
+import os
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
+from app.core.cache import get_cache
 from app.core.security import decode_token
 from app.models.admin import Admin
 from app.models.agent import Agent
 
 security = HTTPBearer(auto_error=False)
 
+# Token ke principal (admin/agent row ke fields) cache — partner dashboard polling pe har request SELECT nahi.
+# admin_agents update/delete/routing turant invalidate karte hain; TTL sirf bahar ke edits ke liye.
+# Sirf shared backend (sqlite/redis) pe — memory backend pe delete ek hi worker ka entry hatata, baaki workers
+# suspended agent ko TTL tak authorize karte rehte.
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+_ADMIN_FIELDS = ("id", "email", "name")
+_AGENT_FIELDS = ("id", "agent_name", "agency_name", "email", "phone", "status", "routing_enabled")
+
+
+class Principal:
+    """Authenticated admin/agent — ORM row ki detached copy (endpoints sirf ye fields padhte hain)."""
+
+    def __init__(self, data: dict):
+        self.__dict__.update(data)
+
+
+def _principal_key(kind: str, subject) -> str:
+    return f"principal:{kind}:{subject}"
+
+
+def _load_principal(kind: str, subject: str, load_row, fields: tuple) -> Principal | None:
+    cache = get_cache()
+    if not cache.shared:
+        row = load_row()
+        return Principal({f: getattr(row, f) for f in fields}) if row else None
+    key = _principal_key(kind, subject)
+    data = cache.get(key)
+    if data is None:
+        row = load_row()
+        if not row:
+            return None
+        data = {f: getattr(row, f) for f in fields}
+        cache.set(key, data, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+    return Principal(data)
+
+
+def invalidate_principal(kind: str, subject) -> None:
+    """kind = "admin" | "partner" — row update/delete/suspend ke commit ke baad call karo."""
+    get_cache().delete(_principal_key(kind, subject))
+
 
 def get_admin_from_token(
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
     db: Session = Depends(get_db),
-) -> Admin:
+) -> Principal:
     if not credentials:
         raise HTTPException(status_code=401, detail="Missing or invalid token")
     payload = decode_token(credentials.credentials)
@@ -22,26 +65,46 @@ def get_admin_from_token(
     admin_id = payload.get("sub")
     if not admin_id:
         raise HTTPException(status_code=401, detail="Invalid token")
-    admin = db.query(Admin).filter(Admin.id == int(admin_id)).first()
+    admin = _load_principal(
+        "admin", admin_id, lambda: db.query(Admin).filter(Admin.id == int(admin_id)).first(), _ADMIN_FIELDS
+    )
     if not admin:
         raise HTTPException(status_code=401, detail="Admin not found")
     return admin
 
 
-def get_agent_from_token(
-    credentials: HTTPAuthorizationCredentials | None = Depends(security),
-    db: Session = Depends(get_db),
-) -> Agent:
-    if not credentials:
+def _agent_from_raw_token(token: str | None, db: Session) -> Principal:
+    if not token:
         raise HTTPException(status_code=401, detail="Missing or invalid token")
-    payload = decode_token(credentials.credentials)
+    payload = decode_token(token)
     if not payload or payload.get("type") != "partner":
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     agent_id = payload.get("sub")
     if not agent_id:
         raise HTTPException(status_code=401, detail="Invalid token")
     agent_id = str(agent_id)
-    agent = db.query(Agent).filter(Agent.id == agent_id).first()
+    agent = _load_principal(
+        "partner", agent_id, lambda: db.query(Agent).filter(Agent.id == agent_id).first(), _AGENT_FIELDS
+    )
     if not agent:
         raise HTTPException(status_code=401, detail="Agent not found")
+    if agent.status == "suspended":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account suspended")
     return agent
+
+
+def get_agent_from_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    db: Session = Depends(get_db),
+) -> Principal:
+    return _agent_from_raw_token(credentials.credentials if credentials else None, db)
+
+
+def get_agent_from_token_or_query(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    db: Session = Depends(get_db),
+) -> Principal:
+    """EventSource headers set nahi kar sakta — `?token=` bhi chalega (sirf stream endpoint pe)."""
+    token = credentials.credentials if credentials else request.query_params.get("token")
+    return _agent_from_raw_token(token, db)
@@ -2,12 +2,12 @@ import os
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-import google.generativeai as genai
-
 from app.db.session import get_db
 from app.models.gemini_settings import GeminiSettings
 from app.core.config import get_gemini_model as _get_gemini_model
 from app.core.ai_engine import invalidate_gemini_cache
+from app.core.gemini_sdk import get_genai
+from app.core.settings_provider import settings_provider
 from app.api.deps import get_admin_from_token
 from app.schemas.gemini import GeminiSettingsSaveRequest, GeminiTestRequest
 
@@ -65,6 +65,7 @@ def save_gemini_settings(data: GeminiSettingsSaveRequest, db: Session = Depends(
         settings.model = data.model
     db.commit()
     db.refresh(settings)
+    settings_provider.notify_changed()
     invalidate_gemini_cache()  # naye instructions ke liye cache refresh
     return {"success": True}
 
@@ -75,6 +76,7 @@ def test_gemini(data: GeminiTestRequest, db: Session = Depends(get_db), admin=De
     if not key:
         return {"success": False, "error": "No API key provided"}
     try:
+        genai = get_genai()
         genai.configure(api_key=key)
         settings = _get_settings(db)
         model_name = (settings.model if settings else None) or _get_gemini_model()
@@ -105,6 +107,7 @@ def reset_gemini_instructions(db: Session = Depends(get_db), admin=Depends(get_a
     settings.conversation_instructions = DEFAULT_CONVERSATION
     db.commit()
     db.refresh(settings)
+    settings_provider.notify_changed()
     invalidate_gemini_cache()  # default instructions ke liye cache refresh
     return {
         "success": True,
@@ -1,6 +1,13 @@
+import sqlite3
+
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
+from app.core.ids import new_lead_id
+from app.core.lead_dedupe import find_duplicate
+from app.core.lead_events import emit
+from app.core.lead_ingest import DEFAULT_LEAD_NAME, LEAD_INGEST_ENABLED, lead_ingest, merge_submission
+from app.core.lead_routing import routing_engine
 from app.db.session import get_db
 from app.models.lead import Lead
 from app.schemas.lead import LeadSaveRequest
@@ -10,13 +17,26 @@ router = APIRouter(prefix="/api", tags=["Leads - Public"])
 
 @router.post("/leads")
 def save_lead(data: LeadSaveRequest, db: Session = Depends(get_db)):
+    """Journal mein append karke turant ack — insert / dedupe / routing background worker (app.core.lead_ingest)."""
+    if LEAD_INGEST_ENABLED:
+        try:
+            return {"success": True, "id": lead_ingest.enqueue(data.name, data.phone, data.context), "queued": True}
+        except sqlite3.Error as e:
+            print(f"[LPG] Lead ingest journal unavailable, direct insert ({e})")
+    existing = find_duplicate(db, data.phone)
+    if existing:
+        merge_submission(existing, data.name, data.context)
+        db.commit()
+        return {"success": True, "id": existing.id}
     lead = Lead(
-        name=data.name or "Web Visitor",
+        id=new_lead_id(),
+        name=data.name or DEFAULT_LEAD_NAME,
         phone=data.phone,
         context=data.context,
         source="AI Chat",
     )
     db.add(lead)
+    emit(db, "created", lead.id, status="new", source=lead.source)
+    routing_engine.assign(db, lead.id, data.context or "")  # create + assign ek commit
     db.commit()
-    db.refresh(lead)
     return {"success": True, "id": lead.id}
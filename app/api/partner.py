@@ -1,76 +1,89 @@
 from datetime import datetime, timedelta, timezone
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
+from app.db.async_session import run_db
 from app.models.lead import Lead
 from app.models.agent import Agent
-from app.api.deps import get_agent_from_token
+from app.api.deps import get_agent_from_token, get_agent_from_token_or_query
 from app.api.admin_settings import get_lead_expire_minutes
+from app.core.lead_events import emit
+from app.core.lead_expiry import expiry_sweeper
+from app.core.ids import resolve_lead_id
+from app.core.lead_routing import routing_engine
+from app.core.lead_stream import agent_event_stream, lead_stream, partner_lead_view
+from app.core.lead_versions import current_version, etag_matches, etag_needs_db, list_etag
 from app.schemas.lead import LeadStatusUpdateRequest
 
 router = APIRouter(prefix="/api/partner", tags=["Partner"])
 
 
-def _unlink_expired_leads(db: Session) -> None:
-    """Unlink leads whose status=new and assigned_agent_id set but expired."""
-    minutes, _ = get_lead_expire_minutes(db)
-    cutoff = datetime.now(timezone.utc) - timedelta(minutes=minutes)
-    expired = db.query(Lead).filter(
-        Lead.status == "new",
-        Lead.assigned_agent_id.isnot(None),
-        Lead.assigned_at.isnot(None),
-        Lead.assigned_at < cutoff,
-    ).all()
-    for l in expired:
-        l.assigned_agent_id = None
-        l.assigned_at = None
-    if expired:
-        db.commit()
-
-
 @router.get("/leads")
-def get_my_leads(
-    db: Session = Depends(get_db),
+async def get_my_leads(
+    request: Request,
+    response: Response,
     agent=Depends(get_agent_from_token),
     status: str | None = Query(None),
+    since: int | None = Query(None, ge=0),
 ):
-    _unlink_expired_leads(db)
-    # Match both agent.id and "A"+agent.id (in case assigned_agent_id was stored with A prefix)
+    """ETag / If-None-Match — list na badli ho to 304 (shared cache pe DB tak nahi jata, memory pe ek version read).
+    `since=<version>` (pichle response ka `version`): sirf badle leads + `ids` (jo ids mein nahi, list se hatao)."""
+    expiry_sweeper.ensure_started()
+    db_version = await run_db(current_version) if etag_needs_db() else None
+    etag = list_etag(agent.id, str(request.query_params), db_version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    # Partner dashboards constantly poll — async DB session pe, threadpool worker nahi rukta
+    return await run_db(_load_my_leads, agent.id, status, since)
+
+
+def _load_my_leads(db: Session, agent_id: str, status: str | None, since: int | None = None) -> dict:
+    """Pure read — expired leads filter se bahar (unlink expiry sweeper karta hai)."""
+    version = current_version(db)  # leads se pehle — beech ke writes agle `since` mein aa jayenge
+    minutes, _ = get_lead_expire_minutes(db)
+    minutes = max(1, minutes)  # Ensure at least 1 min added
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=minutes)
     q = db.query(Lead).filter(
-        or_(Lead.assigned_agent_id == agent.id, Lead.assigned_agent_id == f"A{agent.id}")
+        Lead.assigned_agent_id == agent_id,  # migration 6 ke baad sirf canonical id
+        or_(Lead.status != "new", Lead.assigned_at.is_(None), Lead.assigned_at >= cutoff),
     )
     if status:
         q = q.filter(Lead.status == status)
+    if since is not None and since <= version:
+        ids = [i for (i,) in q.with_entities(Lead.id).all()]
+        leads = q.filter(Lead.sync_version > since).order_by(Lead.created_at.desc()).all()
+        return {"leads": [partner_lead_view(l, minutes) for l in leads], "ids": ids, "version": version, "delta": True}
     leads = q.order_by(Lead.created_at.desc()).all()
-    minutes, _ = get_lead_expire_minutes(db)
-    minutes = max(1, minutes)  # Ensure at least 1 min added
-    out = []
-    for l in leads:
-        assigned_at = l.assigned_at
-        expires_at = None
-        if assigned_at and l.status == "new":
-            # assigned_at + admin-set minutes (DB may return naive datetime, assume UTC)
-            dt = assigned_at if assigned_at.tzinfo else assigned_at.replace(tzinfo=timezone.utc)
-            expires_dt = dt + timedelta(minutes=minutes)
-            expires_at = expires_dt.isoformat()
-        out.append({
-            "id": l.id if isinstance(l.id, str) else f"L{l.id}",
-            "userName": l.user_name or l.name or "",
-            "name": l.name or l.user_name or "",
-            "phone": l.phone or "",
-            "propertyInterest": l.property_interest or "",
-            "budget": l.budget or "",
-            "leadScore": l.lead_score or 0,
-            "status": l.status or "new",
-            "aiSummary": l.ai_summary or "",
-            "source": l.source or "AI Search",
-            "createdAt": l.created_at.isoformat() if l.created_at else None,
-            "expiresAt": expires_at,
-            "assignedAt": assigned_at.isoformat() if assigned_at else None,
-        })
-    return {"leads": out}
+    return {"leads": [partner_lead_view(l, minutes) for l in leads], "version": version}
+
+
+@router.get("/leads/stream")
+async def stream_my_leads(
+    request: Request,
+    agent=Depends(get_agent_from_token_or_query),
+    last_event_id: str | None = Query(None, alias="lastEventId"),
+):
+    """SSE — assigned / expired / rejected / status_changed events; poll ki zarurat nahi.
+    EventSource reconnect pe Last-Event-ID header khud bhejta hai, miss hue events replay hote hain."""
+    expiry_sweeper.ensure_started()
+    return StreamingResponse(
+        agent_event_stream(request, agent.id, request.headers.get("last-event-id") or last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _get_my_lead(db: Session, lead_id: str, agent) -> Lead:
+    """Canonical id + agent — ek indexed equality query."""
+    lead = db.query(Lead).filter(Lead.id == resolve_lead_id(db, lead_id), Lead.assigned_agent_id == agent.id).first()
+    if not lead:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    return lead
 
 
 @router.post("/leads/{lead_id}/accept")
@@ -79,15 +92,7 @@ def accept_lead(
     db: Session = Depends(get_db),
     agent=Depends(get_agent_from_token),
 ):
-    lid = str(lead_id)
-    agent_match = or_(Lead.assigned_agent_id == agent.id, Lead.assigned_agent_id == f"A{agent.id}")
-    lead = db.query(Lead).filter(Lead.id == lid, agent_match).first()
-    if not lead and lid.startswith("L"):
-        lead = db.query(Lead).filter(Lead.id == lid[1:], agent_match).first()
-    if not lead and lid.startswith("LD"):
-        lead = db.query(Lead).filter(Lead.id == lid[2:], agent_match).first()
-    if not lead:
-        raise HTTPException(status_code=404, detail="Lead not found")
+    lead = _get_my_lead(db, lead_id, agent)
     # Expiry check: if status=new and past expiry -> unlink and return 410
     if lead.status == "new" and lead.assigned_at:
         minutes, _ = get_lead_expire_minutes(db)
@@ -98,7 +103,11 @@ def accept_lead(
         if assigned_at < cutoff:
             lead.assigned_agent_id = None
             lead.assigned_at = None
+            db.flush()  # pehle version + lead row (sweeper jaisa lock order), phir event
+            emit(db, "expired", lead.id, agent.id, lead.status)
             db.commit()
+            routing_engine.release(agent.id)
+            lead_stream.publish(agent.id, "expired", leadId=lead.id)
             raise HTTPException(
                 status_code=410,
                 detail={
@@ -106,10 +115,16 @@ def accept_lead(
                     "code": "LEAD_EXPIRED",
                 },
             )
+    previous_status = lead.status
     lead.status = "in_progress"
+    db.flush()
+    emit(db, "status_changed", lead.id, agent.id, lead.status, previousStatus=previous_status)
     db.commit()
     db.refresh(lead)
-    return {"success": True, "lead": {"id": lead.id if isinstance(lead.id, str) else f"L{lead.id}", "status": lead.status}}
+    if previous_status == "new":  # load cap = agent ke pending `new` leads
+        routing_engine.release(agent.id)
+    lead_stream.publish(agent.id, "status_changed", leadId=lead.id, status=lead.status)
+    return {"success": True, "lead": {"id": lead.id, "status": lead.status}}
 
 
 @router.post("/leads/{lead_id}/reject")
@@ -118,19 +133,19 @@ def reject_lead(
     db: Session = Depends(get_db),
     agent=Depends(get_agent_from_token),
 ):
-    lid = str(lead_id)
-    agent_match = or_(Lead.assigned_agent_id == agent.id, Lead.assigned_agent_id == f"A{agent.id}")
-    lead = db.query(Lead).filter(Lead.id == lid, agent_match).first()
-    if not lead and lid.startswith("L"):
-        lead = db.query(Lead).filter(Lead.id == lid[1:], agent_match).first()
-    if not lead and lid.startswith("LD"):
-        lead = db.query(Lead).filter(Lead.id == lid[2:], agent_match).first()
-    if not lead:
-        raise HTTPException(status_code=404, detail="Lead not found")
+    lead = _get_my_lead(db, lead_id, agent)
+    previous_status = lead.status
     lead.assigned_agent_id = None
     lead.assigned_at = None
     lead.status = "new"
+    db.flush()
+    emit(db, "rejected", lead.id, agent.id, "new", previousStatus=previous_status)
+    # Kisi aur agent ko (isi commit mein) — rejecting agent skip
+    routing_engine.assign(db, lead.id, " ".join(filter(None, [lead.property_interest, lead.context])), exclude={str(agent.id)})
     db.commit()
+    if previous_status == "new":
+        routing_engine.release(agent.id)
+    lead_stream.publish(agent.id, "rejected", leadId=lead.id)
     return {"success": True, "message": "Lead rejected"}
 
 
@@ -141,18 +156,18 @@ def update_lead_status(
     db: Session = Depends(get_db),
     agent=Depends(get_agent_from_token),
 ):
-    lid = str(lead_id)
-    agent_match = or_(Lead.assigned_agent_id == agent.id, Lead.assigned_agent_id == f"A{agent.id}")
-    lead = db.query(Lead).filter(Lead.id == lid, agent_match).first()
-    if not lead and lid.startswith("L"):
-        lead = db.query(Lead).filter(Lead.id == lid[1:], agent_match).first()
-    if not lead and lid.startswith("LD"):
-        lead = db.query(Lead).filter(Lead.id == lid[2:], agent_match).first()
-    if not lead:
-        raise HTTPException(status_code=404, detail="Lead not found")
+    lead = _get_my_lead(db, lead_id, agent)
     if data.status not in ("new", "in_progress", "site_visit", "closed"):
         raise HTTPException(status_code=400, detail="Invalid status")
+    previous_status = lead.status
     lead.status = data.status
+    db.flush()  # pehle version + lead row, phir event (accept jaisa lock order)
+    emit(db, "status_changed", lead.id, agent.id, lead.status, previousStatus=previous_status)
     db.commit()
     db.refresh(lead)
-    return {"success": True, "lead": {"id": lead.id if isinstance(lead.id, str) else f"L{lead.id}", "status": lead.status}}
+    if previous_status == "new" and lead.status != "new":
+        routing_engine.release(agent.id)
+    elif previous_status != "new" and lead.status == "new":
+        routing_engine.hold(agent.id)
+    lead_stream.publish(agent.id, "status_changed", leadId=lead.id, status=lead.status)
+    return {"success": True, "lead": {"id": lead.id, "status": lead.status}}
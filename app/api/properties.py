@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from app.core.ai_engine import _photo_url, _property_store
+
+router = APIRouter(prefix="/api/properties", tags=["Properties - Public"])
+
+
+def _require_store():
+    store = _property_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="Property store not built")
+    return store
+
+
+@router.get("/facets")
+def property_facets(
+    area: str | None = Query(None),
+    type: str | None = Query(None),
+    budget_max_lac: float | None = Query(None, alias="budgetMaxLac"),
+):
+    store = _require_store()
+    max_price = budget_max_lac * 100000 if budget_max_lac is not None else None
+    facets = store.facets(store.mask(area=area, ptype=type, max_price=max_price))
+    facets["version"] = store.version
+    return facets
+
+
+@router.get("/{property_id}/similar")
+def similar_properties(property_id: int, limit: int = Query(10, ge=1, le=50)):
+    store = _require_store()
+    row = store.row_of(property_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Property not found")
+    listings = [store.listing(int(i)) for i in store.similar(row, limit)]
+    for listing in listings:
+        listing["cover_photo"] = _photo_url(listing["cover_photo"])
+    return {"listings": listings}
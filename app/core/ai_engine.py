@@ -10,7 +10,13 @@ import re
 import json
 import datetime
 from dotenv import load_dotenv
-import google.generativeai as genai
+
+from app.core.cache import get_cache
+from app.core.config import property_store_built
+from app.core.gemini_sdk import get_genai
+from app.core.lead_routing import routing_engine
+from app.core.property_snapshot import get_snapshot, invalidate_snapshot
+from app.db.replicas import pin_primary
 
 load_dotenv()
 
@@ -19,18 +25,19 @@ MAX_CONTEXT_MESSAGES = 8
 
 # Cache — system prompt 1 bar cache, reuse
 # Gemini: min 32k tokens, TTL default 1 hour. Hum 55 min pe proactive re-create karte hain.
+# Cache ka naam shared cache backend mein ("gemini" namespace) — sab workers ek hi Gemini cache use karte hain.
 _cached_prompt_cache = None
 _cached_prompt_expiry = None
+_cached_prompt_version = None
+_cache_hooks_registered = False
 CACHE_TTL_MINUTES = int(os.getenv("GEMINI_CACHE_TTL_MINUTES", "60"))  # 1 hour
 PROACTIVE_REFRESH_MINUTES = int(os.getenv("GEMINI_CACHE_REFRESH_MINUTES", "55"))  # 5 min pehle refresh
 MIN_CACHE_TOKENS = int(os.getenv("GEMINI_MIN_CACHE_TOKENS", "32768"))  # Gemini cache min
+LISTING_CACHE_TTL_SECONDS = int(os.getenv("LISTING_CACHE_TTL_SECONDS", "120"))
 
 
-def invalidate_gemini_cache(delete_on_api: bool = True):
-    """Admin ke instructions update hone par call — purana cache hatake naya banaega.
-    delete_on_api=True: Gemini API par se bhi delete try karega."""
-    global _cached_prompt_cache, _cached_prompt_expiry, _area_summary_cache
-    _area_summary_cache = ("", 0.0)
+def _drop_prompt_cache(delete_on_api: bool = False):
+    global _cached_prompt_cache, _cached_prompt_expiry, _cached_prompt_version
     if _cached_prompt_cache and delete_on_api:
         try:
             _cached_prompt_cache.delete()
@@ -38,6 +45,35 @@ def invalidate_gemini_cache(delete_on_api: bool = True):
             print(f"[LPG] Cache delete skipped: {e}")
     _cached_prompt_cache = None
     _cached_prompt_expiry = None
+    _cached_prompt_version = None
+
+
+def _on_gemini_invalidated(namespace: str, version: int):
+    """Kisi bhi worker ne invalidate kiya — is process ka handle + snapshot bhi chhodo."""
+    _drop_prompt_cache(delete_on_api=False)
+    invalidate_snapshot()
+
+
+def _register_cache_hooks():
+    global _cache_hooks_registered
+    if not _cache_hooks_registered:
+        get_cache().on_invalidate("gemini", _on_gemini_invalidated)
+        _cache_hooks_registered = True
+
+
+def invalidate_gemini_cache(delete_on_api: bool = True):
+    """Admin ke instructions update hone par call — purana cache hatake naya banaega (sab workers mein).
+    delete_on_api=True: Gemini API par se bhi delete try karega."""
+    cache = get_cache()
+    shared = cache.get(cache.vkey("gemini", "prompt_cache"))
+    if delete_on_api and shared and not (_cached_prompt_cache and _cached_prompt_cache.name == shared.get("name")):
+        try:  # doosre worker ka banaya hua cache
+            get_genai().caching.CachedContent.get(name=shared["name"]).delete()
+        except Exception as e:
+            print(f"[LPG] Cache delete skipped: {e}")
+    _drop_prompt_cache(delete_on_api)
+    invalidate_snapshot()  # naya property data bhi
+    cache.bump("gemini")
 
 LEAD_COLLECT_PROMPT = """Tu Lahore Property Guide ka AI assistant ho. Tumhara maqsad: user ki baat se properties filter karna.
 
@@ -64,63 +100,26 @@ DB_SCHEMA_SUMMARY = """properties: id, title, location_name, price(rupees), area
 DEFAULT_FILTER_CRITERIA = {"area": "Johar Town", "type": "flat", "budget_max_lac": 3}
 
 
-# Area summary cache — 60s TTL, extra DB query avoid
-_area_summary_cache = ("", 0.0)
-AREA_SUMMARY_TTL_SEC = 60
-
-
 def _get_area_price_summary(db) -> str:
-    """Har area ke liye count + price range. 60s cache — response time slow nahi hoga."""
-    global _area_summary_cache
-    now_ts = datetime.datetime.now(datetime.timezone.utc).timestamp()
-    if _area_summary_cache[0] and (now_ts - _area_summary_cache[1]) < AREA_SUMMARY_TTL_SEC:
-        return _area_summary_cache[0]
-    try:
-        from sqlalchemy import func
-        from app.models.property import Property
-        rows = (
-            db.query(
-                Property.location_name,
-                func.count(Property.id).label("cnt"),
-                func.min(Property.price).label("min_p"),
-                func.max(Property.price).label("max_p"),
-            )
-            .filter(Property.location_name.isnot(None), Property.location_name != "")
-            .group_by(Property.location_name)
-            .all()
-        )
-        parts = []
-        for loc, cnt, min_p, max_p in rows:
-            min_cr = (float(min_p or 0) / 1e7)
-            max_cr = (float(max_p or 0) / 1e7)
-            parts.append(f"{loc}: {cnt} properties, {min_cr:.1f} se {max_cr:.1f} crore")
-        result = " | ".join(parts) if parts else "No areas"
-        _area_summary_cache = (result, now_ts)
-        return result
-    except Exception:
-        return _area_summary_cache[0] or ""
+    """Har area ke liye count + price range. Property snapshot se (preloaded, TTL refresh) — per-request query nahi."""
+    snap = get_snapshot(db)
+    return snap.area_summary if snap else ""
 
 
 def _get_property_data_for_cache(db) -> str:
     """Property data — 32k min ke liye pad kiya jayega. Pehle area summary + schema, phir listing."""
-    try:
-        from app.models.property import Property
-        area_summary = _get_area_price_summary(db)
-        header = (
-            "--- AVAILABLE DATA ---\n"
-            f"Areas & ranges (DB se): {area_summary}\n"
-            f"DB schema: {DB_SCHEMA_SUMMARY}\n"
-            "--- Property listings (location_name|type|title|price_lac|area_size) ---\n"
-        )
-        rows = db.query(Property).limit(500).all()
-        if not rows:
-            return header + _CACHE_FILLER
-        lines = []
-        for p in rows:
-            lines.append(f"{p.location_name or ''} | {p.type or ''} | {p.title or ''} | {float(p.price or 0)/100000:.0f} lac | {p.area_size or ''}")
-        return header + "\n".join(lines) + "\n" + _CACHE_FILLER
-    except Exception:
+    snap = get_snapshot(db)
+    if snap is None:
         return _CACHE_FILLER
+    header = (
+        "--- AVAILABLE DATA ---\n"
+        f"Areas & ranges (DB se): {snap.area_summary}\n"
+        f"DB schema: {DB_SCHEMA_SUMMARY}\n"
+        "--- Property listings (location_name|type|title|price_lac|area_size) ---\n"
+    )
+    if not snap.listing_lines:
+        return header + _CACHE_FILLER
+    return header + "\n".join(snap.listing_lines) + "\n" + _CACHE_FILLER
 
 
 _CACHE_FILLER = """
@@ -148,26 +147,43 @@ def _pad_to_min_tokens(contents: list, system_prompt: str, min_tokens: int) -> l
     return contents + [padded]
 
 
-def _is_cache_expired() -> bool:
-    """TTL check — 55 min baad proactive re-create. Admin update ke alawa bhi."""
-    global _cached_prompt_cache, _cached_prompt_expiry
+def _is_cache_expired(version: int | None = None) -> bool:
+    """TTL check — 55 min baad proactive re-create. Admin update (version bump) pe bhi."""
     if not _cached_prompt_cache or not _cached_prompt_expiry:
         return True
+    if version is not None and version != _cached_prompt_version:
+        return True
     now = datetime.datetime.now(datetime.timezone.utc)
     return now >= _cached_prompt_expiry
 
 
 def _get_or_create_cache(api_key: str, model_name: str, system_prompt: str, db=None):
     """System prompt + property data 1 bar cache. Gemini min 32k tokens, TTL 1 hour.
-    Agar 32k se kam ho to pad, agar expire ho gaya to re-create."""
+    Agar 32k se kam ho to pad, agar expire ho gaya to re-create. Doosre worker ne bana diya ho to wahi reuse."""
     if os.getenv("ENABLE_CONTEXT_CACHE", "true").lower() in ("false", "0", "no"):
         return None
-    global _cached_prompt_cache, _cached_prompt_expiry
-    if not _is_cache_expired():
+    global _cached_prompt_cache, _cached_prompt_expiry, _cached_prompt_version
+    shared_cache = get_cache()
+    version = shared_cache.version("gemini")
+    if not _is_cache_expired(version):
         return _cached_prompt_cache
 
+    genai = get_genai()
     genai.configure(api_key=api_key)
     cache_model = os.getenv("GEMINI_CACHE_MODEL") or model_name or "gemini-3-flash-preview"
+    shared_key = f"gemini:v{version}:prompt_cache"
+
+    shared = shared_cache.get(shared_key)
+    if shared:
+        try:
+            expiry = datetime.datetime.fromisoformat(shared["expiry"])
+            if expiry > datetime.datetime.now(datetime.timezone.utc):
+                _cached_prompt_cache = genai.caching.CachedContent.get(name=shared["name"])
+                _cached_prompt_expiry = expiry
+                _cached_prompt_version = version
+                return _cached_prompt_cache
+        except Exception as e:
+            print(f"[LPG] Shared cache {shared.get('name')} unusable ({e}), creating new")
 
     contents = []
     if db:
@@ -191,6 +207,12 @@ def _get_or_create_cache(api_key: str, model_name: str, system_prompt: str, db=N
         _cached_prompt_cache = cache
         now = datetime.datetime.now(datetime.timezone.utc)
         _cached_prompt_expiry = now + datetime.timedelta(minutes=PROACTIVE_REFRESH_MINUTES)
+        _cached_prompt_version = version
+        shared_cache.set(
+            shared_key,
+            {"name": cache.name, "expiry": _cached_prompt_expiry.isoformat()},
+            ttl=PROACTIVE_REFRESH_MINUTES * 60,
+        )
         return cache
     except Exception as e:
         print(f"[LPG] Cache create failed ({e}), using normal model")
@@ -243,17 +265,13 @@ def _build_filter_from_context(context: list, db=None) -> dict:
     if any(p in full_lower for p in all_phrases):
         return {}
     fc = {}
-    # Area: DB se distinct locations, jo context mein hai woh use karo (koi hardcoded list nahi)
-    if db:
-        try:
-            from app.models.property import Property
-            areas_in_db = [r[0] for r in db.query(Property.location_name).distinct().all() if r[0] and str(r[0]).strip()]
-            for loc in areas_in_db:
-                if loc and loc.lower() in full_lower:
-                    fc["area"] = loc
-                    break
-        except Exception:
-            pass
+    # Area: DB ki distinct locations (snapshot se), jo context mein hai woh use karo (koi hardcoded list nahi)
+    snap = get_snapshot(db) if db else None
+    if snap:
+        for loc_lower, loc in snap.areas_lower:
+            if loc_lower in full_lower:
+                fc["area"] = loc
+                break
     # Agar DB se na mila to minimal fallback (db=None ya query fail)
     if not fc.get("area"):
         m = re.search(r"\b(dha|bahria|gulberg|canal garden|park view|college road)\b", full_lower)
@@ -291,12 +309,67 @@ def _build_sql_desc(use_area: bool, use_type: bool, use_budget: bool, filter_cri
     return f"SELECT id,title,location_name,price,area_size,type,cover_photo,bedrooms,baths FROM properties WHERE {where} ORDER BY created_at DESC LIMIT 20"
 
 
+def _photo_url(val):
+    if not val or not str(val).strip():
+        return ""
+    v = str(val).strip()
+    if v.startswith(("http://", "https://", "/")):
+        return v
+    return f"/property/{v}"
+
+
+def _property_store():
+    """Columnar store (scripts/build_property_store.py) — build na hua ho to None, numpy import bhi nahi."""
+    if not property_store_built():
+        return None
+    from app.core.property_store import get_store
+    return get_store()
+
+
 def _fetch_properties(db, filter_criteria: dict, limit: int = 20):
+    """_query_properties + shared listing cache ("listings" namespace, LISTING_CACHE_TTL_SECONDS).
+    Store rebuild (naya version) pe key khud badal jati hai."""
+    cache = get_cache()
+    store = _property_store()
+    key = json.dumps([filter_criteria or {}, limit, store.version if store else None], sort_keys=True, default=str)
+    listings, sql_executed = cache.get_or_set(
+        cache.vkey("listings", key),
+        lambda: _query_properties(db, filter_criteria, limit),
+        ttl=LISTING_CACHE_TTL_SECONDS,
+    )
+    return listings, sql_executed
+
+
+def _query_properties(db, filter_criteria: dict, limit: int = 20):
     """Filter criteria se properties fetch karo. Returns (listings, sql_executed).
-    Fallback: agar strict filter se 0 aaye to relaxed try (area+budget, area only, budget only, sab)."""
+    Fallback: agar strict filter se 0 aaye to relaxed try (area+budget, area only, budget only, sab).
+    Property store build ho to filter mmap columns pe chalta hai (DB round-trip nahi); sql_executed wahi description."""
     from app.models.property import Property
 
+    store = _property_store()
+
+    def _max_rupees(use_budget):
+        budget_lac = filter_criteria.get("budget_max_lac") if use_budget else None
+        if budget_lac is None:
+            return None
+        try:
+            return float(budget_lac) * 100000
+        except (TypeError, ValueError):
+            return None
+
+    def _store_query(use_area=True, use_type=True, use_budget=True):
+        fc = filter_criteria or {}
+        idx = store.query(
+            area=fc.get("area") if use_area else None,
+            ptype=fc.get("type") if use_type else None,
+            max_price=_max_rupees(use_budget) if fc else None,
+            limit=limit,
+        )
+        return [store.listing(int(i)) for i in idx]
+
     def _do_query(use_area=True, use_type=True, use_budget=True):
+        if store is not None:
+            return _store_query(use_area, use_type, use_budget)
         q = db.query(Property)
         if filter_criteria:
             if use_area:
@@ -307,15 +380,23 @@ def _fetch_properties(db, filter_criteria: dict, limit: int = 20):
                 ptype = filter_criteria.get("type")
                 if ptype and str(ptype).strip():
                     q = q.filter(Property.type.ilike(f"%{str(ptype).strip()}%"))
-            if use_budget:
-                budget_lac = filter_criteria.get("budget_max_lac")
-                if budget_lac is not None:
-                    try:
-                        max_rupees = float(budget_lac) * 100000
-                        q = q.filter(Property.price <= max_rupees)
-                    except (TypeError, ValueError):
-                        pass
-        return q.order_by(Property.created_at.desc()).limit(limit).all()
+            max_rupees = _max_rupees(use_budget)
+            if max_rupees is not None:
+                q = q.filter(Property.price <= max_rupees)
+        return [
+            {
+                "id": p.id,
+                "title": p.title or "",
+                "location_name": p.location_name or "",
+                "price": float(p.price) if p.price else 0,
+                "area_size": p.area_size or "",
+                "type": p.type or "",
+                "cover_photo": p.cover_photo,
+                "bedrooms": p.bedrooms,
+                "baths": p.baths,
+            }
+            for p in q.order_by(Property.created_at.desc()).limit(limit).all()
+        ]
 
     sql_executed = ""
     rows = _do_query(use_area=True, use_type=True, use_budget=True)
@@ -334,29 +415,9 @@ def _fetch_properties(db, filter_criteria: dict, limit: int = 20):
         rows = _do_query(use_area=False, use_type=False, use_budget=False)
         sql_executed = _build_sql_desc(False, False, False, filter_criteria)
 
-    def _photo_url(val):
-        if not val or not str(val).strip():
-            return ""
-        v = str(val).strip()
-        if v.startswith(("http://", "https://", "/")):
-            return v
-        return f"/property/{v}"
-
-    listings = [
-        {
-            "id": p.id,
-            "title": p.title or "",
-            "location_name": p.location_name or "",
-            "price": float(p.price) if p.price else 0,
-            "area_size": p.area_size or "",
-            "type": p.type or "",
-            "cover_photo": _photo_url(p.cover_photo),
-            "bedrooms": p.bedrooms,
-            "baths": p.baths,
-        }
-        for p in rows
-    ]
-    return listings, sql_executed
+    for listing in rows:
+        listing["cover_photo"] = _photo_url(listing["cover_photo"])
+    return rows, sql_executed
 
 
 def _parse_gemini_json_response(text: str):
@@ -396,7 +457,7 @@ def _extract_lead_regex(text: str, all_messages: list) -> dict | None:
     full = " ".join([str(m) for m in all_messages]) + " " + (text or "")
     lead = {}
     # Phone
-    phone_m = re.search(r"(\+92\s?\d{2}\s?\d{7}|03\d{2}\s?\d{7}|\d{4}[\s-]?\d{7})", full.replace("-", ""))
+    phone_m = re.search(r"(\+92\s?3\d{2}\s?\d{7}|\+92\s?\d{2}\s?\d{7}|03\d{2}\s?\d{7}|\d{4}[\s-]?\d{7})", full.replace("-", ""))
     if phone_m:
         lead["phone"] = phone_m.group(1).strip()
     # Name
@@ -411,7 +472,9 @@ def _extract_lead_regex(text: str, all_messages: list) -> dict | None:
     return lead if (lead.get("name") and lead.get("phone")) else None
 
 
-async def get_ai_response(query: str, messages: list, thread_id: str = None, db=None, gemini_settings=None):
+async def get_ai_response(query: str, messages: list, thread_id: str = None, db=None, gemini_settings=None, read_db=None):
+    """db = primary (lead/chat writes). read_db = read-only session (replica) — property/chat reads."""
+    _register_cache_hooks()
     api_key = os.getenv("GEMINI_API_KEY")
     if gemini_settings and gemini_settings.api_key:
         api_key = gemini_settings.api_key
@@ -431,12 +494,13 @@ async def get_ai_response(query: str, messages: list, thread_id: str = None, db=
         }
 
     # 1. Load/store messages by thread_id
+    rdb = read_db or db
     stored_messages = []
-    if db and thread_id:
+    if rdb and thread_id:
         from app.models.chat_message import ChatMessage
 
         stored = (
-            db.query(ChatMessage)
+            rdb.query(ChatMessage)
             .filter(ChatMessage.thread_id == thread_id)
             .order_by(ChatMessage.id)
             .limit(50)
@@ -474,6 +538,7 @@ async def get_ai_response(query: str, messages: list, thread_id: str = None, db=
         if gemini_settings.conversation_instructions:
             system_prompt += "\n\n" + gemini_settings.conversation_instructions
 
+    genai = get_genai()
     genai.configure(api_key=api_key)
     from app.core.config import get_gemini_model
     model_name = (gemini_settings.model if gemini_settings else None) or get_gemini_model()
@@ -487,7 +552,7 @@ async def get_ai_response(query: str, messages: list, thread_id: str = None, db=
     raw = None
     for attempt in range(2):
         try:
-            cache = _get_or_create_cache(api_key, model_name, system_prompt, db=db)
+            cache = _get_or_create_cache(api_key, model_name, system_prompt, db=rdb)
             if cache:
                 model = genai.GenerativeModel.from_cached_content(cache)
             else:
@@ -537,7 +602,7 @@ async def get_ai_response(query: str, messages: list, thread_id: str = None, db=
         if fc2:
             filter_criteria = {**filter_criteria, **{k: v for k, v in fc2.items() if v is not None}}
         if not filter_criteria:
-            filter_criteria = _build_filter_from_context(context, db=db)
+            filter_criteria = _build_filter_from_context(context, db=rdb)
         # Default: DHA, house, 50 lac — jab na user ne kuch bola na context se mila (sab dikhao exclude)
         if not filter_criteria:
             ctx_text = " ".join([str(c.get("content", "")).lower() for c in context])
@@ -552,9 +617,9 @@ async def get_ai_response(query: str, messages: list, thread_id: str = None, db=
         listings = []
         sql_executed = ""
         area_summary = ""
-        if db:
-            listings, sql_executed = _fetch_properties(db, filter_criteria)
-            area_summary = _get_area_price_summary(db)
+        if rdb:
+            listings, sql_executed = _fetch_properties(rdb, filter_criteria)
+            area_summary = _get_area_price_summary(rdb)
 
         # 3. Extract lead (prefer parsed_lead, then JSON, else regex)
         lead_info = None
@@ -565,10 +630,15 @@ async def get_ai_response(query: str, messages: list, thread_id: str = None, db=
         lead_id = None
 
         if db and lead_info and lead_info.get("name") and lead_info.get("phone"):
-            import uuid
+            from app.core.ids import new_lead_id
+            from app.core.lead_dedupe import find_duplicate
+            from app.core.lead_events import emit
             from app.models.lead import Lead
 
             existing = db.query(Lead).filter(Lead.thread_id == thread_id).first() if thread_id else None
+            if existing is None:
+                # Same banda naye thread pe / form ke baad chat — window ke andar same phone ka lead update
+                existing = find_duplicate(db, lead_info.get("phone"))
             if existing:
                 existing.name = lead_info.get("name") or existing.name
                 existing.phone = lead_info.get("phone") or existing.phone
@@ -576,13 +646,13 @@ async def get_ai_response(query: str, messages: list, thread_id: str = None, db=
                 existing.property_interest = lead_info.get("interest") or lead_info.get("property_interest") or existing.property_interest
                 existing.ai_summary = (question[:300] or existing.ai_summary) if question else existing.ai_summary
                 existing.context = str(context)[:500] if context else existing.context
+                existing.thread_id = existing.thread_id or thread_id
                 db.commit()
                 db.refresh(existing)
                 lead_id = existing.id
             else:
-                new_id = "L" + str(uuid.uuid4())[:8].upper()
                 lead = Lead(
-                    id=new_id,
+                    id=new_lead_id(),
                     name=lead_info.get("name"),
                     phone=lead_info.get("phone"),
                     user_name=lead_info.get("name") or "Visitor",
@@ -594,9 +664,14 @@ async def get_ai_response(query: str, messages: list, thread_id: str = None, db=
                     thread_id=thread_id,
                 )
                 db.add(lead)
-                db.commit()
-                db.refresh(lead)
+                emit(db, "created", lead.id, status="new", source=lead.source)
                 lead_id = lead.id
+                # Turant agent ko (isi commit mein) — area chat filter se, warna interest text se
+                area_text = " ".join(filter(None, [str((filter_criteria or {}).get("area") or ""), lead.property_interest]))
+                routing_engine.assign(db, lead_id, area_text)
+                db.commit()
+            # Read-your-writes — is thread ki agli reads primary pe
+            pin_primary(thread_id)
 
             if lead_info:
                 lead_info["lead_id"] = lead_id
@@ -609,6 +684,7 @@ async def get_ai_response(query: str, messages: list, thread_id: str = None, db=
                 db.add(ChatMessage(thread_id=thread_id, role="user", content=query.strip()))
             db.add(ChatMessage(thread_id=thread_id, role="model", content=question or raw))
             db.commit()
+            pin_primary(thread_id)
 
         return {
             "question": question,
@@ -0,0 +1,299 @@
+"""Lead analytics rollups — funnel (created → assigned → accepted → site_visit → closed), agent accept / reject /
+expiry rates, source / day series. Dashboard `lead_stats` counters se padhta hai, leads table scan nahi.
+
+Likhna: request paths kuch nahi likhte — `lead_events` outbox ka durable consumer ("analytics", poore deployment
+mein ek) batches mein counters += n karta hai (event ke din ka bucket, day + month). Hot counter rows pe
+request transactions ka jhagra nahi, aur consumer ka checkpoint counters ke saath commit hota hai.
+Funnel stages distinct leads: `lead_funnel` mein har lead ki har stage ki pehli tareekh — lead dobara assign ho
+to "reassigned" (alag volume metric), status peeche ja ke phir aage aaye to stage dobara nahi ginti.
+Skipped stages (new → closed) bhi pahunchi maani jati hain. LEAD_EVENTS_ENABLED=false pe counters nahi badhte.
+
+Padhna: range [from, to] = poore mahine (month rows) + kinaron ke din (day rows) — range kitni bhi lambi ho,
+~ (mahine + 62 din) × dimensions rows. Backfill: `python scripts/backfill_analytics.py` (leads ki maujooda halat
++ lead_events ki rejected / expired / reassigned history se dobara; consumer wahan se aage).
+"""
+import json
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, case, func, literal, or_, select
+
+from app.core.lead_events import lead_events
+from app.models.lead import Lead
+from app.models.lead_event import LeadEvent
+from app.models.lead_funnel import LeadFunnel
+from app.models.lead_stat import LeadStat
+
+METRICS = ("created", "assigned", "reassigned", "accepted", "rejected", "expired", "site_visit", "closed")
+_STAGES = (None, "accepted", "site_visit", "closed")  # funnel order; index = status ka rank
+_STATUS_RANK = {"in_progress": 1, "site_visit": 2, "closed": 3}  # new / merged / None = 0
+_TABLE = LeadStat.__table__
+_CONSUMER = "analytics"
+
+
+def status_metrics(old: str | None, new: str | None) -> tuple[str, ...]:
+    """Status old → new pe funnel stages — beech ki skipped stages bhi (new → closed = accepted, site_visit,
+    closed). Peeche jana = kuch nahi."""
+    return _STAGES[_STATUS_RANK.get(old or "", 0) + 1:_STATUS_RANK.get(new or "", 0) + 1]
+
+
+def _month(d: date) -> date:
+    return d.replace(day=1)
+
+
+def _next_month(d: date) -> date:
+    return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _upsert(conn, rows: list[dict]) -> None:
+    if not rows:
+        return
+    if conn.dialect.name == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+
+        stmt = insert(_TABLE)
+        stmt = stmt.on_duplicate_key_update(count=_TABLE.c["count"] + stmt.inserted["count"])
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+        stmt = insert(_TABLE)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[c.name for c in _TABLE.primary_key],
+            set_={"count": _TABLE.c["count"] + stmt.excluded["count"]},
+        )
+    conn.execute(stmt, rows)
+
+
+def _rows(counts: dict) -> list[dict]:
+    """{(day, metric, agent_id, source): n} → day + month rollup rows (same key ke month rows ek saath)."""
+    acc: dict = defaultdict(int)
+    for (day, metric, agent_id, source), n in counts.items():
+        if n and day is not None:
+            key = (metric, str(agent_id or ""), str(source or "")[:50])
+            acc[("day", day, *key)] += n
+            acc[("month", _month(day), *key)] += n
+    return [
+        {"period": p, "bucket": b, "metric": m, "agent_id": a, "source": s, "count": n}
+        for (p, b, m, a, s), n in acc.items()
+    ]
+
+
+def record_many(db, counts: dict) -> None:
+    """counts: {(day, metric, agent_id, source): n} — caller ke transaction mein (commit caller kare)."""
+    _upsert(db.connection(), _rows(counts))
+
+
+def _event_data(e) -> dict:
+    return json.loads(e.data) if e.data else {}
+
+
+def apply_events(db, events: list) -> None:
+    """lead_events batch → lead_funnel stages + lead_stats counters (consumer handler, commit bus karta hai)."""
+    ids = list({e.lead_id for e in events})
+    funnel = {f.lead_id: f for f in db.query(LeadFunnel).filter(LeadFunnel.lead_id.in_(ids))}
+    counts: dict = defaultdict(int)
+    for e in events:
+        day = _as_date(e.created_at)
+        f = funnel.get(e.lead_id)
+        if f is None:
+            # created event, ya backfill se pehle ka lead — ab se track
+            f = funnel[e.lead_id] = LeadFunnel(lead_id=e.lead_id)
+            db.add(f)
+        if e.event == "created":
+            if f.created_at is None:
+                f.created_at = e.created_at
+                counts[(day, "created", "", _event_data(e).get("source") or "unknown")] += 1
+        elif e.event == "assigned":
+            if not e.agent_id or _event_data(e).get("previousAgentId") == e.agent_id:
+                continue
+            if f.assigned_at is None:
+                f.assigned_at = e.created_at
+                counts[(day, "assigned", e.agent_id, "")] += 1
+            else:
+                counts[(day, "reassigned", e.agent_id, "")] += 1
+        elif e.event == "status_changed":
+            for stage in status_metrics(None, e.status):
+                if getattr(f, f"{stage}_at") is None:
+                    setattr(f, f"{stage}_at", e.created_at)
+                    counts[(day, stage, e.agent_id, "")] += 1
+        elif e.event in ("rejected", "expired"):
+            counts[(day, e.event, e.agent_id, "")] += 1
+    db.flush()
+    record_many(db, counts)
+
+
+def subscribe() -> None:
+    """Durable consumer register karo — app startup se (lead_events.ensure_started se pehle), import pe nahi."""
+    lead_events.subscribe(
+        _CONSUMER, apply_events, events={"created", "assigned", "status_changed", "rejected", "expired"}, durable=True
+    )
+
+
+# --- read ---
+
+
+def cover(start: date, end: date) -> list[tuple[str, date, date]]:
+    """[start, end] (inclusive) → [(period, first bucket, last bucket)] — poore mahine month rows se."""
+    parts: list[tuple[str, date, date]] = []
+    d = start
+    while d <= end:
+        month_end = _next_month(d) - timedelta(days=1)
+        if d.day == 1 and month_end <= end:
+            if parts and parts[-1][0] == "month":
+                parts[-1] = ("month", parts[-1][1], d)
+            else:
+                parts.append(("month", d, d))
+            d = _next_month(d)
+        else:
+            last = min(end, month_end)
+            parts.append(("day", d, last))
+            d = last + timedelta(days=1)
+    return parts
+
+
+def _range_filter(parts):
+    return or_(*[and_(LeadStat.period == p, LeadStat.bucket.between(lo, hi)) for p, lo, hi in parts])
+
+
+def totals(db, start: date, end: date, metrics=METRICS, by: str | None = None) -> dict:
+    """{metric: n} — by="agent" / "source" pe {metric: {key: n}}."""
+    cols = [LeadStat.metric]
+    if by == "agent":
+        cols.append(LeadStat.agent_id)
+    elif by == "source":
+        cols.append(LeadStat.source)
+    rows = (
+        db.query(*cols, func.sum(LeadStat.count))
+        .filter(LeadStat.metric.in_(metrics), _range_filter(cover(start, end)))
+        .group_by(*cols)
+        .all()
+    )
+    out: dict = {m: ({} if by else 0) for m in metrics}
+    for row in rows:
+        if by:
+            out[row[0]][row[1]] = out[row[0]].get(row[1], 0) + int(row[2] or 0)
+        else:
+            out[row[0]] += int(row[1] or 0)
+    return out
+
+
+def _week(d: date) -> date:
+    return d - timedelta(days=d.weekday())
+
+
+def series(db, metric: str, start: date, end: date, bucket: str = "day", by: str | None = None,
+           agent_id: str | None = None, source: str | None = None) -> list[dict]:
+    """Time-bucketed series — day / week (day rows se), month (poore mahine month rows, kinare day rows)."""
+    parts = cover(start, end) if bucket == "month" else [("day", start, end)]
+    cols = [LeadStat.bucket]
+    if by == "agent":
+        cols.append(LeadStat.agent_id)
+    elif by == "source":
+        cols.append(LeadStat.source)
+    q = db.query(*cols, func.sum(LeadStat.count)).filter(LeadStat.metric == metric, _range_filter(parts))
+    if agent_id is not None:
+        q = q.filter(LeadStat.agent_id == agent_id)
+    if source is not None:
+        q = q.filter(LeadStat.source == source)
+    keyer = {"day": lambda d: d, "week": _week, "month": _month}[bucket]
+    acc: dict = defaultdict(lambda: defaultdict(int))
+    for row in q.group_by(*cols).all():
+        b = row[0] if isinstance(row[0], date) else date.fromisoformat(str(row[0])[:10])
+        acc[keyer(b)][row[1] if by else ""] += int(row[-1] or 0)
+    # Khali buckets bhi (chart mein gap nahi)
+    out = []
+    b = keyer(start)
+    while b <= end:
+        values = acc.get(b, {})
+        item = {"bucket": b.isoformat(), "count": sum(values.values())}
+        if by:
+            item["by"] = dict(values)
+        out.append(item)
+        b = {"day": lambda d: d + timedelta(days=1), "week": lambda d: d + timedelta(days=7), "month": _next_month}[bucket](b)
+    return out
+
+
+# --- backfill ---
+
+
+def _as_date(value) -> date | None:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def rebuild(db) -> int:
+    """lead_funnel + lead_stats dobara (GROUP BY / INSERT … SELECT). Returns rollup rows likhe.
+    Leads ki maujooda halat: created = created_at din; assigned = assigned_at; accepted / site_visit / closed = lead
+    jis stage tak pahuncha (tareekh assigned_at, warna created_at). rejected / expired / reassigned = lead_events
+    mein jitni history bachi hai. Analytics consumer ka checkpoint max event id pe — aage wahan se."""
+    from app.core.checkpoints import set_checkpoint
+
+    day_of = func.date
+    active = or_(Lead.status.is_(None), Lead.status != "merged")
+    last_event = db.query(func.max(LeadEvent.id)).scalar() or 0
+    counts: dict = defaultdict(int)  # (day, metric, agent, source) → n
+    for d, source, n in (
+        db.query(day_of(Lead.created_at), Lead.source, func.count(Lead.id))
+        .filter(Lead.created_at.isnot(None), active)
+        .group_by(day_of(Lead.created_at), Lead.source)
+    ):
+        counts[(_as_date(d), "created", "", source or "unknown")] += n
+    for d, agent_id, n in (
+        db.query(day_of(Lead.assigned_at), Lead.assigned_agent_id, func.count(Lead.id))
+        .filter(Lead.assigned_agent_id.isnot(None), Lead.assigned_at.isnot(None), active)
+        .group_by(day_of(Lead.assigned_at), Lead.assigned_agent_id)
+    ):
+        counts[(_as_date(d), "assigned", agent_id, "")] += n
+    stage_day = func.coalesce(Lead.assigned_at, Lead.created_at)
+    for d, agent_id, status, n in (
+        db.query(day_of(stage_day), Lead.assigned_agent_id, Lead.status, func.count(Lead.id))
+        .filter(Lead.status.in_(list(_STATUS_RANK)), stage_day.isnot(None))
+        .group_by(day_of(stage_day), Lead.assigned_agent_id, Lead.status)
+    ):
+        for metric in status_metrics(None, status):
+            counts[(_as_date(d), metric, agent_id or "", "")] += n
+    for d, event, agent_id, n in (
+        db.query(day_of(LeadEvent.created_at), LeadEvent.event, LeadEvent.agent_id, func.count(LeadEvent.id))
+        .filter(LeadEvent.event.in_(("rejected", "expired")), LeadEvent.id <= last_event)
+        .group_by(day_of(LeadEvent.created_at), LeadEvent.event, LeadEvent.agent_id)
+    ):
+        counts[(_as_date(d), event, agent_id or "", "")] += n
+    # Reassigned: pehle assignment ke baad wale "assigned" events (agent badla ho)
+    assigns = (
+        db.query(LeadEvent.lead_id, LeadEvent.agent_id, LeadEvent.created_at, LeadEvent.data)
+        .filter(LeadEvent.event == "assigned", LeadEvent.agent_id.isnot(None), LeadEvent.id <= last_event)
+        .order_by(LeadEvent.lead_id, LeadEvent.id)
+    )
+    previous_lead = None
+    for lead_id, agent_id, at, data in assigns.yield_per(5000):
+        if (json.loads(data) if data else {}).get("previousAgentId") == agent_id:
+            continue
+        if lead_id == previous_lead:
+            counts[(_as_date(at), "reassigned", agent_id, "")] += 1
+        previous_lead = lead_id
+
+    db.query(LeadFunnel).delete(synchronize_session=False)
+    rank = case(*[(Lead.status == s, r) for s, r in _STATUS_RANK.items()], else_=0)
+    db.execute(
+        LeadFunnel.__table__.insert().from_select(
+            ["lead_id", "created_at", "assigned_at", "accepted_at", "site_visit_at", "closed_at"],
+            select(
+                Lead.id,
+                Lead.created_at,
+                Lead.assigned_at,
+                *[case((rank >= r, stage_day), else_=literal(None)) for r in range(1, len(_STAGES))],
+            ).where(active),
+        )
+    )
+    db.query(LeadStat).delete(synchronize_session=False)
+    rows = _rows(counts)
+    if rows:
+        db.execute(_TABLE.insert(), rows)
+    set_checkpoint(db, f"lead_events:{_CONSUMER}", last_event)
+    db.commit()
+    return len(rows)
@@ -0,0 +1,440 @@
+"""Cache layer — per-process module globals ki jagah ek pluggable backend.
+
+    CACHE_BACKEND=memory  (default) — sirf is process mein (Passenger single worker / local)
+    CACHE_BACKEND=sqlite  — same host ke sab workers (file + WAL); pub/sub events table poll se
+    CACHE_BACKEND=redis   — multi-host; Redis-protocol compatible (Valkey / KeyDB bhi). `pip install redis`
+
+    cache = get_cache()
+    cache.get_or_set(cache.vkey("listings", key), fn, ttl=120)
+    cache.bump("gemini")                 # version++ aur sab workers ko invalidation fan-out
+    cache.on_invalidate("gemini", cb)    # cb(namespace, version) — har process mein chalta hai
+
+Versioned keys: bump ke baad purani keys kabhi read nahi hoti (TTL pe khud expire) — delete scan nahi.
+Values JSON mein store hoti hain (tuple → list); None cache nahi hota. Shared backend down ho to
+cache miss ki tarah behave karta hai — request fail nahi hoti.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.core.responses import dumps
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").strip().lower()
+CACHE_PREFIX = os.getenv("CACHE_PREFIX", "lpg:")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "var", "cache.sqlite3"
+)
+CACHE_POLL_SECONDS = float(os.getenv("CACHE_POLL_SECONDS", "1"))  # sqlite pub/sub poll
+CACHE_VERSION_POLL_SECONDS = float(os.getenv("CACHE_VERSION_POLL_SECONDS", "2"))  # missed message fallback
+CACHE_MEMORY_MAX_KEYS = 10000
+INVALIDATE_CHANNEL = "invalidate"
+
+
+class MemoryBackend:
+    """Process-local dict + TTL. Publish sirf isi process ke subscribers tak."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._data: dict[str, tuple[bytes, float | None]] = {}
+        self._lock = threading.Lock()
+        self._subscribers: list = []
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            raw, expires = item
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return None
+        return json.loads(raw)
+
+    def set(self, key: str, value, ttl: float | None = None) -> None:
+        raw = dumps(value)
+        with self._lock:
+            if len(self._data) >= CACHE_MEMORY_MAX_KEYS:
+                now = time.monotonic()
+                for k in [k for k, (_, exp) in self._data.items() if exp is not None and exp <= now]:
+                    del self._data[k]
+            self._data[key] = (raw, time.monotonic() + ttl if ttl else None)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            item = self._data.get(key)
+            value = int(json.loads(item[0])) + 1 if item else 1
+            self._data[key] = (dumps(value), None)
+            return value
+
+    def publish(self, channel: str, message: str) -> None:
+        for ch, callback in list(self._subscribers):
+            if ch == channel:
+                callback(message)
+
+    def subscribe(self, channel: str, callback) -> None:
+        if (channel, callback) not in self._subscribers:
+            self._subscribers.append((channel, callback))
+
+
+class SqliteBackend:
+    """Same host ke workers ke liye shared cache — kv table + events table (pub/sub poll)."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._local = threading.local()
+        self._subscribers: list = []
+        self._listener_pid = None
+        self._conn().executescript(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL);"
+            "CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL,"
+            " message TEXT NOT NULL, created REAL NOT NULL);"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        # Per thread, per process — sqlite connection fork ke paar use nahi ho sakti
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str):
+        row = self._conn().execute("SELECT value, expires FROM kv WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] <= time.time():
+            self.delete(key)
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value, ttl: float | None = None) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires) VALUES (?, ?, ?)",
+            (key, dumps(value).decode("utf-8"), time.time() + ttl if ttl else None),
+        )
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def incr(self, key: str) -> int:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO kv (key, value, expires) VALUES (?, '1', NULL) "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+                (key,),
+            )
+            value = int(conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()[0])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def publish(self, channel: str, message: str) -> None:
+        conn = self._conn()
+        cur = conn.execute(
+            "INSERT INTO events (channel, message, created) VALUES (?, ?, ?)", (channel, message, time.time())
+        )
+        if cur.lastrowid % 100 == 0:
+            conn.execute("DELETE FROM events WHERE created < ?", (time.time() - 3600,))
+            conn.execute("DELETE FROM kv WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+
+    def subscribe(self, channel: str, callback) -> None:
+        if (channel, callback) not in self._subscribers:
+            self._subscribers.append((channel, callback))
+        self._ensure_listener()
+
+    def _ensure_listener(self) -> None:
+        if self._listener_pid == os.getpid():
+            return
+        self._listener_pid = os.getpid()
+        last_id = self._conn().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        threading.Thread(target=self._listen, args=(last_id,), name="lpg-cache-listener", daemon=True).start()
+
+    def _listen(self, last_id: int) -> None:
+        pid = os.getpid()
+        while self._listener_pid == pid:
+            time.sleep(CACHE_POLL_SECONDS)
+            try:
+                rows = self._conn().execute(
+                    "SELECT id, channel, message FROM events WHERE id > ? ORDER BY id", (last_id,)
+                ).fetchall()
+            except sqlite3.Error as e:
+                print(f"[LPG] Cache listener poll failed ({e})")
+                continue
+            for event_id, channel, message in rows:
+                last_id = event_id
+                for ch, callback in list(self._subscribers):
+                    if ch == channel:
+                        callback(message)
+
+
+class RedisBackend:
+    """Redis / Valkey / KeyDB — keys aur channels CACHE_PREFIX ke saath."""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        import redis  # optional dependency — sirf CACHE_BACKEND=redis pe
+
+        self._client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+        self._client.ping()
+        self._subscribers: list = []
+        self._listener_pid = None
+        self._listener = None
+
+    def get(self, key: str):
+        raw = self._client.get(CACHE_PREFIX + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value, ttl: float | None = None) -> None:
+        self._client.set(CACHE_PREFIX + key, dumps(value), ex=max(1, int(ttl)) if ttl else None)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(CACHE_PREFIX + key)
+
+    def incr(self, key: str) -> int:
+        return int(self._client.incr(CACHE_PREFIX + key))
+
+    def publish(self, channel: str, message: str) -> None:
+        self._client.publish(CACHE_PREFIX + channel, message)
+
+    def subscribe(self, channel: str, callback) -> None:
+        if (channel, callback) not in self._subscribers:
+            self._subscribers.append((channel, callback))
+            self._listener_pid = None  # naya channel — listener dobara subscribe kare
+        self._ensure_listener()
+
+    def _ensure_listener(self) -> None:
+        if self._listener_pid == os.getpid():
+            return
+        self._listener_pid = os.getpid()
+        if self._listener is not None:
+            try:
+                self._listener.stop()
+            except Exception:
+                pass
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{CACHE_PREFIX + ch: self._on_message for ch in {c for c, _ in self._subscribers}})
+        self._listener = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def _on_message(self, msg) -> None:
+        channel = msg["channel"].decode("utf-8")[len(CACHE_PREFIX):]
+        data = msg["data"].decode("utf-8") if isinstance(msg["data"], bytes) else str(msg["data"])
+        for ch, callback in list(self._subscribers):
+            if ch == channel:
+                callback(data)
+
+
+class Cache:
+    """Backend ke upar: error-tolerant get/set, versioned namespaces aur invalidation fan-out."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._versions: dict[str, tuple[int, float]] = {}  # namespace -> (version, checked_at)
+        self._callbacks: dict[str, list] = {}
+        self._channel_subs: dict[str, dict] = {}  # channel -> {callback: decoded handler}
+        self._subscribed_pid = None
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _error(self, op: str, e: Exception) -> None:
+        self.errors += 1
+        print(f"[LPG] Cache {op} failed ({e})")
+
+    def get(self, key: str):
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            self._error("get", e)
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value, ttl: float | None = None) -> None:
+        try:
+            self.backend.set(key, value, ttl)
+        except Exception as e:
+            self._error("set", e)
+
+    def delete(self, key: str) -> None:
+        try:
+            self.backend.delete(key)
+        except Exception as e:
+            self._error("delete", e)
+
+    def get_or_set(self, key: str, fn, ttl: float | None = None):
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = fn()
+        if value is not None:
+            self.set(key, value, ttl)
+        return value
+
+    def incr(self, key: str) -> int | None:
+        """Atomic counter (shared backend pe sab workers mein unique). Error pe None."""
+        try:
+            return self.backend.incr(key)
+        except Exception as e:
+            self._error("incr", e)
+            return None
+
+    def publish(self, channel: str, data: dict) -> None:
+        """Generic pub/sub — memory pe isi process ke subscribers, sqlite/redis pe sab workers."""
+        try:
+            self.backend.publish(channel, json.dumps(data, default=str))
+        except Exception as e:
+            self._error("publish", e)
+
+    def subscribe(self, channel: str, callback) -> None:
+        """callback(dict) — har process mein ek bar register karo (fork ke baad dobara call safe hai)."""
+        def _decode(message, _callback=callback):
+            try:
+                _callback(json.loads(message))
+            except Exception as e:
+                print(f"[LPG] Cache subscriber on '{channel}' failed ({e})")
+
+        with self._lock:
+            subs = self._channel_subs.setdefault(channel, {})
+            handler = subs.setdefault(callback, _decode)
+        try:
+            self.backend.subscribe(channel, handler)
+        except Exception as e:
+            self._error("subscribe", e)
+
+    @property
+    def shared(self) -> bool:
+        return self.backend.name != "memory"
+
+    def version(self, namespace: str) -> int:
+        """Namespace ka current version — CACHE_VERSION_POLL_SECONDS tak local memo."""
+        self._ensure_subscribed()
+        memo = self._versions.get(namespace)
+        if memo and time.monotonic() - memo[1] < CACHE_VERSION_POLL_SECONDS:
+            return memo[0]
+        try:
+            version = int(self.backend.get(f"v:{namespace}") or 0)
+        except Exception as e:
+            self._error("version", e)
+            return memo[0] if memo else 0
+        self._apply_version(namespace, version, fire_on_first=False)
+        return self._versions[namespace][0]
+
+    def vkey(self, namespace: str, key: str) -> str:
+        return f"{namespace}:v{self.version(namespace)}:{key}"
+
+    def bump(self, namespace: str) -> int:
+        """Namespace invalidate — version++, is process ke callbacks abhi, baaki workers ko publish."""
+        self._ensure_subscribed()
+        try:
+            version = self.backend.incr(f"v:{namespace}")
+        except Exception as e:
+            self._error("bump", e)
+            memo = self._versions.get(namespace)
+            version = (memo[0] if memo else 0) + 1
+        with self._lock:
+            self._versions[namespace] = (version, time.monotonic())
+        self._fire(namespace, version)
+        try:
+            self.backend.publish(INVALIDATE_CHANNEL, json.dumps({"ns": namespace, "v": version}))
+        except Exception as e:
+            self._error("publish", e)
+        return version
+
+    def on_invalidate(self, namespace: str, callback) -> None:
+        """callback(namespace, version) — kisi bhi worker mein bump ho to is process mein chalega."""
+        with self._lock:
+            callbacks = self._callbacks.setdefault(namespace, [])
+            if callback not in callbacks:
+                callbacks.append(callback)
+        self._ensure_subscribed()
+
+    def _ensure_subscribed(self) -> None:
+        # Listener thread fork ke baad child mein nahi hota — har process apna subscribe kare
+        if self._subscribed_pid == os.getpid():
+            return
+        self._subscribed_pid = os.getpid()
+        try:
+            self.backend.subscribe(INVALIDATE_CHANNEL, self._on_message)
+        except Exception as e:
+            self._error("subscribe", e)
+
+    def _on_message(self, message: str) -> None:
+        try:
+            data = json.loads(message)
+            self._apply_version(data["ns"], int(data["v"]), fire_on_first=True)
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"[LPG] Cache invalidation message ignored ({e})")
+
+    def _apply_version(self, namespace: str, version: int, fire_on_first: bool) -> None:
+        with self._lock:
+            memo = self._versions.get(namespace)
+            old = memo[0] if memo else None
+            self._versions[namespace] = (max(version, old or 0), time.monotonic())
+        if (old is None and fire_on_first) or (old is not None and version > old):
+            self._fire(namespace, version)
+
+    def _fire(self, namespace: str, version: int) -> None:
+        for callback in list(self._callbacks.get(namespace, ())):
+            try:
+                callback(namespace, version)
+            except Exception as e:
+                print(f"[LPG] Cache invalidation callback failed ({e})")
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "versions": {ns: v for ns, (v, _) in self._versions.items()},
+        }
+
+
+_cache: Cache | None = None
+_cache_lock = threading.Lock()
+
+
+def _make_backend(kind: str):
+    if kind == "redis":
+        return RedisBackend(REDIS_URL)
+    if kind == "sqlite":
+        return SqliteBackend(CACHE_SQLITE_PATH)
+    return MemoryBackend()
+
+
+def get_cache() -> Cache:
+    """Process-wide cache (lazy). Shared backend na mile to memory pe fallback."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    backend = _make_backend(CACHE_BACKEND)
+                except Exception as e:
+                    print(f"[LPG] Cache backend '{CACHE_BACKEND}' unavailable ({e}), using memory")
+                    backend = MemoryBackend()
+                _cache = Cache(backend)
+    return _cache
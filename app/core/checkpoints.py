@@ -0,0 +1,47 @@
+"""Job checkpoints — `job_checkpoints` table mein (name → position). Scoring / consumers restart pe wahin se.
+Lease rows (position = expiry epoch ms) — har worker mein chalne wale background job ka poore deployment mein ek runner.
+"""
+import math
+import time
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from app.models.job_checkpoint import JobCheckpoint
+
+
+def get_checkpoint(db, name: str) -> int | None:
+    row = db.get(JobCheckpoint, name)
+    return int(row.position) if row is not None else None
+
+
+def set_checkpoint(db, name: str, position: int) -> None:
+    """Caller commit kare (usi transaction mein jis mein kaam hua)."""
+    row = db.get(JobCheckpoint, name)
+    if row is None:
+        db.add(JobCheckpoint(name=name, position=position))
+    else:
+        row.position = position
+
+
+def claim_lease(db, name: str, seconds: float, held: int | None = None) -> int | None:
+    """Expired lease le lo (held=None) ya apna renew (held = pichla return). Returns naya expiry, ya None (kisi
+    aur worker ke paas). Compare-and-set UPDATE, khud commit karta hai. Milliseconds — same second mein do workers
+    ke claim ek hi position na likhen (warna purana holder renew ko apna samajh leta)."""
+    now = int(time.time() * 1000)
+    expires = now + max(1000, math.ceil(seconds * 1000))
+    table = JobCheckpoint.__table__
+    current = table.c.position == held if held is not None else table.c.position <= now
+    claimed = db.execute(
+        table.update().where(table.c.name == name, current).values(position=expires, updated_at=func.now())
+    ).rowcount
+    if not claimed and held is None and db.get(JobCheckpoint, name) is None:
+        db.add(JobCheckpoint(name=name, position=expires))
+        try:
+            db.commit()
+        except IntegrityError:  # doosre worker ne saath mein bana li
+            db.rollback()
+            return None
+        return expires
+    db.commit()
+    return expires if claimed else None
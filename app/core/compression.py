@@ -0,0 +1,170 @@
+"""Response compression — Accept-Encoding negotiate karke br (brotli installed ho to) ya gzip.
+- minimum_size se chhoti body as-is jati hai (compress ka faida nahi)
+- Streaming responses (more_body) chunk-by-chunk compress + flush hote hain
+- Images / already-encoded / SSE responses skip
+"""
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli optional
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))  # bytes
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))  # 4-5 = JSON pe fast + achha ratio
+
+_COMPRESSIBLE_PREFIXES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/",
+    "image/svg+xml",
+)
+_SKIP_TYPES = ("text/event-stream",)
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Accept-Encoding se best encoding — br > gzip. q=0 wali encoding reject."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def _is_compressible(content_type: str) -> bool:
+    ct = (content_type or "").lower()
+    if any(ct.startswith(t) for t in _SKIP_TYPES):
+        return False
+    return any(ct.startswith(t) for t in _COMPRESSIBLE_PREFIXES)
+
+
+class _Compressor:
+    """gzip / br streaming compressor — ek interface."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._c = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31 = gzip header
+
+    def chunk(self, data: bytes) -> bytes:
+        """Chunk compress + flush — client ko turant mil jaye (streaming)."""
+        if self.encoding == "br":
+            return self._c.process(data) + self._c.flush()
+        return self._c.compress(data) + self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._c.process(data) + self._c.finish()
+        return self._c.compress(data) + self._c.flush()
+
+
+class CompressionMiddleware:
+    """ASGI middleware — gzip/brotli with size threshold + streaming support."""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        gzip_level: int = GZIP_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, encoding, self)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send, encoding: str, cfg: CompressionMiddleware):
+        self._send = send
+        self.encoding = encoding
+        self.cfg = cfg
+        self.start_message = None
+        self.started = False
+        self.passthrough = False
+        self.compressor = None
+
+    async def send(self, message):
+        mtype = message["type"]
+        if mtype == "http.response.start":
+            # Body dekhe baghair decide nahi kar sakte — start hold karo
+            self.start_message = message
+            return
+        if mtype != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            headers = Headers(raw=self.start_message["headers"])
+            skip = (
+                "content-encoding" in headers
+                or not _is_compressible(headers.get("content-type", ""))
+                or (not more_body and len(body) < self.cfg.minimum_size)
+            )
+            if skip:
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding, self.cfg.gzip_level, self.cfg.brotli_quality)
+            mheaders = MutableHeaders(raw=list(self.start_message["headers"]))
+            mheaders["Content-Encoding"] = self.encoding
+            mheaders.add_vary_header("Accept-Encoding")
+            if more_body:
+                # Streaming — final size pata nahi
+                del mheaders["Content-Length"]
+                self.start_message["headers"] = mheaders.raw
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": self.compressor.chunk(body), "more_body": True})
+                return
+            data = self.compressor.finish(body)
+            mheaders["Content-Length"] = str(len(data))
+            self.start_message["headers"] = mheaders.raw
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": data})
+            return
+
+        if more_body:
+            await self._send({"type": "http.response.body", "body": self.compressor.chunk(body), "more_body": True})
+        else:
+            await self._send({"type": "http.response.body", "body": self.compressor.finish(body)})
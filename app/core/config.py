@@ -8,3 +8,14 @@ load_dotenv()
 def get_gemini_model() -> str:
     """Env se model — .env mein GEMINI_MODEL_NAME set karo."""
     return (os.getenv("GEMINI_MODEL_NAME") or "").strip() or "gemini-3-flash-preview"
+
+
+# Columnar property store (mmap) — scripts/build_property_store.py yahan likhta hai, `current` symlink atomic swap
+PROPERTY_STORE_DIR = os.getenv("PROPERTY_STORE_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "var", "property_store"
+)
+
+
+def property_store_built() -> bool:
+    """Store build hua hai? (numpy import kiye baghair check — cold start light rahe)"""
+    return os.path.islink(os.path.join(PROPERTY_STORE_DIR, "current"))
@@ -0,0 +1,16 @@
+"""google.generativeai lazy loader — SDK heavy hai (grpc/protobuf), app import pe load nahi karna.
+Pehli AI call / Gemini test pe load hota hai (Passenger spawn fast rehta hai)."""
+import threading
+
+_genai = None
+_lock = threading.Lock()
+
+
+def get_genai():
+    global _genai
+    if _genai is None:
+        with _lock:
+            if _genai is None:
+                import google.generativeai as genai
+                _genai = genai
+    return _genai
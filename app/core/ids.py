@@ -0,0 +1,77 @@
+"""Canonical IDs — API aur DB ke beech parse / format sirf yahan.
+
+Agents: DB mein sirf id ("7"), API pe "A7". Frontend "A7" / "7" / 7 kuch bhi bheje, parse_agent_id ek hi form deta hai.
+Leads: DB mein "L…" — naye "L" + 12 hex, purane numeric ids migration 6 ne "L<id>" kar diye. Frontend ke
+"L123" / "123" ek canonical id pe — lookup ek indexed equality query (prefix guessing nahi).
+Purana frontend alias "LD123" asli hex id bhi ho sakta hai ("LD" + sirf digits) — woh `resolve_lead_id()` se,
+exact id ka lead na ho tabhi "L123".
+"""
+import re
+import uuid
+
+AGENT_PREFIX = "A"
+LEAD_PREFIX = "L"
+_LEGACY_LEAD_RE = re.compile(r"LD(\d+)", re.IGNORECASE)
+_MERGE_HOPS = 3  # merged lead baad mein khud merge ho jaye (merge script) to chain
+
+
+def parse_agent_id(value) -> str | None:
+    """"A7" / "a7" / "7" / 7 → "7". Khali ya None → None."""
+    if value is None:
+        return None
+    raw = str(value).strip()
+    if raw[:1] in ("A", "a"):
+        raw = raw[1:]
+    return raw or None
+
+
+def format_agent_id(agent_id) -> str | None:
+    canonical = parse_agent_id(agent_id)
+    return f"{AGENT_PREFIX}{canonical}" if canonical else None
+
+
+def parse_lead_id(value) -> str | None:
+    """"L1A2B3C4D5E6F" / "L123" as-is; purana numeric "123" → "L123"."""
+    if value is None:
+        return None
+    raw = str(value).strip()
+    if not raw:
+        return None
+    if raw.isdigit():
+        return f"{LEAD_PREFIX}{raw}"
+    return raw
+
+
+def legacy_lead_id(value) -> str | None:
+    """"LD123" (purana frontend alias) → "L123"; baaki None."""
+    m = _LEGACY_LEAD_RE.fullmatch(str(value or "").strip())
+    return f"{LEAD_PREFIX}{m.group(1)}" if m else None
+
+
+def resolve_lead_ids(db, values, follow_merged: bool = False) -> list[str]:
+    """Canonical ids, order same, duplicates hata ke. "LD<digits>" exact id se lead na mile aur "L<digits>" mile
+    tabhi alias — ek IN query, sirf jab aise ids hon.
+    follow_merged: `status='merged'` row (dedupe / ingest ka queued id) → jis lead mein merge hua."""
+    from app.models.lead import Lead
+
+    ids = list(dict.fromkeys(filter(None, map(parse_lead_id, values))))
+    aliases = {i: legacy_lead_id(i) for i in ids if legacy_lead_id(i)}
+    if aliases:
+        found = {i for (i,) in db.query(Lead.id).filter(Lead.id.in_([*aliases, *aliases.values()]))}
+        ids = list(dict.fromkeys(aliases[i] if i not in found and aliases.get(i) in found else i for i in ids))
+    for _ in range(_MERGE_HOPS if follow_merged and ids else 0):
+        into = dict(db.query(Lead.id, Lead.merged_into).filter(Lead.id.in_(ids), Lead.merged_into.isnot(None)).all())
+        if not into:
+            break
+        ids = list(dict.fromkeys(into.get(i, i) for i in ids))
+    return ids
+
+
+def resolve_lead_id(db, value, follow_merged: bool = False) -> str | None:
+    ids = resolve_lead_ids(db, [value], follow_merged)
+    return ids[0] if ids else None
+
+
+def new_lead_id() -> str:
+    # 12 hex (48 bit) — 8 hex pe 100k leads ke baad collision ka chance kaafi tha
+    return LEAD_PREFIX + uuid.uuid4().hex[:12].upper()
@@ -0,0 +1,140 @@
+"""Same phone = same lead — `leads.phone_key` (E.164) pe duplicate dhoondo aur merge karo.
+
+Ek banda kai chat threads pe ya public form se bhi number deta hai; pehle har thread ka alag lead banta tha aur
+alag agents ko route hota tha. Ab:
+- Lead.phone set hote hi phone_key (attribute event) — ORM se likha har lead.
+- Upsert (ai_engine, public ingest): LEAD_DEDUPE_WINDOW_HOURS ke andar same phone_key ka active lead ho to
+  naya lead nahi, usi ko update.
+- Purane duplicates: merge_duplicates() (scripts/merge_duplicate_leads.py) — har duplicate window ke andar
+  sab se pehle lead mein merge, duplicate `status='merged'`, `merged_into=<id>`, agent se unlink.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, or_, text, update
+
+from app.core.phone import e164
+from app.models.lead import Lead
+
+LEAD_DEDUPE_WINDOW_HOURS = float(os.getenv("LEAD_DEDUPE_WINDOW_HOURS", "72"))
+MERGED_STATUS = "merged"
+_INACTIVE_STATUSES = (MERGED_STATUS, "closed")  # closed deal ke baad naya inquiry = naya lead
+# Duplicate ke ye fields keep lead mein jate hain jab wahan khali hon
+_FILL_FIELDS = ("name", "user_name", "budget", "property_interest", "property_id", "property_link", "ai_summary", "thread_id")
+
+
+@event.listens_for(Lead.phone, "set")
+def _set_phone_key(target, value, oldvalue, initiator):
+    target.phone_key = e164(value)
+
+
+def active_filter():
+    return or_(Lead.status.is_(None), Lead.status.notin_(_INACTIVE_STATUSES))
+
+
+def window_start(now: datetime | None = None, hours: float | None = None) -> datetime:
+    hours = LEAD_DEDUPE_WINDOW_HOURS if hours is None else hours
+    return (now or datetime.now(timezone.utc)) - timedelta(hours=hours)
+
+
+def find_duplicate(db, phone, now: datetime | None = None):
+    """Window ke andar same phone ka sab se purana active lead (ya None)."""
+    key = e164(phone)
+    if not key:
+        return None
+    return (
+        db.query(Lead)
+        .filter(Lead.phone_key == key, Lead.created_at >= window_start(now), active_filter())
+        .order_by(Lead.created_at, Lead.id)
+        .first()
+    )
+
+
+def _mapping_sql(dialect: str) -> str:
+    if dialect == "mysql":
+        earliest = "d.created_at - INTERVAL :minutes MINUTE"
+    else:
+        earliest = "datetime(d.created_at, '-' || :minutes || ' minutes')"
+    active = "({t}.status IS NULL OR {t}.status NOT IN ('merged', 'closed'))"
+    return (
+        "SELECT d.id, ("
+        " SELECT c.id FROM leads c"
+        " WHERE c.phone_key = d.phone_key AND " + active.format(t="c") +
+        " AND (c.created_at < d.created_at OR (c.created_at = d.created_at AND c.id < d.id))"
+        f" AND c.created_at >= {earliest}"
+        " ORDER BY c.created_at, c.id LIMIT 1"
+        ") AS keep_id"
+        " FROM leads d"
+        " WHERE " + active.format(t="d") +
+        " AND d.phone_key IN (SELECT phone_key FROM leads WHERE phone_key IS NOT NULL GROUP BY phone_key HAVING COUNT(*) > 1)"
+    )
+
+
+def merge_duplicates(db, hours: float | None = None, dry_run: bool = False) -> dict:
+    """Purane duplicates merge. Duplicate → keep mapping ek SQL query mein (ix_leads_phone_key_created),
+    field fill + duplicate mark primary-key bulk UPDATEs (executemany), ek commit.
+    Returns counts + `unassigned` (dup, agent) / `inherited` (keep, agent, assigned_at) — events ke liye."""
+    from app.core.lead_events import emit_many, event_row
+    from app.core.lead_versions import stamp_bulk
+
+    hours = LEAD_DEDUPE_WINDOW_HOURS if hours is None else hours
+    minutes = int(hours * 60)
+    pairs = db.execute(text(_mapping_sql(db.bind.dialect.name)), {"minutes": minutes}).all()
+    keep_of = {dup: keep for dup, keep in pairs if keep}
+    # A ← B ← C (C sirf B ki window mein): C bhi A mein — chain ka root
+    for dup in keep_of:
+        root = keep_of[dup]
+        while root in keep_of:
+            root = keep_of[root]
+        keep_of[dup] = root
+    result = {"duplicates": len(keep_of), "keptLeads": len(set(keep_of.values())), "unassigned": [], "inherited": []}
+    if dry_run or not keep_of:
+        return result
+
+    leads = {L.id: L for L in db.query(Lead).filter(Lead.id.in_(set(keep_of) | set(keep_of.values()))).all()}
+    groups: dict[str, list] = {}
+    for dup, keep in keep_of.items():
+        groups.setdefault(keep, []).append(leads[dup])
+    keep_updates, dup_updates, agents = [], [], []
+    for keep_id, dups in groups.items():
+        keep = leads[keep_id]
+        dups.sort(key=lambda L: (L.created_at, L.id), reverse=True)  # naya pehle
+        values = {"id": keep_id}
+        for field in _FILL_FIELDS:
+            current = getattr(keep, field)
+            values[field] = current or next((getattr(d, field) for d in dups if getattr(d, field)), current)
+        values["lead_score"] = max([keep.lead_score or 0] + [d.lead_score or 0 for d in dups])
+        values["assigned_agent_id"], values["assigned_at"], values["status"] = keep.assigned_agent_id, keep.assigned_at, keep.status
+        if not keep.assigned_agent_id:
+            # Duplicate pe agent kaam kar raha hai — wohi agent keep lead pe (sab se aage wala status)
+            worked = [d for d in dups if d.assigned_agent_id]
+            worked.sort(key=lambda L: (L.status != "new", L.assigned_at or L.created_at), reverse=True)
+            if worked:
+                w = worked[0]
+                values["assigned_agent_id"], values["assigned_at"], values["status"] = w.assigned_agent_id, w.assigned_at, w.status
+                result["inherited"].append((keep_id, w.assigned_agent_id, w.assigned_at))
+        keep_updates.append(values)
+        for d in dups:
+            dup_updates.append({"id": d.id, "keep": keep_id})
+            if d.assigned_agent_id:
+                result["unassigned"].append((d.id, d.assigned_agent_id))
+            agents.append(d.assigned_agent_id)
+        agents.append(values["assigned_agent_id"])
+    version = stamp_bulk(db, agents)
+    emit_many(
+        db,
+        [event_row("merged", u["id"], leads[u["id"]].assigned_agent_id, MERGED_STATUS, mergedInto=u["keep"]) for u in dup_updates]
+        + [event_row("assigned", keep_id, agent_id, reason="merge") for keep_id, agent_id, _ in result["inherited"]],
+    )
+    db.expunge_all()  # neeche bulk UPDATE by primary key — purane loaded objects flush na hon
+    db.execute(update(Lead), [{**u, "sync_version": version} for u in keep_updates])
+    db.execute(
+        update(Lead),
+        [
+            {"id": u["id"], "merged_into": u["keep"], "status": MERGED_STATUS, "assigned_agent_id": None,
+             "assigned_at": None, "sync_version": version}
+            for u in dup_updates
+        ],
+    )
+    db.commit()
+    return result
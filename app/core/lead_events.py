@@ -0,0 +1,246 @@
+"""Lead events outbox — har lead state change (create, assign, reroute, accept, reject, expiry, status, merge)
+`lead_events` mein ek row, change ke saath usi transaction mein (rollback pe event bhi nahi).
+
+Consumers: `lead_events.subscribe(name, handler, events=..., durable=...)` — ek background thread per process
+batches (LEAD_EVENTS_BATCH_SIZE, id order) `handler(db, events)` ko deta hai:
+- per-process (durable=False): har worker ko har event (in-memory state — expiry heap, caches). Position memory
+  mein, process start se aage.
+- durable=True: poore deployment mein ek baar. Position `job_checkpoints` ("lead_events:<name>") mein, handler ke
+  DB writes ke saath usi transaction mein compare-and-set — doosre worker ne batch le liya to rollback.
+  Handler fail → agli poll pe wahi batch dobara.
+
+Id gaps: lower id wala transaction baad mein commit ho sakta hai — batch gap pe ruk jata hai. Consumer gap ko
+pehli baar dekhne ke LEAD_EVENTS_SETTLE_SECONDS baad tak bhara nahi to rolled-back insert maan ke aage (event ka
+created_at emit ka waqt hai, commit ka nahi — lamba transaction us se settle nahi maana jata).
+Purane events LEAD_EVENTS_RETENTION_DAYS baad delete (sab durable consumers ke checkpoint tak hi).
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func
+
+from app.models.lead_event import LeadEvent
+
+LEAD_EVENTS_ENABLED = os.getenv("LEAD_EVENTS_ENABLED", "true").lower() not in ("false", "0", "no")
+LEAD_EVENTS_POLL_SECONDS = float(os.getenv("LEAD_EVENTS_POLL_SECONDS", "1"))
+LEAD_EVENTS_BATCH_SIZE = int(os.getenv("LEAD_EVENTS_BATCH_SIZE", "500"))
+LEAD_EVENTS_SETTLE_SECONDS = float(os.getenv("LEAD_EVENTS_SETTLE_SECONDS", "10"))
+LEAD_EVENTS_RETENTION_DAYS = float(os.getenv("LEAD_EVENTS_RETENTION_DAYS", "90"))  # 0 = kabhi delete nahi
+_PRUNE_EVERY_SECONDS = 3600
+_TABLE = LeadEvent.__table__
+
+
+def event_row(event: str, lead_id, agent_id=None, status: str | None = None, at: datetime | None = None, **data) -> dict:
+    data = {k: v for k, v in data.items() if v is not None}
+    return {
+        "lead_id": str(lead_id),
+        "event": event,
+        "agent_id": str(agent_id) if agent_id is not None else None,
+        "status": status,
+        "data": json.dumps(data, ensure_ascii=False, default=str) if data else None,
+        "created_at": at or datetime.now(timezone.utc),
+    }
+
+
+def emit(db, event: str, lead_id, agent_id=None, status: str | None = None, at: datetime | None = None, **data) -> None:
+    """Ek event — caller ke transaction mein (commit caller kare)."""
+    emit_many(db, [event_row(event, lead_id, agent_id, status, at, **data)])
+
+
+def emit_many(db, rows: list[dict]) -> None:
+    """Bulk paths — rows `event_row()` se; ek executemany INSERT."""
+    if rows:
+        db.connection().execute(_TABLE.insert(), rows)
+
+
+def event_view(e) -> dict:
+    return {
+        "id": e.id,
+        "leadId": e.lead_id,
+        "event": e.event,
+        "agentId": e.agent_id,
+        "status": e.status,
+        "data": json.loads(e.data) if e.data else {},
+        "createdAt": e.created_at.isoformat() if e.created_at else None,
+    }
+
+
+class Subscriber:
+    def __init__(self, name: str, handler, events: set | None, durable: bool):
+        self.name = name
+        self.handler = handler
+        self.events = events
+        self.durable = durable
+        self.position = None  # per-process: last delivered id
+        self.gaps: dict[int, float] = {}  # missing id → pehli baar kab dikha (monotonic)
+        self.delivered = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_delivered_at = None
+
+    @property
+    def checkpoint(self) -> str:
+        return f"lead_events:{self.name}"
+
+
+class LeadEventBus:
+    def __init__(self):
+        self._subscribers: dict[str, Subscriber] = {}
+        self._pid = None
+        self._lock = threading.Lock()
+        self._pruned_at = 0.0
+        self.polls = 0
+        self.pruned = 0
+
+    def subscribe(self, name: str, handler, events=None, durable: bool = False) -> None:
+        """handler(db, events: list[LeadEvent]) — `events` diya ho to sirf woh event types (position phir bhi aage
+        badhti hai). Handler commit na kare — durable pe us ke writes checkpoint ke saath commit hote hain.
+        Same name dobara = replace."""
+        self._subscribers[name] = Subscriber(name, handler, set(events) if events else None, durable)
+
+    def ensure_started(self) -> None:
+        if not LEAD_EVENTS_ENABLED or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            for sub in self._subscribers.values():
+                sub.position = None  # fork ke baad naye process ka apna start
+                sub.gaps = {}
+        threading.Thread(target=self._run, name="lpg-lead-events", daemon=True).start()
+
+    def _run(self) -> None:
+        from app.db.session import SessionLocal
+
+        pid = os.getpid()
+        while self._pid == pid:
+            db = SessionLocal()
+            busy = False
+            try:
+                busy = self.poll(db) >= LEAD_EVENTS_BATCH_SIZE
+                if LEAD_EVENTS_RETENTION_DAYS > 0 and time.monotonic() - self._pruned_at > _PRUNE_EVERY_SECONDS:
+                    self._pruned_at = time.monotonic()
+                    self.pruned += self.prune(db)
+            except Exception as e:
+                db.rollback()
+                print(f"[LPG] Lead events poll failed ({e})")
+            finally:
+                db.close()
+            if not busy:
+                time.sleep(LEAD_EVENTS_POLL_SECONDS)
+
+    def _fetch(self, db, sub: Subscriber, after: int) -> list:
+        rows = (
+            db.query(LeadEvent).filter(LeadEvent.id > after).order_by(LeadEvent.id).limit(LEAD_EVENTS_BATCH_SIZE).all()
+        )
+        now = time.monotonic()
+        expected = after + 1
+        for i, row in enumerate(rows):
+            if row.id != expected and now - sub.gaps.setdefault(expected, now) < LEAD_EVENTS_SETTLE_SECONDS:
+                rows = rows[:i]  # gap — shayad in-flight transaction; settle window tak ruko
+                break
+            expected = row.id + 1
+        upto = rows[-1].id if rows else after
+        sub.gaps = {gap: seen for gap, seen in sub.gaps.items() if gap > upto}
+        return rows
+
+    def _deliver(self, db, sub: Subscriber) -> int:
+        from app.core.checkpoints import get_checkpoint, set_checkpoint
+        from app.models.job_checkpoint import JobCheckpoint
+
+        if sub.durable:
+            position = get_checkpoint(db, sub.checkpoint)
+            if position is None:
+                # Naya consumer — purani history replay nahi, abhi se
+                set_checkpoint(db, sub.checkpoint, db.query(func.max(LeadEvent.id)).scalar() or 0)
+                db.commit()
+                return 0
+        else:
+            if sub.position is None:
+                sub.position = db.query(func.max(LeadEvent.id)).scalar() or 0
+                db.rollback()
+                return 0
+            position = sub.position
+        rows = self._fetch(db, sub, position)
+        if not rows:
+            db.rollback()
+            return 0
+        last = rows[-1].id
+        batch = [r for r in rows if sub.events is None or r.event in sub.events]
+        try:
+            if batch:
+                sub.handler(db, batch)
+            if sub.durable:
+                claimed = db.execute(
+                    JobCheckpoint.__table__.update()
+                    .where(JobCheckpoint.name == sub.checkpoint, JobCheckpoint.position == position)
+                    .values(position=last, updated_at=func.now())
+                ).rowcount
+                if not claimed:  # doosre worker ne yeh batch pehle kar diya
+                    db.rollback()
+                    return 0
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            sub.failures += 1
+            sub.last_error = str(e)[:200]
+            print(f"[LPG] Lead events consumer '{sub.name}' failed ({e})")
+            return 0
+        if not sub.durable:
+            sub.position = last
+        sub.delivered += len(batch)
+        sub.batches += 1
+        sub.last_delivered_at = datetime.now(timezone.utc)
+        return len(rows)
+
+    def poll(self, db) -> int:
+        """Har subscriber ka ek batch. Returns sab se bara batch (full = backlog, turant agla poll)."""
+        self.polls += 1
+        return max([self._deliver(db, sub) for sub in list(self._subscribers.values())] or [0])
+
+    def prune(self, db) -> int:
+        """Retention se purane events delete — kisi durable consumer ke checkpoint se aage ke nahi."""
+        from app.models.job_checkpoint import JobCheckpoint
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=LEAD_EVENTS_RETENTION_DAYS)
+        upto = db.query(func.max(LeadEvent.id)).filter(LeadEvent.created_at < cutoff).scalar()
+        if not upto:
+            return 0
+        durable = [s.checkpoint for s in self._subscribers.values() if s.durable]
+        if durable:
+            floor = db.query(func.min(JobCheckpoint.position)).filter(JobCheckpoint.name.in_(durable)).scalar()
+            upto = min(upto, floor or 0)
+        deleted = db.query(LeadEvent).filter(LeadEvent.id <= upto).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+    def status(self) -> dict:
+        return {
+            "enabled": LEAD_EVENTS_ENABLED,
+            "running": self._pid == os.getpid(),
+            "polls": self.polls,
+            "pruned": self.pruned,
+            "subscribers": [
+                {
+                    "name": s.name,
+                    "durable": s.durable,
+                    "events": sorted(s.events) if s.events else None,
+                    "position": s.position,
+                    "delivered": s.delivered,
+                    "batches": s.batches,
+                    "failures": s.failures,
+                    "lastError": s.last_error,
+                    "pendingGaps": len(s.gaps),
+                    "lastDeliveredAt": s.last_delivered_at.isoformat() if s.last_delivered_at else None,
+                }
+                for s in self._subscribers.values()
+            ],
+        }
+
+
+lead_events = LeadEventBus()
@@ -0,0 +1,212 @@
+"""Lead expiry sweeper — `status='new'` leads jo agent ne expiry minutes mein accept nahi kiye, unlink.
+
+Partner poll pe sweep nahi hota. Ek background thread min-heap (assigned_at, lead_id) rakhta hai aur
+agli expiry tak sota hai; jagne pe ek set-based UPDATE (cutoff se purane sab) chalata hai.
+Heap order assigned_at pe hai, to admin expiry minutes badle to bhi order sahi rehta hai.
+Doosre workers ke assignments lead_events "assigned" se heap mein aate hain (per-process consumer);
+LEAD_SWEEP_MAX_IDLE_SECONDS pe fallback sweep phir bhi (events band / consumer peeche ho to).
+Heap har worker mein, sweep (aur us ke baad routing assign_pending / rebuild) sirf ek mein — `job_checkpoints`
+lease ("lead_expiry:lease"); baaki workers jagte hain, lease nahi milti to skip. Lease har sweep pe renew, do idle
+intervals tak — runner mar jaye to doosra worker itni der mein le leta hai.
+"""
+import heapq
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.checkpoints import claim_lease
+from app.core.lead_events import emit_many, event_row, lead_events
+
+LEAD_SWEEPER_ENABLED = os.getenv("LEAD_SWEEPER_ENABLED", "true").lower() not in ("false", "0", "no")
+LEAD_SWEEP_MAX_IDLE_SECONDS = float(os.getenv("LEAD_SWEEP_MAX_IDLE_SECONDS", "60"))
+_SWEEP_CHUNK = 500
+_LEASE = "lead_expiry:lease"
+_LEASE_SECONDS = 2 * LEAD_SWEEP_MAX_IDLE_SECONDS  # runner har idle interval pe renew karta hai
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # DB naive datetime de sakta hai — UTC assume
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _expire_minutes(db=None) -> int:
+    from app.api.admin_settings import get_lead_expire_minutes
+
+    minutes, _ = get_lead_expire_minutes(db)
+    return max(1, minutes)
+
+
+def sweep_expired(db) -> list[tuple[str, str]]:
+    """Cutoff se pehle assign hue `new` leads unlink. Returns (lead_id, previous_agent_id) — sirf jo sach mein
+    unlink hue (routing engine reassign mein pichla agent skip karta hai).
+    Rows SELECT … FOR UPDATE SKIP LOCKED (accept / reroute beech mein ho to woh row agli sweep pe), UPDATE
+    unhi ids pe; events updated rows ke."""
+    from app.core.lead_versions import stamp_bulk
+    from app.models.lead import Lead
+
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=_expire_minutes(db))
+    expired_filter = (
+        Lead.status == "new",
+        Lead.assigned_agent_id.isnot(None),
+        Lead.assigned_at.isnot(None),
+        Lead.assigned_at < cutoff,
+    )
+    rows = db.query(Lead.id, Lead.assigned_agent_id).filter(*expired_filter).with_for_update(skip_locked=True).all()
+    expired = [(str(i), str(a)) for i, a in rows]
+    if not expired:
+        db.rollback()
+        return []
+    version = stamp_bulk(db, [a for _, a in expired])
+    ids = [i for i, _ in expired]
+    updated = 0
+    for start in range(0, len(ids), _SWEEP_CHUNK):
+        updated += db.query(Lead).filter(Lead.id.in_(ids[start:start + _SWEEP_CHUNK]), *expired_filter).update(
+            {"assigned_agent_id": None, "assigned_at": None, "sync_version": version}, synchronize_session=False
+        )
+    if updated != len(expired):
+        # Row locks na hon (SQLite) to SELECT ke baad row badal sakti hai — jin pe is transaction ka version laga wohi
+        stamped = {
+            i
+            for (i,) in db.query(Lead.id).filter(
+                Lead.id.in_(ids), Lead.sync_version == version, Lead.assigned_agent_id.is_(None)
+            )
+        }
+        expired = [(i, a) for i, a in expired if i in stamped]
+    emit_many(db, [event_row("expired", lead_id, agent_id, "new") for lead_id, agent_id in expired])
+    db.commit()
+    return expired
+
+
+class ExpirySweeper:
+    def __init__(self):
+        self._heap: list[tuple[float, str]] = []  # (assigned_at epoch, lead_id)
+        self._cond = threading.Condition()
+        self._pid = None
+        self._listeners: list = []
+        self._lease = None  # claim_lease ka return — is worker ke paas sweep lease
+        self.sweeps = 0
+        self.skipped = 0  # lease kisi aur worker ke paas
+        self.unlinked = 0
+        self.last_sweep_at = None
+
+    def ensure_started(self) -> None:
+        """Per process ek thread (prefork ke baad har worker apna). Lifespan na ho (Passenger) to pehli use pe."""
+        if not LEAD_SWEEPER_ENABLED or self._pid == os.getpid():
+            return
+        with self._cond:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._heap = []
+            self._lease = None
+        threading.Thread(target=self._run, name="lpg-lead-expiry", daemon=True).start()
+
+    def add_listener(self, fn) -> None:
+        """fn(db, expired) — har sweep ke baad (expired khali bhi ho sakta hai), usi session ke saath."""
+        if fn not in self._listeners:
+            self._listeners.append(fn)
+
+    def schedule(self, lead_id, assigned_at: datetime) -> None:
+        """Lead assign hua — is ki expiry pe jagna hai."""
+        self.ensure_started()
+        with self._cond:
+            heapq.heappush(self._heap, (_as_utc(assigned_at).timestamp(), str(lead_id)))
+            self._cond.notify()
+
+    def _load_pending(self) -> None:
+        from app.db.session import SessionLocal
+        from app.models.lead import Lead
+
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(Lead.id, Lead.assigned_at)
+                .filter(Lead.status == "new", Lead.assigned_agent_id.isnot(None), Lead.assigned_at.isnot(None))
+                .all()
+            )
+        finally:
+            db.close()
+        with self._cond:
+            for lead_id, assigned_at in rows:
+                heapq.heappush(self._heap, (_as_utc(assigned_at).timestamp(), str(lead_id)))
+
+    def _sweep(self) -> None:
+        from app.db.session import SessionLocal
+
+        db = SessionLocal()
+        try:
+            lease = claim_lease(db, _LEASE, _LEASE_SECONDS, held=self._lease) if self._lease is not None else None
+            self._lease = lease or claim_lease(db, _LEASE, _LEASE_SECONDS)
+            if self._lease is None:
+                self.skipped += 1
+                return
+            expired = sweep_expired(db)
+            self.sweeps += 1
+            self.unlinked += len(expired)
+            for fn in list(self._listeners):
+                try:
+                    fn(db, expired)
+                except Exception as e:
+                    db.rollback()
+                    print(f"[LPG] Expiry listener failed ({e})")
+        finally:
+            db.close()
+        self.last_sweep_at = datetime.now(timezone.utc)
+
+    def _run(self) -> None:
+        pid = os.getpid()
+        try:
+            self._load_pending()
+        except Exception as e:
+            print(f"[LPG] Expiry sweeper initial load failed ({e})")
+        last_sweep = 0.0
+        while self._pid == pid:
+            try:
+                window = _expire_minutes() * 60
+            except Exception as e:
+                print(f"[LPG] Expiry sweeper settings read failed ({e})")
+                window = 60
+            now = time.time()
+            due = False
+            with self._cond:
+                while self._heap and self._heap[0][0] + window <= now:
+                    heapq.heappop(self._heap)
+                    due = True
+                if not due:
+                    idle = LEAD_SWEEP_MAX_IDLE_SECONDS - (time.monotonic() - last_sweep)
+                    wait = idle if not self._heap else min(idle, self._heap[0][0] + window - now)
+                    if wait > 0:
+                        self._cond.wait(wait)
+                        continue
+            try:
+                self._sweep()
+            except Exception as e:
+                print(f"[LPG] Expiry sweep failed ({e})")
+            last_sweep = time.monotonic()
+
+    def status(self) -> dict:
+        with self._cond:
+            next_at = self._heap[0][0] if self._heap else None
+        return {
+            "running": self._pid == os.getpid(),
+            "sweepLease": self._lease is not None and self._lease > time.time() * 1000,
+            "pending": len(self._heap),
+            "nextAssignedAt": datetime.fromtimestamp(next_at, timezone.utc).isoformat() if next_at else None,
+            "sweeps": self.sweeps,
+            "skipped": self.skipped,
+            "unlinked": self.unlinked,
+            "lastSweepAt": self.last_sweep_at.isoformat() if self.last_sweep_at else None,
+        }
+
+
+expiry_sweeper = ExpirySweeper()
+
+
+def _schedule_assigned(db, events) -> None:
+    # Kisi bhi worker ka assignment — is process ke heap mein bhi (sweep set-based hai, duplicate entry no-op)
+    for e in events:
+        expiry_sweeper.schedule(e.lead_id, e.created_at)
+
+
+lead_events.subscribe("expiry_schedule", _schedule_assigned, events={"assigned"})
@@ -0,0 +1,254 @@
+"""Public lead ingest (POST /api/leads) — pehle local SQLite journal, phir background batch insert.
+
+Request path: ek journal INSERT (WAL, same host ke sab workers ki ek file) aur turant `{"success", "id"}` —
+campaign spike pe MySQL pe per-request insert/commit/refresh ka jhagra nahi. Lead id pehle se bana hota hai.
+Worker thread journal se LEAD_INGEST_BATCH_SIZE rows claim karta hai → ek transaction mein insert → commit →
+routing → journal se delete. Crash beech mein ho to rows dobara claim hoti hain; jo id pehle se `leads` mein
+hai wo skip (replay idempotent).
+
+Dedupe: same phone_key (E.164) LEAD_DEDUPE_WINDOW_HOURS ke andar — batch ke andar aur DB ke active leads se
+(app.core.lead_dedupe) — naya lead nahi banta, context purane lead mein merge. Client ko diya queued id phir
+bhi ek `status='merged'` row ban jata hai (`merged_into` = asal lead), to us id ka lookup 404 nahi deta.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.ids import new_lead_id
+from app.core.lead_expiry import _as_utc
+from app.core.phone import e164
+
+LEAD_INGEST_ENABLED = os.getenv("LEAD_INGEST_ENABLED", "true").lower() not in ("false", "0", "no")
+LEAD_INGEST_JOURNAL = os.getenv("LEAD_INGEST_JOURNAL") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "var", "lead_ingest.sqlite3"
+)
+LEAD_INGEST_BATCH_SIZE = int(os.getenv("LEAD_INGEST_BATCH_SIZE", "200"))
+LEAD_INGEST_FLUSH_SECONDS = float(os.getenv("LEAD_INGEST_FLUSH_SECONDS", "0.2"))
+_CLAIM_TIMEOUT_SECONDS = 60  # claim karne wala worker mar gaya to rows itni der baad doosra uthaye
+DEFAULT_LEAD_NAME = "Web Visitor"
+
+
+def merge_submission(lead, name: str | None, context: str | None) -> None:
+    """Duplicate submission — purane lead mein jo missing hai woh bharo, naya context append."""
+    if name and name != DEFAULT_LEAD_NAME and (not lead.name or lead.name == DEFAULT_LEAD_NAME):
+        lead.name = name
+    if context and context not in (lead.context or ""):
+        lead.context = f"{lead.context}\n{context}" if lead.context else context
+
+
+class LeadIngestQueue:
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._ready = False
+        self.enqueued = 0
+        self.inserted = 0
+        self.merged = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_batch_size = 0
+        self.last_flush_ms = None
+        self.max_flush_ms = 0.0
+        self._flush_ms_total = 0.0
+        self._batch_rows_total = 0
+        self.last_flush_at = None
+
+    def _conn(self) -> sqlite3.Connection:
+        # Per thread, per process (cache.SqliteBackend jaisa)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            if not self._ready:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._ready:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS pending (seq INTEGER PRIMARY KEY AUTOINCREMENT, lead_id TEXT NOT NULL,"
+                    " payload TEXT NOT NULL, enqueued REAL NOT NULL, claimed_by INTEGER, claimed_at REAL)"
+                )
+                self._ready = True
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def ensure_started(self) -> None:
+        """Per process ek flush thread. Lifespan na ho (Passenger) to pehle enqueue pe."""
+        if not LEAD_INGEST_ENABLED or self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        threading.Thread(target=self._run, name="lpg-lead-ingest", daemon=True).start()
+
+    def enqueue(self, name: str | None, phone: str, context: str | None) -> str:
+        """Journal mein append (durable) — returns lead id. Insert worker karega."""
+        self.ensure_started()
+        lead_id = new_lead_id()
+        payload = json.dumps({"name": name, "phone": phone, "context": context}, ensure_ascii=False)
+        self._conn().execute(
+            "INSERT INTO pending (lead_id, payload, enqueued) VALUES (?, ?, ?)", (lead_id, payload, time.time())
+        )
+        self.enqueued += 1
+        self._wake.set()
+        return lead_id
+
+    def _claim(self) -> list[tuple[int, str, dict, float]]:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT seq, lead_id, payload, enqueued FROM pending"
+                " WHERE claimed_by IS NULL OR claimed_at < ? ORDER BY seq LIMIT ?",
+                (now - _CLAIM_TIMEOUT_SECONDS, LEAD_INGEST_BATCH_SIZE),
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    "UPDATE pending SET claimed_by = ?, claimed_at = ? WHERE seq = ?",
+                    [(os.getpid(), now, r[0]) for r in rows],
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [(seq, lead_id, json.loads(payload), enqueued) for seq, lead_id, payload, enqueued in rows]
+
+    def _release(self, seqs: list[int]) -> None:
+        self._conn().executemany("UPDATE pending SET claimed_by = NULL WHERE seq = ?", [(s,) for s in seqs])
+
+    def flush(self) -> int:
+        """Ek batch journal → leads. Returns claimed rows (0 = journal khali)."""
+        from app.core.lead_dedupe import LEAD_DEDUPE_WINDOW_HOURS, MERGED_STATUS, active_filter, window_start
+        from app.core.lead_events import emit_many, event_row
+        from app.core.lead_routing import routing_engine
+        from app.db.session import SessionLocal
+        from app.models.lead import Lead
+
+        rows = self._claim()
+        if not rows:
+            return 0
+        started = time.monotonic()
+        db = SessionLocal()
+        try:
+            existing = {i for (i,) in db.query(Lead.id).filter(Lead.id.in_([r[1] for r in rows])).all()}
+            window = timedelta(hours=LEAD_DEDUPE_WINDOW_HOURS)
+            keys = {e164(r[2]["phone"]) for r in rows} - {None}
+            first = {}  # phone_key → (lead_id ya Lead, created_at) — window ka sab se purana active lead
+            if keys:
+                for lead_id, key, created_at in (
+                    db.query(Lead.id, Lead.phone_key, Lead.created_at)
+                    .filter(
+                        Lead.phone_key.in_(keys),
+                        Lead.created_at >= window_start(datetime.fromtimestamp(rows[0][3], timezone.utc)),
+                        active_filter(),
+                    )
+                    .order_by(Lead.created_at, Lead.id)
+                ):
+                    first.setdefault(key, (lead_id, _as_utc(created_at)))
+            new_leads = []
+            stubs = []
+            merged = 0
+            for _, lead_id, data, enqueued in rows:
+                if lead_id in existing:  # pichla flush commit ke baad journal delete se pehle ruka
+                    continue
+                key = e164(data["phone"])
+                created = datetime.fromtimestamp(enqueued, timezone.utc)
+                dup = first.get(key) if key else None
+                if dup is not None and dup[1] >= created - window:
+                    target = dup[0] if isinstance(dup[0], Lead) else db.get(Lead, dup[0])
+                    if target is not None:
+                        merge_submission(target, data["name"], data["context"])
+                        # Queued id client ke paas hai — merged row, lookup merged_into se target tak
+                        stub = Lead(
+                            id=lead_id,
+                            name=data["name"] or DEFAULT_LEAD_NAME,
+                            phone=data["phone"],
+                            context=data["context"],
+                            source="AI Chat",
+                            created_at=created,
+                            status=MERGED_STATUS,
+                            merged_into=target.id,
+                        )
+                        db.add(stub)
+                        stubs.append(stub)
+                        merged += 1
+                        continue
+                lead = Lead(
+                    id=lead_id,
+                    name=data["name"] or DEFAULT_LEAD_NAME,
+                    phone=data["phone"],
+                    context=data["context"],
+                    source="AI Chat",
+                    created_at=created,
+                )
+                db.add(lead)
+                new_leads.append(lead)
+                if key:
+                    first.setdefault(key, (lead, created))
+            emit_many(db, [event_row("created", L.id, status="new", at=L.created_at, source=L.source) for L in new_leads])
+            emit_many(db, [event_row("merged", S.id, status=MERGED_STATUS, mergedInto=S.merged_into) for S in stubs])
+            for lead in new_leads:  # insert + assign ek commit
+                routing_engine.assign(db, lead.id, lead.context or "")
+            db.commit()
+            self._conn().executemany("DELETE FROM pending WHERE seq = ?", [(r[0],) for r in rows])
+        except Exception:
+            db.rollback()
+            self._release([r[0] for r in rows])
+            raise
+        finally:
+            db.close()
+        elapsed = (time.monotonic() - started) * 1000
+        self.batches += 1
+        self.inserted += len(new_leads)
+        self.merged += merged
+        self.last_batch_size = len(rows)
+        self._batch_rows_total += len(rows)
+        self.last_flush_ms = round(elapsed, 1)
+        self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+        self._flush_ms_total += elapsed
+        self.last_flush_at = datetime.now(timezone.utc)
+        return len(rows)
+
+    def _run(self) -> None:
+        pid = os.getpid()
+        while self._pid == pid:
+            self._wake.wait(LEAD_INGEST_FLUSH_SECONDS)
+            self._wake.clear()
+            try:
+                while self.flush() >= LEAD_INGEST_BATCH_SIZE:
+                    pass  # backlog — bina ruke agla batch
+            except Exception as e:
+                self.failures += 1
+                print(f"[LPG] Lead ingest flush failed ({e})")
+                time.sleep(min(5.0, LEAD_INGEST_FLUSH_SECONDS * 10))  # DB down — journal mein rehne do
+
+    def status(self) -> dict:
+        backlog, oldest = self._conn().execute("SELECT COUNT(*), MIN(enqueued) FROM pending").fetchone()
+        return {
+            "enabled": LEAD_INGEST_ENABLED,
+            "running": self._pid == os.getpid(),
+            "backlog": backlog,
+            "oldestPendingSeconds": round(time.time() - oldest, 1) if oldest else None,
+            "enqueued": self.enqueued,
+            "inserted": self.inserted,
+            "merged": self.merged,
+            "batches": self.batches,
+            "failures": self.failures,
+            "lastBatchSize": self.last_batch_size,
+            "avgBatchSize": round(self._batch_rows_total / self.batches, 1) if self.batches else None,
+            "lastFlushMs": self.last_flush_ms,
+            "avgFlushMs": round(self._flush_ms_total / self.batches, 1) if self.batches else None,
+            "maxFlushMs": self.max_flush_ms,
+            "lastFlushAt": self.last_flush_at.isoformat() if self.last_flush_at else None,
+        }
+
+
+lead_ingest = LeadIngestQueue(LEAD_INGEST_JOURNAL)
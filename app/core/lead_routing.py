@@ -0,0 +1,281 @@
+"""Lead routing engine — naya lead bante hi agent ko assign (admin ke reroute ka intezar nahi).
+
+Agents (status active + routing_enabled) `specialization` ke areas ("DHA, Bahria Town") ke hisaab se
+per-area queues mein; har queue ek deque jisme agent apne weight jitni baar interleaved (weighted round-robin):
+pick = deque rotate, O(1) — sirf cap pe pahunche / excluded agents skip hote hain. Koi area match na ho to
+general queue (sab eligible agents).
+
+Load cap: agent ke paas ROUTING_MAX_PENDING_PER_AGENT se zyada `new` (unaccepted) leads nahi — kisi ne bhi
+assign kiya ho (engine / admin). Loads DB se rebuild pe (ROUTING_REFRESH_SECONDS, agent change, har expiry
+sweep); beech mein memory mein: assign / `hold()` pe +1, lead `new` se nikle ya agent se hate to `release()`.
+Expired / rejected leads isi engine se dobara assign hote hain (expiry sweeper listener), pichla agent skip.
+Area match: lead text mein specialization area poore lafz / phrase ke taur pe, lamba pehle ("dha phase 6"
+lead "dha phase 6" queue mein, "dha" wali mein nahi).
+
+`assign()` caller ke transaction mein likhta hai, commit caller karta hai. Expiry schedule / SSE publish commit
+ke baad (after_commit), rollback pe load wapas.
+Har worker ka apna engine — round-robin position worker-local, loads DB se sync rehte hain.
+"""
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_cache
+from app.core.ids import parse_agent_id
+from app.core.lead_events import emit
+from app.core.lead_expiry import expiry_sweeper
+from app.core.lead_stream import lead_stream, partner_lead_view
+from app.core.lead_versions import stamp_bulk
+
+ROUTING_ENABLED = os.getenv("ROUTING_ENABLED", "true").lower() not in ("false", "0", "no")
+ROUTING_MAX_PENDING_PER_AGENT = int(os.getenv("ROUTING_MAX_PENDING_PER_AGENT", "10"))  # 0 = no cap
+ROUTING_REFRESH_SECONDS = float(os.getenv("ROUTING_REFRESH_SECONDS", "60"))
+ROUTING_PENDING_BATCH = 100  # har sweep pe itne unassigned leads tak
+AGENTS_NAMESPACE = "agents"
+_SPEC_SPLIT_RE = re.compile(r"\s*(?:[,/;|]|\band\b)\s*")
+_TXN_ROUTED = "routing_assigned"
+
+
+def _parse_weights(raw: str) -> dict[str, int]:
+    """ROUTING_WEIGHTS="7:2,9:3" — agent id → weight (default 1)."""
+    weights = {}
+    for part in (raw or "").split(","):
+        if ":" in part:
+            aid, w = part.split(":", 1)
+            try:
+                weights[parse_agent_id(aid)] = max(1, int(w))
+            except ValueError:
+                pass
+    return weights
+
+
+ROUTING_WEIGHTS = _parse_weights(os.getenv("ROUTING_WEIGHTS", ""))
+
+
+def specialization_areas(specialization: str | None) -> list[str]:
+    if not specialization:
+        return []
+    return [" ".join(a.split()) for a in _SPEC_SPLIT_RE.split(specialization.lower().strip()) if a.strip()]
+
+
+def _area_regex(areas) -> re.Pattern | None:
+    names = sorted(areas, key=len, reverse=True)  # "dha phase 6" pehle, "dha" baad mein
+    return re.compile(r"(?<!\w)(" + "|".join(map(re.escape, names)) + r")(?!\w)") if names else None
+
+
+def _weighted_deque(agent_ids: list[str]) -> deque:
+    """Weights interleave karo: [a, b, a] (a=2, b=1) — ek hi agent lagataar nahi aata."""
+    rounds = max((ROUTING_WEIGHTS.get(a, 1) for a in agent_ids), default=0)
+    return deque(a for r in range(rounds) for a in agent_ids if ROUTING_WEIGHTS.get(a, 1) > r)
+
+
+class RoutingEngine:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queues: dict[str, deque] = {}
+        self._area_re = None
+        self._general: deque = deque()
+        self._load: dict[str, int] = {}
+        self._built_at = 0.0
+        self._version = None
+        self.assigned = 0
+        self.unroutable = 0
+
+    # --- build ---
+
+    def _stale(self) -> bool:
+        return (
+            not self._built_at
+            or time.monotonic() - self._built_at > ROUTING_REFRESH_SECONDS
+            or self._version != get_cache().version(AGENTS_NAMESPACE)
+        )
+
+    def rebuild(self, db) -> None:
+        from sqlalchemy import func, or_
+        from app.models.agent import Agent
+        from app.models.lead import Lead
+
+        version = get_cache().version(AGENTS_NAMESPACE)
+        agents = (
+            db.query(Agent.id, Agent.specialization)
+            .filter(Agent.routing_enabled.is_(True), or_(Agent.status == "active", Agent.status.is_(None)))
+            .order_by(Agent.created_at, Agent.id)
+            .all()
+        )
+        load_rows = (
+            db.query(Lead.assigned_agent_id, func.count(Lead.id))
+            .filter(Lead.status == "new", Lead.assigned_agent_id.isnot(None))
+            .group_by(Lead.assigned_agent_id)
+            .all()
+        )
+        by_area: dict[str, list[str]] = {}
+        for agent_id, spec in agents:
+            for area in specialization_areas(spec):
+                by_area.setdefault(area, []).append(str(agent_id))
+        load: dict[str, int] = {}
+        for agent_id, count in load_rows:
+            key = parse_agent_id(agent_id)
+            load[key] = load.get(key, 0) + count
+        with self._lock:
+            self._queues = {area: _weighted_deque(ids) for area, ids in by_area.items()}
+            self._area_re = _area_regex(self._queues)
+            self._general = _weighted_deque([str(a) for a, _ in agents])
+            self._load = load
+            self._built_at = time.monotonic()
+            self._version = version
+
+    def invalidate(self) -> None:
+        """Agent create/update/delete/routing toggle ke baad — sab workers agli pick pe rebuild."""
+        self._built_at = 0.0
+        get_cache().bump(AGENTS_NAMESPACE)
+
+    # --- pick ---
+
+    def _queue_for(self, area_text: str) -> deque | None:
+        """Text mein jo area sab se pehle aaye (same jagah pe lamba wala) us ki queue."""
+        if self._area_re is None or not area_text:
+            return None
+        m = self._area_re.search(" ".join(area_text.lower().split()))
+        return self._queues[m.group(1)] if m else None
+
+    def _take(self, queue: deque, exclude: set) -> str | None:
+        for _ in range(len(queue)):
+            agent_id = queue[0]
+            queue.rotate(-1)
+            if agent_id in exclude:
+                continue
+            if ROUTING_MAX_PENDING_PER_AGENT and self._load.get(agent_id, 0) >= ROUTING_MAX_PENDING_PER_AGENT:
+                continue
+            return agent_id
+        return None
+
+    def pick(self, area_text: str = "", exclude: set | None = None) -> str | None:
+        exclude = exclude or set()
+        with self._lock:
+            queue = self._queue_for(area_text)
+            agent_id = (self._take(queue, exclude) if queue else None) or self._take(self._general, exclude)
+            if agent_id:
+                self._load[agent_id] = self._load.get(agent_id, 0) + 1
+        return agent_id
+
+    def hold(self, agent_id) -> None:
+        """Engine ke bahar `new` lead agent ko mila (admin reroute, status wapas `new`)."""
+        if agent_id is None:
+            return
+        key = parse_agent_id(agent_id)
+        with self._lock:
+            self._load[key] = self._load.get(key, 0) + 1
+
+    def release(self, agent_id) -> None:
+        """Lead agent ke `new` pending se nikla (accept / reject / expire / status change / reroute)."""
+        if agent_id is None:
+            return
+        key = parse_agent_id(agent_id)
+        with self._lock:
+            if self._load.get(key, 0) > 0:
+                self._load[key] -= 1
+
+    # --- assign ---
+
+    def assign(self, db, lead_id, area_text: str = "", exclude: set | None = None) -> str | None:
+        """Unassigned `new` lead ko agent do — caller ke transaction mein, commit caller kare (create + assign,
+        reject + reassign ek saath). Conditional UPDATE — doosra worker pehle assign kar de to no-op."""
+        if not ROUTING_ENABLED:
+            return None
+        from app.api.admin_settings import get_lead_expire_minutes
+        from app.models.lead import Lead
+
+        if self._stale():
+            self.rebuild(db)
+        agent_id = self.pick(area_text, exclude)
+        if agent_id is None:
+            self.unroutable += 1
+            return None
+        now = datetime.now(timezone.utc)
+        db.flush()
+        updated = (
+            db.query(Lead)
+            .filter(Lead.id == lead_id, Lead.status == "new", Lead.assigned_agent_id.is_(None))
+            .update({"assigned_agent_id": agent_id, "assigned_at": now}, synchronize_session=False)
+        )
+        if updated != 1:
+            self.release(agent_id)
+            return None
+        version = stamp_bulk(db, [agent_id])
+        db.query(Lead).filter(Lead.id == lead_id).update({"sync_version": version}, synchronize_session=False)
+        emit(db, "assigned", lead_id, agent_id, "new", at=now, by="routing")
+        # SSE item abhi bana lo — after_commit mein SQL nahi chal sakti
+        lead = db.query(Lead).populate_existing().filter(Lead.id == lead_id).one()
+        view = partner_lead_view(lead, max(1, get_lead_expire_minutes(db)[0]))
+        db.info.setdefault(_TXN_ROUTED, []).append((str(lead_id), agent_id, now, view))
+        return agent_id
+
+    def _committed(self, routed: list) -> None:
+        for lead_id, agent_id, at, view in routed:
+            self.assigned += 1
+            expiry_sweeper.schedule(lead_id, at)
+            lead_stream.publish(agent_id, "assigned", lead=view)
+
+    def _rolled_back(self, routed: list) -> None:
+        for _, agent_id, _, _ in routed:
+            self.release(agent_id)
+
+    def assign_pending(self, db, expired: list | None = None) -> int:
+        """Expired leads (pichla agent skip) + baaki unassigned `new` leads assign karo. Expiry sweeper listener."""
+        from app.models.lead import Lead
+
+        if not ROUTING_ENABLED:
+            return 0
+        self.rebuild(db)  # sweep ke baad loads DB se sahi
+        previous = {lead_id: {parse_agent_id(agent_id)} for lead_id, agent_id in (expired or [])}
+        rows = (
+            db.query(Lead.id, Lead.property_interest, Lead.context)
+            .filter(Lead.status == "new", Lead.assigned_agent_id.is_(None))
+            .order_by(Lead.created_at)
+            .limit(ROUTING_PENDING_BATCH)
+            .all()
+        )
+        count = 0
+        for lead_id, interest, context in rows:
+            area_text = " ".join(filter(None, [interest, context]))
+            if self.assign(db, lead_id, area_text, exclude=previous.get(str(lead_id))):
+                db.commit()
+                count += 1
+        return count
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": ROUTING_ENABLED,
+                "areas": {area: len(set(q)) for area, q in self._queues.items()},
+                "agents": len(set(self._general)),
+                "load": dict(self._load),
+                "maxPendingPerAgent": ROUTING_MAX_PENDING_PER_AGENT,
+                "assigned": self.assigned,
+                "unroutable": self.unroutable,
+                "builtSecondsAgo": round(time.monotonic() - self._built_at, 1) if self._built_at else None,
+            }
+
+
+routing_engine = RoutingEngine()
+expiry_sweeper.add_listener(routing_engine.assign_pending)
+
+
+@event.listens_for(Session, "after_commit")
+def _routing_committed(session):
+    routed = session.info.pop(_TXN_ROUTED, None)
+    if routed:
+        routing_engine._committed(routed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _routing_rolled_back(session):
+    routed = session.info.pop(_TXN_ROUTED, None)
+    if routed:
+        routing_engine._rolled_back(routed)
@@ -0,0 +1,272 @@
+"""Lead scoring — `leads.lead_score` (0-100) NumPy batches mein, taake partners / admins priority se kaam karein.
+
+Features (har batch ke arrays, ek saath vector ops):
+- budget: "2 crore" / "50 lac" / "25,00,000" → rupees, log scale (10 lac = 0, ~3 crore+ = 1)
+- engagement: thread ke user messages (count, log) × recency (7 din half-weight decay)
+- interest: property_interest / context mein inventory ka area — us area ki listings (log) aur budget mein
+  sab se sasti listing aati hai ya nahi; property_id ho to seedha poora
+- phone: valid Pakistani number (E.164 ban sake)
+
+Modes: incremental (background thread, har LEAD_SCORING_INTERVAL_SECONDS) — `sync_version` checkpoint ke
+baad badle leads + naye chat messages wale threads; full (`python scripts/score_leads.py --full`) — poori table
+keyset batches mein (recency decay time ke saath badalta hai — nightly chalao). Sirf badle scores bulk UPDATE.
+Thread har worker mein hai lekin chalta ek hi hai — `job_checkpoints` lease ("lead_scoring:lease"), jo le le
+wahi us interval ka run karta hai (har batch ke baad renew; fresh deploy ka full scan bhi ek hi worker).
+"""
+import math
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import func, update
+
+from app.core.checkpoints import claim_lease
+from app.core.phone import e164
+
+LEAD_SCORING_INTERVAL_SECONDS = float(os.getenv("LEAD_SCORING_INTERVAL_SECONDS", "60"))  # 0 = background off
+LEAD_SCORING_BATCH_SIZE = int(os.getenv("LEAD_SCORING_BATCH_SIZE", "2000"))
+WEIGHTS = {"budget": 0.25, "engagement": 0.30, "interest": 0.30, "phone": 0.15}
+_ENGAGED_MESSAGES = 20  # itne user messages pe engagement poora
+_RECENCY_DAYS = 7.0
+_CHECKPOINT_VERSION = "lead_scoring:version"
+_CHECKPOINT_CHAT = "lead_scoring:chat_message"
+_LEASE = "lead_scoring:lease"
+
+_UNITS = {
+    "crore": 1e7, "crores": 1e7, "cr": 1e7, "karor": 1e7, "karod": 1e7,
+    "lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "lacs": 1e5, "lak": 1e5, "lk": 1e5,
+    "million": 1e6, "thousand": 1e3, "hazar": 1e3,
+}
+_BUDGET_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(" + "|".join(sorted(_UNITS, key=len, reverse=True)) + r")?\b", re.I)
+
+
+def parse_budget_rupees(text) -> float:
+    """"1.5 crore" → 15000000.0, "50 lac" → 5000000.0, "25,00,000" → 2500000.0; range mein bari value.
+    Pehchan na ho → nan."""
+    best = math.nan
+    for number, unit in _BUDGET_RE.findall(str(text or "").replace(",", "")):
+        value = float(number) * _UNITS[unit.lower()] if unit else float(number)
+        if value >= 1e5 and not value <= best:  # unit ke baghair chhota number (marla, bedrooms) budget nahi
+            best = value
+    return best
+
+
+class Inventory:
+    """Areas (lowercase) + har area ki listings count / min price — property store se, warna DB GROUP BY."""
+
+    def __init__(self, stats: list[tuple]):
+        stats = [(str(name).strip().lower(), count, min_price) for name, count, min_price, *_ in stats if name]
+        self.names = [s[0] for s in stats]
+        self.counts = np.array([s[1] for s in stats] + [0], dtype=np.float64)  # last = "no area"
+        self.min_price = np.array([s[2] if s[2] is not None else np.nan for s in stats] + [np.nan])
+        self._index = {name: i for i, name in enumerate(self.names)}
+        names = sorted(self.names, key=len, reverse=True)  # "dha phase 6" pehle, "dha" baad mein
+        self._re = re.compile(r"(?<!\w)(" + "|".join(map(re.escape, names)) + r")(?!\w)") if names else None
+
+    @classmethod
+    def load(cls, db) -> "Inventory":
+        from app.core.property_store import get_store
+        from app.models.property import Property
+
+        store = get_store()
+        if store is not None:
+            return cls(store.area_stats())
+        rows = (
+            db.query(Property.location_name, func.count(Property.id), func.min(Property.price))
+            .filter(Property.location_name.isnot(None))
+            .group_by(Property.location_name)
+            .all()
+        )
+        return cls([(name, count, float(p) if p is not None else None) for name, count, p in rows])
+
+    def area_of(self, text: str) -> int:
+        """Text mein jo area sab se pehle aaye uska index; na mile to -1."""
+        if self._re is None or not text:
+            return -1
+        m = self._re.search(text.lower())
+        return self._index[m.group(1)] if m else -1
+
+
+def score_features(budget, messages, last_message_age_days, area_idx, has_property, phone_valid, has_interest,
+                   inventory: Inventory) -> np.ndarray:
+    """Sab arrays same length — returns int16 scores 0-100. Koi Python loop nahi."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        budget_score = np.nan_to_num(np.clip((np.log10(budget) - 6.0) / 2.5, 0.0, 1.0))
+        recency = 0.5 + 0.5 * np.exp(-np.nan_to_num(last_message_age_days, nan=np.inf) / _RECENCY_DAYS)
+        engagement = np.minimum(1.0, np.log1p(messages) / np.log1p(_ENGAGED_MESSAGES)) * recency
+        counts = inventory.counts[area_idx]  # -1 → last slot (0 listings)
+        depth = np.log1p(counts) / max(np.log1p(inventory.counts.max()), 1e-9)
+        interest = np.where(area_idx >= 0, 0.5 + 0.5 * depth, np.where(has_interest, 0.2, 0.0))
+        unaffordable = budget < inventory.min_price[area_idx]  # nan → False
+        interest = np.where(unaffordable, interest * 0.5, interest)
+        interest = np.where(has_property, 1.0, interest)
+    total = (
+        WEIGHTS["budget"] * budget_score
+        + WEIGHTS["engagement"] * engagement
+        + WEIGHTS["interest"] * interest
+        + WEIGHTS["phone"] * phone_valid
+    )
+    return np.rint(100 * total).astype(np.int16)
+
+
+def _engagement(db, thread_ids: list[str]) -> dict:
+    """thread_id → (user messages, last message at) — batch ke threads ek GROUP BY mein."""
+    from app.models.chat_message import ChatMessage
+
+    if not thread_ids:
+        return {}
+    rows = (
+        db.query(ChatMessage.thread_id, func.count(ChatMessage.id), func.max(ChatMessage.created_at))
+        .filter(ChatMessage.thread_id.in_(thread_ids), ChatMessage.role == "user")
+        .group_by(ChatMessage.thread_id)
+        .all()
+    )
+    return {thread_id: (count, last) for thread_id, count, last in rows}
+
+
+def _age_days(dt, now: float) -> float:
+    if dt is None:
+        return math.nan
+    ts = (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
+    return max(0.0, (now - ts) / 86400)
+
+
+def score_rows(db, rows, inventory: Inventory) -> np.ndarray:
+    """rows: (id, budget, property_interest, property_id, context, phone, thread_id, ...) — batch ke scores."""
+    now = time.time()
+    engaged = _engagement(db, list({r.thread_id for r in rows if r.thread_id}))
+    n = len(rows)
+    budget = np.fromiter((parse_budget_rupees(r.budget) for r in rows), dtype=np.float64, count=n)
+    stats = [engaged.get(r.thread_id, (0, None)) for r in rows]
+    messages = np.fromiter((s[0] for s in stats), dtype=np.float64, count=n)
+    age = np.fromiter((_age_days(s[1], now) for s in stats), dtype=np.float64, count=n)
+    text = [" ".join(filter(None, [r.property_interest, r.context])) for r in rows]
+    area_idx = np.fromiter((inventory.area_of(t) for t in text), dtype=np.int64, count=n)
+    has_property = np.fromiter((bool(r.property_id) for r in rows), dtype=bool, count=n)
+    phone_valid = np.fromiter((e164(r.phone) is not None for r in rows), dtype=np.float64, count=n)
+    has_interest = np.fromiter((bool(t.strip()) for t in text), dtype=bool, count=n)
+    return score_features(budget, messages, age, area_idx, has_property, phone_valid, has_interest, inventory)
+
+
+class LeadScorer:
+    def __init__(self):
+        self._pid = None
+        self._lock = threading.Lock()  # ek process mein ek run
+        self.runs = 0
+        self.skipped = 0  # lease kisi aur worker ke paas
+        self.last_run = None
+
+    def ensure_started(self) -> None:
+        if LEAD_SCORING_INTERVAL_SECONDS <= 0 or self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        threading.Thread(target=self._run, name="lpg-lead-scoring", daemon=True).start()
+
+    def _run(self) -> None:
+        from app.db.session import SessionLocal
+
+        pid = os.getpid()
+        while self._pid == pid:
+            db = SessionLocal()
+            try:
+                lease = claim_lease(db, _LEASE, LEAD_SCORING_INTERVAL_SECONDS)
+                if lease is None:
+                    self.skipped += 1
+                else:
+                    self.run(db, full=False, lease=lease)
+            except Exception as e:
+                db.rollback()
+                print(f"[LPG] Lead scoring failed ({e})")
+            finally:
+                db.close()
+            time.sleep(LEAD_SCORING_INTERVAL_SECONDS)
+
+    def _score_batch(self, db, rows, inventory: Inventory) -> int:
+        from app.core.lead_versions import stamp_bulk
+        from app.models.lead import Lead
+
+        scores = score_rows(db, rows, inventory)
+        current = np.fromiter((r.lead_score or 0 for r in rows), dtype=np.int64, count=len(rows))
+        changed = np.flatnonzero(scores != current)
+        if len(changed):
+            version = stamp_bulk(db, [rows[i].assigned_agent_id for i in changed])
+            db.execute(
+                update(Lead),
+                [{"id": rows[i].id, "lead_score": int(scores[i]), "sync_version": version} for i in changed],
+            )
+        db.commit()
+        return len(changed)
+
+    def run(self, db, full: bool = False, lease: int | None = None) -> dict:
+        """full=False: checkpoint ke baad badle leads. Returns {mode, scored, updated, seconds, leadsPerSecond}.
+        lease (claim_lease ka return): har batch ke baad renew — chhin jaye to run wahin ruk jata hai, checkpoint
+        aage nahi."""
+        from app.core.checkpoints import get_checkpoint, set_checkpoint
+        from app.core.lead_dedupe import active_filter
+        from app.core.lead_versions import current_version
+        from app.models.chat_message import ChatMessage
+        from app.models.lead import Lead
+
+        held = lease is not None
+        with self._lock:
+            started = time.monotonic()
+            # Scan se PEHLE — beech ke writes agle run mein (apne score UPDATEs bhi, jo phir no-op hote hain)
+            version = current_version(db)
+            last_message = db.query(func.max(ChatMessage.id)).scalar() or 0
+            since_version = None if full else get_checkpoint(db, _CHECKPOINT_VERSION)
+            since_message = None if full else get_checkpoint(db, _CHECKPOINT_CHAT)
+            incremental = since_version is not None and since_message is not None
+            inventory = Inventory.load(db)
+            columns = (
+                Lead.id, Lead.budget, Lead.property_interest, Lead.property_id, Lead.context, Lead.phone,
+                Lead.thread_id, Lead.lead_score, Lead.assigned_agent_id,
+            )
+            base = db.query(*columns).filter(active_filter())
+            if incremental:
+                chatted = db.query(ChatMessage.thread_id).filter(ChatMessage.id > since_message).distinct()
+                base = base.filter((Lead.sync_version > since_version) | Lead.thread_id.in_(chatted))
+            scored = updated = 0
+            last_id = None
+            while True:
+                q = base if last_id is None else base.filter(Lead.id > last_id)
+                rows = q.order_by(Lead.id).limit(LEAD_SCORING_BATCH_SIZE).all()
+                if not rows:
+                    break
+                updated += self._score_batch(db, rows, inventory)
+                scored += len(rows)
+                last_id = rows[-1].id
+                if lease is not None:
+                    lease = claim_lease(db, _LEASE, LEAD_SCORING_INTERVAL_SECONDS, held=lease)
+                    if lease is None:
+                        print("[LPG] Lead scoring lease lost, run stopped")
+                        break
+            if lease is not None or not held:
+                set_checkpoint(db, _CHECKPOINT_VERSION, version)
+                set_checkpoint(db, _CHECKPOINT_CHAT, last_message)
+                db.commit()
+            seconds = time.monotonic() - started
+            self.runs += 1
+            self.last_run = {
+                "mode": "incremental" if incremental else "full",
+                "scored": scored,
+                "updated": updated,
+                "seconds": round(seconds, 3),
+                "leadsPerSecond": round(scored / seconds) if seconds > 0 and scored else None,
+                "at": datetime.now(timezone.utc).isoformat(),
+            }
+            return self.last_run
+
+    def status(self) -> dict:
+        return {
+            "running": self._pid == os.getpid(),
+            "intervalSeconds": LEAD_SCORING_INTERVAL_SECONDS,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "lastRun": self.last_run,
+        }
+
+
+lead_scorer = LeadScorer()
@@ -0,0 +1,213 @@
+"""Per-agent lead events — partner dashboard poll ki jagah SSE push (GET /api/partner/leads/stream).
+
+    publish(agent_id, "assigned", lead=partner_lead_view(...))   # reroute / routing engine
+    publish(agent_id, "expired" | "rejected" | "unassigned", leadId=...)
+    publish(agent_id, "status_changed", leadId=..., status=...)
+
+Event id "<epoch>-<seq>": seq cache counter se (shared backend pe sab workers mein unique), epoch
+memory backend pe process boot time — restart ke baad purana Last-Event-ID pehchan mein aata hai aur client
+ko "reset" (poora list dobara fetch) milta hai. Har process ek ring buffer (LEAD_STREAM_BUFFER) rakhta hai;
+reconnect pe Last-Event-ID ke baad wale events replay, buffer se purana ho to "reset".
+
+CACHE_BACKEND=memory pe events sirf usi worker ke subscribers tak — multi-worker pe sqlite/redis rakho.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from app.core.cache import get_cache
+from app.core.ids import parse_agent_id
+from app.core.lead_expiry import expiry_sweeper
+
+LEAD_STREAM_BUFFER = int(os.getenv("LEAD_STREAM_BUFFER", "2000"))
+LEAD_STREAM_HEARTBEAT_SECONDS = float(os.getenv("LEAD_STREAM_HEARTBEAT_SECONDS", "20"))
+LEAD_STREAM_CHANNEL = "lead_events"
+_SEQ_KEY = "lead_stream:seq"
+BOOT_EPOCH = str(int(time.time()))
+
+
+def partner_lead_view(lead, expire_minutes: int) -> dict:
+    """Partner list ka lead item — GET /api/partner/leads aur stream events dono yahi shape bhejte hain."""
+    assigned_at = lead.assigned_at
+    expires_at = None
+    if assigned_at and lead.status == "new":
+        # assigned_at + admin-set minutes (DB may return naive datetime, assume UTC)
+        dt = assigned_at if assigned_at.tzinfo else assigned_at.replace(tzinfo=timezone.utc)
+        expires_at = (dt + timedelta(minutes=expire_minutes)).isoformat()
+    return {
+        "id": lead.id,
+        "userName": lead.user_name or lead.name or "",
+        "name": lead.name or lead.user_name or "",
+        "phone": lead.phone or "",
+        "propertyInterest": lead.property_interest or "",
+        "budget": lead.budget or "",
+        "leadScore": lead.lead_score or 0,
+        "status": lead.status or "new",
+        "aiSummary": lead.ai_summary or "",
+        "source": lead.source or "AI Search",
+        "createdAt": lead.created_at.isoformat() if lead.created_at else None,
+        "expiresAt": expires_at,
+        "assignedAt": assigned_at.isoformat() if assigned_at else None,
+    }
+
+
+def _agent_key(agent_id) -> str:
+    return parse_agent_id(agent_id)
+
+
+class LeadStream:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffer: deque = deque(maxlen=LEAD_STREAM_BUFFER)
+        self._subscribers: dict[str, set] = {}  # agent -> {(loop, asyncio.Queue)}
+        self._local_seq = 0
+        self._subscribed_pid = None
+        self.published = 0
+
+    def _epoch(self) -> str:
+        return "s" if get_cache().shared else BOOT_EPOCH
+
+    def _ensure_subscribed(self) -> None:
+        if self._subscribed_pid == os.getpid():
+            return
+        self._subscribed_pid = os.getpid()
+        get_cache().subscribe(LEAD_STREAM_CHANNEL, self._deliver)
+
+    def publish(self, agent_id, event_type: str, **data) -> None:
+        """Kisi bhi thread se call safe (endpoints, expiry sweeper)."""
+        if agent_id is None:
+            return
+        self._ensure_subscribed()
+        cache = get_cache()
+        seq = cache.incr(_SEQ_KEY) if cache.shared else None
+        if seq is None:
+            with self._lock:
+                self._local_seq += 1
+                seq = self._local_seq
+        event = {
+            "id": f"{self._epoch()}-{seq}",
+            "seq": seq,
+            "agentId": _agent_key(agent_id),
+            "type": event_type,
+            "ts": datetime.now(timezone.utc).isoformat(),
+            **data,
+        }
+        self.published += 1
+        cache.publish(LEAD_STREAM_CHANNEL, event)  # memory backend pe seedha _deliver
+
+    def _deliver(self, event: dict) -> None:
+        with self._lock:
+            self._buffer.append(event)
+            targets = list(self._subscribers.get(event["agentId"], ()))
+        for loop, queue in targets:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:  # loop band ho chuka
+                pass
+
+    def subscribe(self, agent_id) -> tuple:
+        self._ensure_subscribed()
+        sub = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers.setdefault(_agent_key(agent_id), set()).add(sub)
+        return sub
+
+    def unsubscribe(self, agent_id, sub) -> None:
+        with self._lock:
+            subs = self._subscribers.get(_agent_key(agent_id))
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[_agent_key(agent_id)]
+
+    def replay(self, agent_id, last_event_id: str | None) -> tuple[list, bool]:
+        """Last-Event-ID ke baad is agent ke events. Returns (events, reset_needed)."""
+        if not last_event_id:
+            return [], False
+        epoch, _, seq = last_event_id.rpartition("-")
+        try:
+            seq = int(seq)
+        except ValueError:
+            return [], True
+        if epoch != self._epoch():
+            return [], True
+        key = _agent_key(agent_id)
+        with self._lock:
+            oldest = self._buffer[0]["seq"] if self._buffer else None
+            events = [e for e in self._buffer if e["agentId"] == key and e["seq"] > seq]
+        # Buffer mein gap (purane events nikal gaye) — poora list dobara lo
+        return events, oldest is not None and oldest > seq + 1
+
+    def current_id(self) -> str | None:
+        with self._lock:
+            return self._buffer[-1]["id"] if self._buffer else None
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "epoch": self._epoch(),
+                "buffered": len(self._buffer),
+                "subscribers": {a: len(s) for a, s in self._subscribers.items()},
+                "published": self.published,
+            }
+
+
+lead_stream = LeadStream()
+
+
+def publish_assigned(db, lead_id, agent_id) -> None:
+    """Naya assignment agent ko poore lead item ke saath (dashboard list mein seedha jod de)."""
+    from app.api.admin_settings import get_lead_expire_minutes
+    from app.models.lead import Lead
+
+    lead = db.query(Lead).filter(Lead.id == lead_id).first()
+    if lead is None:
+        return
+    minutes, _ = get_lead_expire_minutes(db)
+    lead_stream.publish(agent_id, "assigned", lead=partner_lead_view(lead, max(1, minutes)))
+
+
+def _publish_expired(db, expired: list) -> None:
+    for lead_id, agent_id in expired:
+        lead_stream.publish(agent_id, "expired", leadId=lead_id)
+
+
+# Routing engine ke reassign listener se pehle register (lead_routing is module ko import karta hai)
+expiry_sweeper.add_listener(_publish_expired)
+
+
+def format_sse(event: dict) -> str:
+    from app.core.responses import dumps
+
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {dumps(event).decode('utf-8')}\n\n"
+
+
+async def agent_event_stream(request, agent_id, last_event_id: str | None):
+    """SSE generator — replay, phir live events; LEAD_STREAM_HEARTBEAT_SECONDS pe comment ping (proxy timeout)."""
+    sub = lead_stream.subscribe(agent_id)
+    _, queue = sub
+    try:
+        events, reset = lead_stream.replay(agent_id, last_event_id)
+        yield "retry: 3000\n\n"
+        if reset:
+            yield format_sse({"id": lead_stream.current_id() or f"{lead_stream._epoch()}-0", "type": "reset"})
+        last_seq = 0
+        for event in events:
+            last_seq = event["seq"]
+            yield format_sse(event)
+        while True:
+            if await request.is_disconnected():
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=LEAD_STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if event["seq"] <= last_seq:  # replay aur live ke overlap wala
+                continue
+            yield format_sse(event)
+    finally:
+        lead_stream.unsubscribe(agent_id, sub)
@@ -0,0 +1,212 @@
+"""Lead-set versions — partner / admin lead lists ke ETag (304) aur `since=<version>` delta sync.
+
+Do counters, do kaam:
+- Cache namespaces "leads" (global) aur "leads:agent:<id>" — commit ke BAAD bump. Shared cache backend
+  (sqlite / redis) pe ETag inhi se banta hai (handler DB se pehle padhta hai), to unchanged list pe 304 bina DB
+  query. Memory backend pe yeh counters sirf is worker ke hain — wahan ETag DB version se (ek PK read).
+- DB counter `lead_sync.version` — har lead-writing transaction ek version leta hai, rows pe
+  `leads.sync_version` stamp. Version alag chhote transaction mein allocate hota hai (counter row ka lock
+  milliseconds, lead writes serialize nahi) — apne chhote pool (LEAD_SYNC_POOL_SIZE) se, request pool se nahi:
+  writer session pehle se ek connection pakde hota hai, usi pool se doosra maange to pool bharne pe sab writers
+  ek doosre ka intezar karte. Version `lead_sync_pending` mein tab tak rehta hai jab tak asal transaction
+  khatam na ho (commit / rollback / session close). `current_version()` sab se purane pending se neeche ruk jata hai, to
+  `since=v` read koi write miss nahi karta (zyada se zyada kuch rows dobara aati hain). SQLite ek hi writer
+  hai — wahan counter transaction ke andar hi.
+
+ORM writes (Lead add / attribute change / delete) session events se khud stamp + bump hote hain.
+Bulk `query.update()` (expiry sweep, routing assign) ORM events bypass karte hain — woh `stamp_bulk()` se
+version lete hain aur update dict mein `sync_version` daalte hain.
+"""
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, func, inspect, or_, text
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_cache
+from app.core.ids import parse_agent_id
+from app.models.lead_sync import LeadSyncPending
+
+LEADS_NAMESPACE = "leads"
+# Crash / kill pe bacha pending row itni der baad watermark nahi rokta
+LEAD_SYNC_PENDING_TTL_SECONDS = float(os.getenv("LEAD_SYNC_PENDING_TTL_SECONDS", "300"))
+LEAD_SYNC_POOL_SIZE = int(os.getenv("LEAD_SYNC_POOL_SIZE", "2"))  # per worker, allocate / settle connections
+_TXN_VERSION = "lead_sync_version"
+_TXN_AGENTS = "lead_sync_agents"
+_TXN_PENDING = "lead_sync_pending"
+_PENDING = LeadSyncPending.__table__
+
+
+def agent_namespace(agent_id) -> str:
+    return f"leads:agent:{parse_agent_id(agent_id)}"
+
+
+def _next_version(conn) -> int:
+    conn.execute(text("UPDATE lead_sync SET version = version + 1 WHERE id = 1"))
+    return int(conn.execute(text("SELECT version FROM lead_sync WHERE id = 1")).scalar() or 0)
+
+
+_allocators: dict = {}
+_allocators_lock = threading.Lock()
+
+
+def _allocator(engine):
+    """Primary ke URL pe alag engine (apna pool) — yeh connections sirf milliseconds ke liye, kisi aur connection ka
+    intezar nahi karte, to request pool poora bhara ho tab bhi allocate ho jata hai."""
+    key = engine.url.render_as_string(hide_password=False)
+    alloc = _allocators.get(key)
+    if alloc is None:
+        from app.db.pool import make_engine
+
+        with _allocators_lock:
+            alloc = _allocators.get(key)
+            if alloc is None:
+                alloc = _allocators[key] = make_engine(
+                    key, "lead_sync", pool_size=max(1, LEAD_SYNC_POOL_SIZE), max_overflow=0
+                )
+    return alloc
+
+
+def _allocate(engine) -> int:
+    """Alag transaction — counter++ aur pending row ek saath commit; counter ka lock bas itni der."""
+    with _allocator(engine).begin() as conn:
+        version = _next_version(conn)
+        conn.execute(_PENDING.insert().values(version=version, started_at=datetime.now(timezone.utc)))
+    return version
+
+
+def _settle(engine, version: int) -> None:
+    """Asal transaction khatam — pending row hatao (saath mein TTL se purane bache hue bhi)."""
+    stale = datetime.now(timezone.utc) - timedelta(seconds=LEAD_SYNC_PENDING_TTL_SECONDS)
+    try:
+        with _allocator(engine).begin() as conn:
+            conn.execute(_PENDING.delete().where(or_(_PENDING.c.version == version, _PENDING.c.started_at < stale)))
+    except Exception as e:
+        # TTL ke baad current_version() is row ko ignore karta hai
+        print(f"[LPG] lead_sync_pending cleanup failed ({e})")
+
+
+def _txn_version(session: Session) -> int:
+    """Is transaction ka version — pehli lead write pe allocate."""
+    version = session.info.get(_TXN_VERSION)
+    if version is None:
+        conn = session.connection()
+        if conn.dialect.name == "sqlite":
+            # Ek hi writer — alag connection is transaction ke write lock pe atak jata
+            version = _next_version(conn)
+        else:
+            version = _allocate(conn.engine)
+            session.info[_TXN_PENDING] = (conn.engine, version)
+        session.info[_TXN_VERSION] = version
+    return version
+
+
+def _touch_agents(session: Session, agent_ids) -> None:
+    touched = session.info.setdefault(_TXN_AGENTS, set())
+    touched.update(parse_agent_id(a) for a in agent_ids if a)
+
+
+def stamp_bulk(session: Session, agent_ids=()) -> int:
+    """Bulk UPDATE se pehle — returns version (update dict mein `sync_version`), commit pe ETags bump."""
+    _touch_agents(session, agent_ids)
+    return _txn_version(session)
+
+
+def current_version(db) -> int:
+    """Read transaction mein leads query se PEHLE padho — response ka `version` (agla `since`).
+    Jis version tak sab transactions khatam ho chuke: sab se purana pending - 1, warna counter."""
+    version = int(db.execute(text("SELECT version FROM lead_sync WHERE id = 1")).scalar() or 0)
+    stale = datetime.now(timezone.utc) - timedelta(seconds=LEAD_SYNC_PENDING_TTL_SECONDS)
+    oldest = (
+        db.query(func.min(LeadSyncPending.version))
+        .filter(LeadSyncPending.version <= version, LeadSyncPending.started_at > stale)
+        .scalar()
+    )
+    return int(oldest) - 1 if oldest is not None else version
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_lead_writes(session, flush_context, instances):
+    from app.models.lead import Lead
+
+    changed = [o for o in session.new if isinstance(o, Lead)]
+    changed += [o for o in session.dirty if isinstance(o, Lead) and session.is_modified(o)]
+    deleted = [o for o in session.deleted if isinstance(o, Lead)]
+    if not changed and not deleted:
+        return
+    version = _txn_version(session)
+    agents = []
+    for lead in changed:
+        lead.sync_version = version
+        agents.append(lead.assigned_agent_id)
+        agents.extend(inspect(lead).attrs.assigned_agent_id.history.deleted or ())  # reroute / unlink
+    agents.extend(lead.assigned_agent_id for lead in deleted)
+    _touch_agents(session, agents)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_lead_versions(session):
+    pending = session.info.pop(_TXN_PENDING, None)
+    if pending is not None:
+        _settle(*pending)
+    touched = session.info.pop(_TXN_AGENTS, None)
+    if session.info.pop(_TXN_VERSION, None) is None and not touched:
+        return
+    cache = get_cache()
+    cache.bump(LEADS_NAMESPACE)
+    for agent_id in touched or ():
+        cache.bump(agent_namespace(agent_id))
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_lead_versions(session, transaction):
+    """Rollback ya commit / rollback ke baghair close — version chhodo, pending row settle (TTL ka intezar nahi,
+    warna tab tak watermark ruka rehta). Commit pe after_commit pehle hi sab utha chuka hota hai."""
+    if transaction.parent is not None:
+        return
+    pending = session.info.pop(_TXN_PENDING, None)
+    if pending is not None:
+        _settle(*pending)
+    session.info.pop(_TXN_VERSION, None)
+    session.info.pop(_TXN_AGENTS, None)
+
+
+def etag_needs_db() -> bool:
+    """Memory backend — cache versions doosre workers ke writes nahi dekhte, ETag ko DB version chahiye."""
+    return not get_cache().shared
+
+
+def list_etag(agent_id=None, variant: str = "", db_version: int | None = None) -> str:
+    """Lead list ka weak ETag — lead set + settings (expiresAt) + agents (admin list mein naam) versions.
+    variant = query string (filters / since alag list hain).
+    db_version (`etag_needs_db()` pe `current_version()`): lead set DB se; settings / agents doosre worker pe
+    badlein to har worker SETTINGS_MAX_AGE_SECONDS mein reload karta hai — ETag bhi usi window pe badalta hai."""
+    from app.core.lead_routing import AGENTS_NAMESPACE
+    from app.core.settings_provider import SETTINGS_MAX_AGE_SECONDS, SETTINGS_NAMESPACE
+
+    if db_version is not None:
+        parts = ["db", str(db_version), str(int(time.time() // max(1, SETTINGS_MAX_AGE_SECONDS)))]
+    else:
+        cache = get_cache()
+        ns = agent_namespace(agent_id) if agent_id is not None else LEADS_NAMESPACE
+        parts = [
+            str(cache.version(ns)),
+            str(cache.version(SETTINGS_NAMESPACE)),
+            str(cache.version(AGENTS_NAMESPACE)),
+        ]
+    raw = "|".join([*parts, variant])
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+
+
+def etag_matches(request, etag: str) -> bool:
+    """If-None-Match (weak comparison) — match ho to 304."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
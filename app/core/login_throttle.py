@@ -0,0 +1,53 @@
+"""Per-IP failed-login throttle — bcrypt se pehle check, to blocked IP koi CPU kharch nahi karwa sakta.
+Counters shared cache backend mein (CACHE_BACKEND=sqlite/redis pe sab workers ek hi limit dekhte hain).
+"""
+import os
+import time
+
+from fastapi import HTTPException, Request
+
+from app.core.cache import get_cache
+
+LOGIN_MAX_FAILURES = int(os.getenv("LOGIN_MAX_FAILURES", "5"))
+LOGIN_FAILURE_WINDOW_SECONDS = int(os.getenv("LOGIN_FAILURE_WINDOW_SECONDS", "300"))
+# Reverse proxy (nginx) ke peeche X-Forwarded-For ka pehla IP lo. Passenger REMOTE_ADDR khud sahi deta hai.
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() in ("1", "true", "yes")
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _key(ip: str) -> str:
+    return f"login_fail:{ip}"
+
+
+def check(ip: str) -> None:
+    """Limit cross ho chuki ho to 429 (Retry-After ke saath)."""
+    data = get_cache().get(_key(ip))
+    if data and data["count"] >= LOGIN_MAX_FAILURES:
+        retry_after = int(data["until"] - time.time())
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many failed login attempts, try again later",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+
+def record_failure(ip: str) -> None:
+    cache = get_cache()
+    now = time.time()
+    data = cache.get(_key(ip))
+    if not data or data["until"] <= now:
+        data = {"count": 0, "until": now + LOGIN_FAILURE_WINDOW_SECONDS}
+    data["count"] += 1
+    cache.set(_key(ip), data, ttl=max(1, data["until"] - now))
+
+
+def reset(ip: str) -> None:
+    get_cache().delete(_key(ip))
@@ -0,0 +1,43 @@
+"""Pakistani phone numbers — "0300-1234567", "+92 300 1234567", "0092 3001234567", "3001234567" sab ek form mein.
+
+national_number(): country code / trunk "0" ke baghair digits ("3001234567") — search index isi pe.
+e164(): "+923001234567" — leads.phone_key (duplicate lead merge), sirf valid Pakistani number pe.
+"""
+import re
+
+_NON_DIGITS = re.compile(r"\D+")
+COUNTRY_CODE = "92"
+
+
+def digits(value) -> str:
+    return _NON_DIGITS.sub("", str(value or ""))
+
+
+def national_number(value) -> str:
+    """+92 / 0092 / trunk 0 hata kar national significant number. Pehchan na ho to sirf digits."""
+    d = digits(value)
+    if d.startswith("00" + COUNTRY_CODE):
+        d = d[4:]
+    elif d.startswith(COUNTRY_CODE) and len(d) >= 12:
+        d = d[2:]
+    if d.startswith("0"):
+        d = d[1:]
+    return d
+
+
+def e164(value) -> str | None:
+    """"0300-1234567" / "+92 300 1234567" / "0092..." / "3001234567" / "042 35761234" → "+92…".
+    Mobile 10 digit (3xx), landline 9-10 digit national. Ghair-mulki / adhoora number → None (dedupe nahi)."""
+    raw = str(value or "").strip()
+    d = digits(raw)
+    if raw.startswith("+") or d.startswith("00"):
+        # International form — country code saaf likha hai, sirf +92
+        d = d[2:] if d.startswith("00") else d
+        if not d.startswith(COUNTRY_CODE):
+            return None
+        n = d[len(COUNTRY_CODE):].removeprefix("0")
+    else:
+        n = national_number(d)
+    if not 9 <= len(n) <= 10 or (len(n) == 10 and n[0] == "0"):
+        return None
+    return f"+{COUNTRY_CODE}{n}"
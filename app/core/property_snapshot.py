@@ -0,0 +1,102 @@
+"""Property snapshot — area summary, distinct areas aur Gemini cache listing text ek bar load.
+Prefork server (gunicorn.conf.py) mein master process fork se pehle load karta hai, workers
+copy-on-write share karte hain. Passenger / single process mein pehli use pe lazy load.
+TTL ke baad (ya invalidate_snapshot() pe) agli call reload karti hai — naya scraped data aa jaye.
+"""
+import os
+import threading
+import time
+
+PROPERTY_SNAPSHOT_TTL_SECONDS = int(os.getenv("PROPERTY_SNAPSHOT_TTL_SECONDS", "600"))
+CACHE_LISTING_LIMIT = 500  # Gemini context cache mein itni listings
+
+
+class PropertySnapshot:
+    """Read-only — workers share karte hain, mutate mat karo."""
+
+    def __init__(self, area_rows: list, listing_rows: list):
+        parts = []
+        areas = []
+        for loc, cnt, min_p, max_p in area_rows:
+            min_cr = (float(min_p or 0) / 1e7)
+            max_cr = (float(max_p or 0) / 1e7)
+            parts.append(f"{loc}: {cnt} properties, {min_cr:.1f} se {max_cr:.1f} crore")
+            if loc and str(loc).strip():
+                areas.append(str(loc))
+        self.area_summary = " | ".join(parts) if parts else "No areas"
+        self.areas = tuple(areas)
+        self.areas_lower = tuple((a.lower(), a) for a in areas)
+        self.listing_lines = tuple(
+            f"{loc or ''} | {ptype or ''} | {title or ''} | {float(price or 0)/100000:.0f} lac | {size or ''}"
+            for loc, ptype, title, price, size in listing_rows
+        )
+        self.property_count = sum(int(r[1] or 0) for r in area_rows)
+        self.loaded_at = time.monotonic()
+        self.stale = False
+
+    def is_stale(self) -> bool:
+        return self.stale or (time.monotonic() - self.loaded_at) > PROPERTY_SNAPSHOT_TTL_SECONDS
+
+
+_snapshot: PropertySnapshot | None = None
+_reload_lock = threading.Lock()
+
+
+def load_snapshot(db) -> PropertySnapshot:
+    """DB (ya property store, agar build hua ho) se snapshot banao aur current set karo (master pre-fork ya reload)."""
+    global _snapshot
+    from app.core.config import property_store_built
+    if property_store_built():
+        from app.core.property_store import get_store
+        store = get_store()
+        if store is not None:
+            _snapshot = PropertySnapshot(store.area_stats(), store.listing_rows(CACHE_LISTING_LIMIT))
+            return _snapshot
+
+    from sqlalchemy import func
+    from app.models.property import Property
+
+    area_rows = (
+        db.query(
+            Property.location_name,
+            func.count(Property.id).label("cnt"),
+            func.min(Property.price).label("min_p"),
+            func.max(Property.price).label("max_p"),
+        )
+        .filter(Property.location_name.isnot(None), Property.location_name != "")
+        .group_by(Property.location_name)
+        .all()
+    )
+    listing_rows = (
+        db.query(Property.location_name, Property.type, Property.title, Property.price, Property.area_size)
+        .limit(CACHE_LISTING_LIMIT)
+        .all()
+    )
+    _snapshot = PropertySnapshot(area_rows, listing_rows)
+    return _snapshot
+
+
+def get_snapshot(db=None) -> PropertySnapshot | None:
+    """Current snapshot. Stale ho aur db mile to reload (ek thread); fail ho to purana hi sahi."""
+    snap = _snapshot
+    if snap is not None and not snap.is_stale():
+        return snap
+    if db is None:
+        return snap
+    if not _reload_lock.acquire(blocking=snap is None):
+        return snap  # doosra thread reload kar raha — purana serve karo
+    try:
+        if _snapshot is not snap and _snapshot is not None:
+            return _snapshot
+        return load_snapshot(db)
+    except Exception as e:
+        print(f"[LPG] Property snapshot load failed ({e})")
+        return snap
+    finally:
+        _reload_lock.release()
+
+
+def invalidate_snapshot() -> None:
+    """Agli get_snapshot(db) reload karegi."""
+    if _snapshot is not None:
+        _snapshot.stale = True
@@ -0,0 +1,326 @@
+"""Columnar property store — `properties` ka compact on-disk snapshot; har worker read-only mmap karta hai.
+Page cache sab processes share karte hain, to per-worker memory overhead lagbhag zero.
+
+Layout (PROPERTY_STORE_DIR):
+    snap-<ts>/  id price bedrooms baths size_sqft area_code type_code created  (.npy columns)
+                title / photo / size  (.off.npy offsets + .heap utf-8 string heap)
+                meta.json  (areas + types dictionaries, count, version)
+    current -> snap-<ts>   (symlink — refresh pe os.replace se atomic swap)
+
+Rows created_at DESC order mein likhi jati hain — filter ke baad pehli N = newest
+(SQL `ORDER BY created_at DESC LIMIT N` jaisa). Build: `python scripts/build_property_store.py`.
+"""
+import datetime
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+import numpy as np
+
+from app.core.config import PROPERTY_STORE_DIR
+
+PROPERTY_STORE_CHECK_SECONDS = float(os.getenv("PROPERTY_STORE_CHECK_SECONDS", "5"))  # symlink swap check
+KEEP_SNAPSHOTS = 2
+CURRENT_LINK = os.path.join(PROPERTY_STORE_DIR, "current")
+
+_NUMERIC_COLUMNS = ("id", "price", "bedrooms", "baths", "size_sqft", "area_code", "type_code", "created")
+_STRING_COLUMNS = ("title", "photo", "size")
+
+# Lahore listings — 1 marla = 225 sq ft, 1 kanal = 20 marla
+_SIZE_UNITS = (
+    ("kanal", 4500.0),
+    ("marla", 225.0),
+    ("sqft", 1.0), ("squarefe", 1.0), ("squarefo", 1.0), ("ft", 1.0),
+    ("sqyd", 9.0), ("squareyard", 9.0), ("yard", 9.0), ("yd", 9.0),
+    ("sqm", 10.764), ("squaremet", 10.764), ("m", 10.764),
+)
+_SIZE_RE = re.compile(r"([\d][\d,]*\.?\d*)\s*([a-z. ]*)")
+
+
+def normalize_size_sqft(area_size) -> float:
+    """"10 Marla" / "1 Kanal" / "2,000 Sq. Ft." → sq ft. Samajh na aaye to NaN."""
+    if not area_size:
+        return float("nan")
+    m = _SIZE_RE.search(str(area_size).lower())
+    if not m:
+        return float("nan")
+    try:
+        value = float(m.group(1).replace(",", ""))
+    except ValueError:
+        return float("nan")
+    unit = re.sub(r"[^a-z]", "", m.group(2) or "")
+    for prefix, factor in _SIZE_UNITS:
+        if unit.startswith(prefix):
+            return value * factor
+    return float("nan")
+
+
+def _write_heap(path: str, name: str, values: list) -> None:
+    encoded = [(v or "").encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+    np.save(os.path.join(path, f"{name}.off.npy"), offsets)
+    with open(os.path.join(path, f"{name}.heap"), "wb") as f:
+        f.write(b"".join(encoded))
+
+
+def _epoch(dt) -> int:
+    if dt is None:
+        return 0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return int(dt.timestamp())
+
+
+def build_store(db, base_dir: str = PROPERTY_STORE_DIR) -> str:
+    """DB se naya snapshot likho aur `current` atomically swap karo. Returns snapshot path."""
+    from app.models.property import Property
+
+    rows = (
+        db.query(
+            Property.id, Property.title, Property.location_name, Property.price, Property.area_size,
+            Property.type, Property.cover_photo, Property.bedrooms, Property.baths, Property.created_at,
+        )
+        .order_by(Property.created_at.desc(), Property.id.desc())
+        .yield_per(5000)
+    )
+    areas: dict[str, int] = {}
+    types: dict[str, int] = {}
+    cols = {name: [] for name in _NUMERIC_COLUMNS + _STRING_COLUMNS}
+    for pid, title, loc, price, size, ptype, photo, beds, baths, created in rows:
+        loc = (loc or "").strip()
+        ptype = (ptype or "").strip()
+        cols["id"].append(pid)
+        cols["price"].append(float(price) if price is not None else np.nan)
+        cols["bedrooms"].append(beds if beds is not None else -1)
+        cols["baths"].append(baths if baths is not None else -1)
+        cols["size_sqft"].append(normalize_size_sqft(size))
+        cols["area_code"].append(areas.setdefault(loc, len(areas)) if loc else -1)
+        cols["type_code"].append(types.setdefault(ptype, len(types)) if ptype else -1)
+        cols["created"].append(_epoch(created))
+        cols["title"].append(title)
+        cols["photo"].append(photo)
+        cols["size"].append(size)
+
+    os.makedirs(base_dir, exist_ok=True)
+    version = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d%H%M%S%f")
+    name = f"snap-{version}"
+    tmp_path = os.path.join(base_dir, name + ".tmp")
+    os.makedirs(tmp_path)
+    dtypes = {
+        "id": np.int64, "price": np.float64, "bedrooms": np.int16, "baths": np.int16,
+        "size_sqft": np.float32, "area_code": np.int32, "type_code": np.int16, "created": np.int64,
+    }
+    for col, dtype in dtypes.items():
+        np.save(os.path.join(tmp_path, f"{col}.npy"), np.asarray(cols[col], dtype=dtype))
+    for col in _STRING_COLUMNS:
+        _write_heap(tmp_path, col, cols[col])
+    with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+        json.dump({"version": version, "count": len(cols["id"]), "areas": list(areas), "types": list(types)}, f)
+    final_path = os.path.join(base_dir, name)
+    os.rename(tmp_path, final_path)
+
+    # Atomic swap — readers ya purana dekhte hain ya naya, adha kabhi nahi
+    tmp_link = os.path.join(base_dir, "current.tmp")
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(name, tmp_link)
+    os.replace(tmp_link, os.path.join(base_dir, "current"))
+
+    # Purane snapshots hatao (mmap kiye hue workers ka data inode ke saath zinda rehta hai)
+    snaps = sorted(d for d in os.listdir(base_dir) if d.startswith("snap-") and not d.endswith(".tmp"))
+    for old in snaps[:-KEEP_SNAPSHOTS]:
+        shutil.rmtree(os.path.join(base_dir, old), ignore_errors=True)
+    return final_path
+
+
+class PropertyStore:
+    """Ek snapshot ka read-only view. Sab columns np.load(mmap_mode="r")."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.version = meta["version"]
+        self.areas: list[str] = meta["areas"]
+        self.types: list[str] = meta["types"]
+        for col in _NUMERIC_COLUMNS:
+            setattr(self, col, np.load(os.path.join(path, f"{col}.npy"), mmap_mode="r"))
+        self._heaps = {}
+        for col in _STRING_COLUMNS:
+            offsets = np.load(os.path.join(path, f"{col}.off.npy"), mmap_mode="r")
+            heap_path = os.path.join(path, f"{col}.heap")
+            heap = np.memmap(heap_path, dtype=np.uint8, mode="r") if os.path.getsize(heap_path) else np.zeros(0, np.uint8)
+            self._heaps[col] = (offsets, heap)
+        self._features = None
+        self._row_of_id = None
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def text(self, col: str, i: int) -> str:
+        offsets, heap = self._heaps[col]
+        return bytes(heap[offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    @staticmethod
+    def _codes_like(names: list[str], needle: str) -> np.ndarray:
+        """ILIKE '%needle%' dictionary pe — chhoti list, phir codes pe vectorized isin."""
+        n = needle.strip().lower()
+        return np.array([i for i, name in enumerate(names) if n in name.lower()], dtype=np.int32)
+
+    def mask(self, area: str | None = None, ptype: str | None = None, max_price: float | None = None) -> np.ndarray:
+        m = np.ones(len(self), dtype=bool)
+        if area and str(area).strip():
+            m &= np.isin(self.area_code, self._codes_like(self.areas, str(area)))
+        if ptype and str(ptype).strip():
+            m &= np.isin(self.type_code, self._codes_like(self.types, str(ptype)))
+        if max_price is not None:
+            with np.errstate(invalid="ignore"):
+                m &= self.price <= max_price  # NaN (price NULL) → False, SQL jaisa
+        return m
+
+    def query(self, area=None, ptype=None, max_price=None, limit: int = 20) -> np.ndarray:
+        """Matching row indices, newest first."""
+        return np.flatnonzero(self.mask(area, ptype, max_price))[:limit]
+
+    def listing(self, i: int) -> dict:
+        """_fetch_properties wali shape (cover_photo raw — caller URL banaye)."""
+        price = float(self.price[i])
+        beds = int(self.bedrooms[i])
+        baths = int(self.baths[i])
+        area_code = int(self.area_code[i])
+        type_code = int(self.type_code[i])
+        return {
+            "id": int(self.id[i]),
+            "title": self.text("title", i),
+            "location_name": self.areas[area_code] if area_code >= 0 else "",
+            "price": price if price == price and price else 0,
+            "area_size": self.text("size", i),
+            "type": self.types[type_code] if type_code >= 0 else "",
+            "cover_photo": self.text("photo", i),
+            "bedrooms": beds if beds >= 0 else None,
+            "baths": baths if baths >= 0 else None,
+        }
+
+    def _counts(self, codes: np.ndarray, names: list[str]) -> dict:
+        codes = codes[codes >= 0]
+        counts = np.bincount(codes, minlength=len(names))
+        order = np.argsort(-counts, kind="stable")
+        return {names[c]: int(counts[c]) for c in order if counts[c]}
+
+    def facets(self, mask: np.ndarray | None = None) -> dict:
+        """Area / type / bedrooms counts (filter mask ke andar)."""
+        sel = slice(None) if mask is None else mask
+        beds = np.asarray(self.bedrooms[sel])
+        beds = beds[beds >= 0]
+        bed_counts = np.bincount(beds) if len(beds) else np.zeros(0, np.int64)
+        return {
+            "total": int(len(self) if mask is None else mask.sum()),
+            "areas": self._counts(np.asarray(self.area_code[sel]), self.areas),
+            "types": self._counts(np.asarray(self.type_code[sel]), self.types),
+            "bedrooms": {str(b): int(c) for b, c in enumerate(bed_counts) if c},
+        }
+
+    def area_stats(self) -> list[tuple]:
+        """(location_name, count, min_price, max_price) — area summary GROUP BY ke barabar."""
+        n = len(self.areas)
+        codes = np.asarray(self.area_code)
+        valid = codes >= 0
+        codes = codes[valid]
+        prices = np.asarray(self.price)[valid]
+        counts = np.bincount(codes, minlength=n)
+        mins = np.full(n, np.inf)
+        maxs = np.full(n, -np.inf)
+        np.fmin.at(mins, codes, prices)  # fmin/fmax NaN ignore karte hain
+        np.fmax.at(maxs, codes, prices)
+        return [
+            (
+                self.areas[c],
+                int(counts[c]),
+                float(mins[c]) if np.isfinite(mins[c]) else None,
+                float(maxs[c]) if np.isfinite(maxs[c]) else None,
+            )
+            for c in range(n)
+            if counts[c]
+        ]
+
+    def listing_rows(self, limit: int) -> list[tuple]:
+        """(location_name, type, title, price, area_size) — Gemini cache listing text ke liye."""
+        out = []
+        for i in range(min(limit, len(self))):
+            d = self.listing(i)
+            out.append((d["location_name"], d["type"], d["title"], d["price"], d["area_size"]))
+        return out
+
+    def row_of(self, property_id: int) -> int | None:
+        if self._row_of_id is None:
+            ids = np.asarray(self.id)
+            order = np.argsort(ids, kind="stable")
+            self._row_of_id = (ids[order], order)
+        sorted_ids, order = self._row_of_id
+        pos = int(np.searchsorted(sorted_ids, property_id))
+        if pos < len(sorted_ids) and sorted_ids[pos] == property_id:
+            return int(order[pos])
+        return None
+
+    def _feature_matrix(self) -> np.ndarray:
+        """Standardized [log price, bedrooms, baths, log size] — missing = 0 (mean)."""
+        if self._features is None:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                feats = np.column_stack([
+                    np.log1p(np.asarray(self.price, dtype=np.float64)),
+                    np.where(np.asarray(self.bedrooms) >= 0, self.bedrooms, np.nan),
+                    np.where(np.asarray(self.baths) >= 0, self.baths, np.nan),
+                    np.log1p(np.asarray(self.size_sqft, dtype=np.float64)),
+                ]).astype(np.float32)
+                mean = np.nanmean(feats, axis=0) if len(feats) else np.zeros(4)
+                std = np.nanstd(feats, axis=0) if len(feats) else np.ones(4)
+            mean = np.nan_to_num(mean)
+            std = np.where(np.nan_to_num(std) > 0, np.nan_to_num(std), 1.0)
+            self._features = np.nan_to_num((feats - mean) / std)
+        return self._features
+
+    def similar(self, i: int, k: int = 10) -> np.ndarray:
+        """Row i jaisi properties (same type, nearest features), closest first."""
+        feats = self._feature_matrix()
+        dist = ((feats - feats[i]) ** 2).sum(axis=1)
+        if int(self.type_code[i]) >= 0:
+            dist[np.asarray(self.type_code) != self.type_code[i]] = np.inf
+        dist[i] = np.inf
+        k = min(k, int(np.isfinite(dist).sum()))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        idx = np.argpartition(dist, k - 1)[:k]
+        return idx[np.argsort(dist[idx], kind="stable")]
+
+
+_store: PropertyStore | None = None
+_store_target: str | None = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_store() -> PropertyStore | None:
+    """Current store. Har PROPERTY_STORE_CHECK_SECONDS pe `current` symlink check — swap hua to reopen."""
+    global _store, _store_target, _checked_at
+    if _store is not None and time.monotonic() - _checked_at < PROPERTY_STORE_CHECK_SECONDS:
+        return _store
+    with _lock:
+        _checked_at = time.monotonic()
+        try:
+            target = os.readlink(CURRENT_LINK)
+        except OSError:
+            return _store
+        if target != _store_target:
+            try:
+                _store = PropertyStore(os.path.join(PROPERTY_STORE_DIR, target))
+                _store_target = target
+                from app.core.property_snapshot import invalidate_snapshot
+                invalidate_snapshot()  # area summary / cache listings naye store se
+            except Exception as e:
+                print(f"[LPG] Property store open failed ({e})")
+    return _store
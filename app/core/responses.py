@@ -0,0 +1,45 @@
+"""Fast JSON response — orjson agar installed ho, warna stdlib json (compact)."""
+import datetime
+import decimal
+import json
+import uuid
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson optional
+    orjson = None
+
+
+def _default(obj):
+    """orjson/json jo types khud nahi jaante — Decimal (price), date, UUID, set."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content) -> bytes:
+    """JSON bytes — same output jo FastJSONResponse bhejta hai (benchmark/export bhi use karte hain)."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """App-wide default response class (main.py). Listings/leads payloads orjson se render."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,325 @@
+"""Admin search — leads (name, phone, property_interest, ai_summary) aur agents pe trigram inverted index.
+
+Har worker ka in-memory index: trigram → docno postings (array('i'), 4 byte per posting — 100k leads ~40MB).
+Query ke trigrams ki postings NumPy bincount se count, score = matched / query trigrams, score + recency se rank.
+Update pe doc ko naya docno milta hai, purana tombstone; tombstones zyada hon to background rebuild.
+
+Fresh kaise rehta hai: lead writes pe "leads" cache namespace bump hota hai (lead_versions, commit ke baad, sab
+workers mein) — agli search pe `sync_version > last` wale rows hi dobara index hote hain. Agents ke liye
+"agents" namespace (routing engine wala) — badle to agents index poora rebuild (chand rows).
+CACHE_BACKEND=memory pe namespaces sirf is worker ke — wahan har search pe DB `current_version()` (ek PK read)
+aur agents ROUTING_REFRESH_SECONDS pe reload.
+
+3 characters se chhoti query ke trigrams score threshold tak nahi pahunchte — woh LIKE se.
+
+SEARCH_BACKEND=mysql (MySQL pe) — index ki jagah FULLTEXT MATCH ... AGAINST (migration 7 ke indexes).
+Index build ho raha ho to bhi search chalti hai — LIKE fallback (LIMIT ke saath).
+"""
+import os
+import re
+import threading
+import time
+from array import array
+
+import numpy as np
+from sqlalchemy import and_, func, literal, or_, text
+
+from app.core.cache import get_cache
+from app.core.phone import digits, national_number
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "trigram").lower()  # trigram | mysql
+SEARCH_MIN_SCORE = float(os.getenv("SEARCH_MIN_SCORE", "0.5"))
+SEARCH_SUMMARY_CHARS = 300  # ai_summary ka itna hissa index (ai_engine bhi 300 tak save karta hai)
+_BUILD_CHUNK = 2000
+_SQL_COUNT_CAP = 1000  # LIKE / FULLTEXT fallback ka total is tak exact
+_MIN_INDEX_QUERY = 3  # is se chhoti query LIKE se (trigram / FULLTEXT min token size)
+_WORD_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def _text_trigrams(text: str) -> set[str]:
+    grams = set()
+    for word in _WORD_RE.split((text or "").lower()):
+        if word:
+            padded = f" {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _digit_trigrams(number: str) -> set[str]:
+    # Phone ke beech ka hissa bhi mile ("1234567") — padding nahi, "#" prefix text grams se alag rakhta hai
+    return {"#" + number[i:i + 3] for i in range(len(number) - 2)}
+
+
+def query_trigrams(query: str) -> set[str]:
+    grams = _text_trigrams(query)
+    number = national_number(query) if _is_phone_query(query) else ""
+    if len(number) >= 3:
+        return _digit_trigrams(number)
+    return grams
+
+
+class TrigramIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: dict[str, array] = {}
+        self._doc_ids: list = []  # docno → external id (None = tombstone)
+        self._docno: dict[str, int] = {}
+        self._alive = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._docno)
+
+    @property
+    def tombstones(self) -> int:
+        return len(self._doc_ids) - len(self._docno)
+
+    def upsert(self, doc_id: str, text: str, phone: str = "") -> None:
+        grams = _text_trigrams(text)
+        number = national_number(phone) if phone else ""
+        if number:
+            grams |= _digit_trigrams(number)
+        with self._lock:
+            old = self._docno.get(doc_id)
+            if old is not None:
+                self._doc_ids[old] = None
+                self._alive[old] = 0
+            docno = len(self._doc_ids)
+            self._doc_ids.append(doc_id)
+            self._alive.append(1)
+            self._docno[doc_id] = docno
+            for gram in grams:
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array("i")
+                postings.append(docno)
+
+    def search(self, query: str, limit: int, offset: int = 0) -> tuple[int, list[tuple[str, float]]]:
+        """(total matches, [(id, score)] page) — score DESC, naye docs pehle."""
+        grams = query_trigrams(query)
+        if not grams:
+            return 0, []
+        with self._lock:
+            lists = [self._postings[g] for g in grams if g in self._postings]
+            if not lists:
+                return 0, []
+            n = len(self._doc_ids)
+            counts = np.bincount(np.concatenate([np.frombuffer(p, dtype=np.int32) for p in lists]), minlength=n)
+            alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+            scores = counts / len(grams)
+            candidates = np.nonzero((scores >= SEARCH_MIN_SCORE) & alive)[0]
+            # Score DESC, phir naya (bara docno) pehle
+            order = candidates[np.lexsort((-candidates, -scores[candidates]))]
+            page = order[offset:offset + limit]
+            return len(order), [(self._doc_ids[i], round(float(scores[i]), 3)) for i in page]
+
+
+def _phone_like(column, query: str):
+    """"0300-1234567" / "+92 300 ..." stored phones pe digits match (LIKE fallback aur mysql backend)."""
+    number = national_number(query)
+    stripped = column
+    for ch in ("-", " ", "+", "(", ")"):
+        stripped = func.replace(stripped, ch, "")
+    return stripped.like(f"%{number}%")
+
+
+def _is_phone_query(query: str) -> bool:
+    return bool(re.fullmatch(r"[\d\s+()-]{4,}", query.strip())) and len(digits(query)) >= 4
+
+
+def _boolean_query(query: str) -> str:
+    """MySQL BOOLEAN MODE — har word required + prefix ("ahm* +dha*")."""
+    words = [w for w in _WORD_RE.split(query.lower()) if w]
+    return " ".join(f"+{w}*" for w in words)
+
+
+def _lead_doc(lead) -> tuple[str, str]:
+    text = " ".join(filter(None, [
+        lead.name, lead.user_name, lead.property_interest, (lead.ai_summary or "")[:SEARCH_SUMMARY_CHARS],
+    ]))
+    return text, lead.phone or ""
+
+
+def _agent_doc(agent) -> tuple[str, str]:
+    return " ".join(filter(None, [agent.agent_name, agent.agency_name, agent.specialization, agent.email])), agent.phone or ""
+
+
+class SearchService:
+    def __init__(self):
+        self.leads = TrigramIndex()
+        self.agents = TrigramIndex()
+        self._lead_version = 0  # lead_sync version jahan tak index hai
+        self._leads_ns = None
+        self._agents_ns = None
+        self._agents_loaded = 0.0
+        self._pid = None
+        self._building = False
+        self._refresh_lock = threading.Lock()
+        self.ready = False
+        self.built_at = None
+        self.build_seconds = None
+        self.queries = 0
+
+    @property
+    def backend(self) -> str:
+        return SEARCH_BACKEND
+
+    def ensure_started(self) -> None:
+        """Per process ek background build (prefork ke baad har worker apna)."""
+        if SEARCH_BACKEND != "trigram" or self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._start_build()
+
+    def _start_build(self) -> None:
+        if self._building:
+            return
+        self._building = True
+        threading.Thread(target=self._build, name="lpg-search-index", daemon=True).start()
+
+    def _build(self) -> None:
+        from app.core.lead_versions import LEADS_NAMESPACE, current_version
+        from app.db.session import SessionLocal
+        from app.models.lead import Lead
+
+        started = time.monotonic()
+        leads = TrigramIndex()
+        db = SessionLocal()
+        try:
+            leads_ns = get_cache().version(LEADS_NAMESPACE)
+            version = current_version(db)  # scan se pehle — beech ke writes agle refresh mein
+            last = None
+            while True:
+                q = db.query(Lead.id, Lead.name, Lead.user_name, Lead.phone, Lead.property_interest, Lead.ai_summary)
+                if last is not None:
+                    q = q.filter(Lead.id > last)
+                rows = q.order_by(Lead.id).limit(_BUILD_CHUNK).all()
+                if not rows:
+                    break
+                for row in rows:
+                    leads.upsert(row.id, *_lead_doc(row))
+                last = rows[-1].id
+                db.rollback()  # lamba read transaction nahi
+            with self._refresh_lock:
+                self.leads = leads
+                self._lead_version = version
+                self._leads_ns = leads_ns
+                self._reload_agents(db)
+                self.ready = True
+            self.built_at = time.time()
+            self.build_seconds = round(time.monotonic() - started, 2)
+            print(f"[LPG] Search index built: {len(leads)} leads in {self.build_seconds}s")
+        except Exception as e:
+            print(f"[LPG] Search index build failed ({e})")
+        finally:
+            db.close()
+            self._building = False
+
+    def _reload_agents(self, db) -> None:
+        from app.core.lead_routing import AGENTS_NAMESPACE
+        from app.models.agent import Agent
+
+        ns = get_cache().version(AGENTS_NAMESPACE)
+        agents = TrigramIndex()
+        for agent in db.query(Agent.id, Agent.agent_name, Agent.agency_name, Agent.specialization, Agent.email, Agent.phone):
+            agents.upsert(str(agent.id), *_agent_doc(agent))
+        self.agents = agents
+        self._agents_ns = ns
+        self._agents_loaded = time.monotonic()
+
+    def refresh(self, db) -> bool:
+        """Search se pehle — badle leads / agents index mein. False = index abhi ready nahi (fallback use karo)."""
+        self.ensure_started()
+        if not self.ready:
+            return False
+        from app.core.lead_routing import AGENTS_NAMESPACE, ROUTING_REFRESH_SECONDS
+        from app.core.lead_versions import LEADS_NAMESPACE, current_version
+        from app.models.lead import Lead
+
+        cache = get_cache()
+        with self._refresh_lock:
+            leads_ns = cache.version(LEADS_NAMESPACE)
+            # Memory backend doosre workers ke writes nahi dekhta — DB version hi
+            if leads_ns != self._leads_ns or not cache.shared:
+                version = current_version(db)
+                if version != self._lead_version:
+                    cols = (Lead.id, Lead.name, Lead.user_name, Lead.phone, Lead.property_interest, Lead.ai_summary)
+                    rows = db.query(*cols).filter(Lead.sync_version > self._lead_version).all()
+                    for row in rows:
+                        self.leads.upsert(row.id, *_lead_doc(row))
+                    self._lead_version = version
+                self._leads_ns = leads_ns
+            if cache.version(AGENTS_NAMESPACE) != self._agents_ns or (
+                not cache.shared and time.monotonic() - self._agents_loaded > ROUTING_REFRESH_SECONDS
+            ):
+                self._reload_agents(db)
+        if self.leads.tombstones > max(10000, len(self.leads)):
+            self._start_build()  # purani postings saaf — naya index tayar hone tak yehi chalta hai
+        return True
+
+    # --- search ---
+
+    def search_leads(self, db, query: str, limit: int, offset: int = 0) -> tuple[int, list[tuple[str, float]], str]:
+        """(total, [(lead_id, score)], backend used)."""
+        from app.models.lead import Lead
+
+        self.queries += 1
+        if SEARCH_BACKEND == "trigram" and len(query.strip()) >= _MIN_INDEX_QUERY and self.refresh(db):
+            return (*self.leads.search(query, limit, offset), "trigram")
+        text_cols = (Lead.name, Lead.user_name, Lead.property_interest, Lead.ai_summary)
+        return self._sql_search(db, Lead, text_cols, Lead.phone, Lead.created_at, query, limit, offset)
+
+    def search_agents(self, db, query: str, limit: int, offset: int = 0) -> tuple[int, list[tuple[str, float]], str]:
+        from app.models.agent import Agent
+
+        self.queries += 1
+        if SEARCH_BACKEND == "trigram" and len(query.strip()) >= _MIN_INDEX_QUERY and self.refresh(db):
+            return (*self.agents.search(query, limit, offset), "trigram")
+        text_cols = (Agent.agent_name, Agent.agency_name, Agent.specialization, Agent.email)
+        return self._sql_search(db, Agent, text_cols, Agent.phone, Agent.created_at, query, limit, offset)
+
+    def _sql_search(self, db, model, text_cols, phone_col, created_col, query, limit, offset):
+        """SEARCH_BACKEND=mysql → FULLTEXT (relevance rank); warna (index build ho raha / chhoti query) LIKE, naye pehle."""
+        use_fulltext = (
+            SEARCH_BACKEND == "mysql" and db.bind.dialect.name == "mysql" and len(query.strip()) >= _MIN_INDEX_QUERY
+        )
+        if _is_phone_query(query):
+            cond, score = _phone_like(phone_col, query), literal(1.0)
+        elif use_fulltext:
+            match = text(
+                f"MATCH ({', '.join(c.name for c in text_cols)}) AGAINST (:q IN BOOLEAN MODE)"
+            ).bindparams(q=_boolean_query(query))
+            cond, score = match, match
+        else:
+            terms = [w for w in _WORD_RE.split(query.lower()) if w]
+            if not terms:
+                return 0, [], "like"
+            cond = and_(*[or_(*[c.ilike(f"%{t}%") for c in text_cols]) for t in terms])
+            score = literal(1.0)
+        backend = "mysql" if use_fulltext else "like"
+        total = db.query(model.id).filter(cond).limit(_SQL_COUNT_CAP).count()
+        rows = (
+            db.query(model.id, score.label("score"))
+            .filter(cond)
+            .order_by(text("score DESC"), created_col.desc())
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        return total, [(str(r.id), round(float(r.score or 0), 3)) for r in rows], backend
+
+    def status(self) -> dict:
+        return {
+            "backend": SEARCH_BACKEND,
+            "ready": self.ready,
+            "building": self._building,
+            "leads": len(self.leads),
+            "agents": len(self.agents),
+            "tombstones": self.leads.tombstones,
+            "trigrams": len(self.leads._postings),
+            "leadVersion": self._lead_version,
+            "buildSeconds": self.build_seconds,
+            "queries": self.queries,
+        }
+
+
+search_service = SearchService()
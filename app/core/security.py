@@ -1,4 +1,7 @@
+import asyncio
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 import bcrypt
@@ -7,13 +10,87 @@ SECRET_KEY = os.getenv("SECRET_KEY", "lpg_secret_key_change_in_production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
+# bcrypt cost — badlo to purane hashes agle successful login pe naye cost pe rehash ho jate hain
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Hashing alag process pool mein — login burst shared threadpool (sync endpoints) ko starve na kare.
+# 0 = dedicated thread pool (bcrypt GIL chhod deta hai), process spawn na ho sake to bhi yahi.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))  # is se zyada queue → busy
+
+
+class PasswordPoolBusy(Exception):
+    """Hash queue full — caller 503 de (CPU exhaust hone ke bajaye)."""
+
+
+def _hashpw(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def _checkpw(plain: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(plain.encode(), hashed.encode())
+    except ValueError:  # corrupt / non-bcrypt hash
+        return False
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+def _get_pool():
+    """Per process lazy pool — prefork ke baad har worker apna banata hai."""
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid():
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            pool = None
+            if PASSWORD_HASH_WORKERS > 0:
+                try:
+                    pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+                except (OSError, NotImplementedError, ImportError) as e:
+                    print(f"[LPG] Password process pool unavailable ({e}), using threads")
+            _pool = pool or ThreadPoolExecutor(max_workers=max(1, PASSWORD_HASH_WORKERS), thread_name_prefix="lpg-bcrypt")
+            _pool_pid = os.getpid()
+    return _pool
+
+
+def _submit(fn, *args):
+    if not _pending.acquire(blocking=False):
+        raise PasswordPoolBusy("password hashing queue full")
+    try:
+        future = _get_pool().submit(fn, *args)
+    except Exception:
+        _pending.release()
+        raise
+    future.add_done_callback(lambda _: _pending.release())
+    return future
+
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    return _submit(_hashpw, password, BCRYPT_ROUNDS).result()
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return bcrypt.checkpw(plain.encode(), hashed.encode())
+    return _submit(_checkpw, plain, hashed).result()
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(_submit(_hashpw, password, BCRYPT_ROUNDS))
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await asyncio.wrap_future(_submit(_checkpw, plain, hashed))
+
+
+def needs_rehash(hashed: str) -> bool:
+    """Hash ka cost BCRYPT_ROUNDS se alag? ("$2b$12$...")"""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (AttributeError, IndexError, ValueError):
+        return True
 
 
 def create_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -0,0 +1,97 @@
+"""Settings provider — GeminiSettings + AdminSettings memory mein, version stamp ke saath.
+Ye rows hafte mein ek bar badalti hain; chat / partner /leads / accept pe ab query nahi hoti.
+
+Write endpoints (save_gemini_settings, reset, save_settings) `settings_provider.notify_changed()` call
+karte hain → cache ka "settings" namespace bump → har worker agli read pe reload (pub/sub message ya
+CACHE_VERSION_POLL_SECONDS wala version poll). DB seedha edit ho (scripts) to bhi SETTINGS_MAX_AGE_SECONDS pe reload.
+"""
+import os
+import threading
+import time
+
+from app.core.cache import get_cache
+
+SETTINGS_MAX_AGE_SECONDS = int(os.getenv("SETTINGS_MAX_AGE_SECONDS", "300"))
+SETTINGS_NAMESPACE = "settings"
+
+
+class GeminiConfig:
+    """GeminiSettings row ki detached copy — get_ai_response yahi attributes padhta hai."""
+
+    __slots__ = ("api_key", "system_instructions", "conversation_instructions", "model", "updated_at")
+
+    def __init__(self, row):
+        for field in self.__slots__:
+            setattr(self, field, getattr(row, field))
+
+
+class SettingsSnapshot:
+    """Read-only — sab threads share karte hain."""
+
+    def __init__(self, gemini_row, admin_rows: list, version: int):
+        self.gemini = GeminiConfig(gemini_row) if gemini_row else None
+        self.admin = {row.key: (row.value, row.updated_at) for row in admin_rows}
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+
+class SettingsProvider:
+    def __init__(self):
+        self._snapshot: SettingsSnapshot | None = None
+        self._lock = threading.Lock()
+
+    def is_fresh(self) -> bool:
+        """Snapshot current hai? (False = agli read DB se load karegi — async code run_db se bulaye)"""
+        snap = self._snapshot
+        return (
+            snap is not None
+            and snap.version == get_cache().version(SETTINGS_NAMESPACE)
+            and time.monotonic() - snap.loaded_at < SETTINGS_MAX_AGE_SECONDS
+        )
+
+    def current(self, db=None) -> SettingsSnapshot:
+        if self.is_fresh():
+            return self._snapshot
+        with self._lock:
+            if self.is_fresh():
+                return self._snapshot
+            self._snapshot = self._load(db)
+            return self._snapshot
+
+    def _load(self, db) -> SettingsSnapshot:
+        from app.db.session import SessionLocal
+        from app.models.admin_settings import AdminSettings
+        from app.models.gemini_settings import GeminiSettings
+
+        version = get_cache().version(SETTINGS_NAMESPACE)  # load se pehle — beech mein bump ho to agli read reload
+        own = db is None
+        if own:
+            db = SessionLocal()
+        try:
+            return SettingsSnapshot(db.query(GeminiSettings).first(), db.query(AdminSettings).all(), version)
+        finally:
+            if own:
+                db.close()
+
+    def gemini(self, db=None) -> GeminiConfig | None:
+        return self.current(db).gemini
+
+    def admin_value(self, key: str, db=None) -> tuple:
+        """(value, updated_at) — row na ho to (None, None)."""
+        return self.current(db).admin.get(key, (None, None))
+
+    def notify_changed(self) -> None:
+        """Settings write ke commit ke baad — is process mein aur baaki workers mein reload."""
+        self._snapshot = None
+        get_cache().bump(SETTINGS_NAMESPACE)
+
+    def status(self) -> dict:
+        snap = self._snapshot
+        return {
+            "version": snap.version if snap else None,
+            "ageSeconds": round(time.monotonic() - snap.loaded_at, 1) if snap else None,
+            "fresh": self.is_fresh(),
+        }
+
+
+settings_provider = SettingsProvider()
@@ -0,0 +1,92 @@
+"""Startup profile mode — LPG_STARTUP_PROFILE=1 pe har module ka import time + init steps.
+Passenger process on-demand spawn karta hai, to ye sab pehli user request pe lagta hai.
+
+main.py sab se pehle isse import karta hai; report print hoti hai aur
+GET /api/admin/system/startup pe bhi milti hai. `scripts/profile_startup.py` spawn → first response time naapta hai.
+"""
+import builtins
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+ENABLED = os.getenv("LPG_STARTUP_PROFILE", "").lower() in ("1", "true", "yes")
+PROCESS_START = time.perf_counter()
+
+_imports: dict[str, list[float]] = {}  # module -> [self_ms, cumulative_ms]
+_steps: list[tuple[str, float]] = []
+_stack: list[list[float]] = []
+_original_import = builtins.__import__
+_installed = False
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Sirf pehli dafa load hone wale modules time karo (sys.modules mein ho to free hai)
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    frame = [0.0]  # children ka cumulative time
+    _stack.append(frame)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        _stack.pop()
+        if _stack:
+            _stack[-1][0] += elapsed
+        if name not in _imports:
+            _imports[name] = [elapsed - frame[0], elapsed]
+
+
+def install() -> None:
+    """Import hook lagao (sirf profile mode mein)."""
+    global _installed
+    if ENABLED and not _installed:
+        builtins.__import__ = _timed_import
+        _installed = True
+
+
+def uninstall() -> None:
+    global _installed
+    if _installed:
+        builtins.__import__ = _original_import
+        _installed = False
+
+
+@contextmanager
+def step(name: str):
+    """Init step time karo (app setup, routers, ...)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if ENABLED:
+            _steps.append((name, (time.perf_counter() - start) * 1000))
+
+
+def report(top: int = 25) -> dict:
+    by_root: dict[str, float] = {}
+    for name, (self_ms, _) in _imports.items():
+        root = name.split(".")[0]
+        by_root[root] = by_root.get(root, 0.0) + self_ms
+    slowest = sorted(_imports.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+    return {
+        "enabled": ENABLED,
+        "sinceProcessStartMs": round((time.perf_counter() - PROCESS_START) * 1000, 1),
+        "steps": [{"step": n, "ms": round(ms, 1)} for n, ms in _steps],
+        "importsByPackage": {k: round(v, 1) for k, v in sorted(by_root.items(), key=lambda kv: -kv[1])[:top]},
+        "slowestImports": [
+            {"module": n, "selfMs": round(s, 1), "cumulativeMs": round(c, 1)} for n, (s, c) in slowest
+        ],
+    }
+
+
+def print_report() -> None:
+    if not ENABLED:
+        return
+    r = report()
+    print(f"[LPG] startup profile — {r['sinceProcessStartMs']} ms since profiler import")
+    for s in r["steps"]:
+        print(f"[LPG]   step {s['step']}: {s['ms']} ms")
+    for pkg, ms in r["importsByPackage"].items():
+        print(f"[LPG]   import {pkg}: {ms} ms (self)")
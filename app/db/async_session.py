@@ -0,0 +1,72 @@
+"""Async DB option — aiomysql/asyncmy engine, hot paths pe event loop/threadpool block nahi hota.
+DB_ASYNC_ENABLED=false ya driver install na ho to sab kuch sync SessionLocal pe threadpool mein chalta hai.
+"""
+import os
+import threading
+
+from starlette.concurrency import run_in_threadpool
+
+from app.db.pool import attach_metrics, engine_kwargs
+from app.db.session import DATABASE_URL, SessionLocal
+
+DB_ASYNC_ENABLED = os.getenv("DB_ASYNC_ENABLED", "true").lower() not in ("false", "0", "no")
+DB_ASYNC_DRIVER = os.getenv("DB_ASYNC_DRIVER", "aiomysql")  # aiomysql | asyncmy
+
+_async_engine = None
+_async_sessionmaker = None
+_async_failed = False
+_lock = threading.Lock()
+
+
+def _async_url(url: str) -> str:
+    """Sync URL → async driver URL."""
+    if url.startswith("mysql+pymysql://"):
+        return "mysql+" + DB_ASYNC_DRIVER + "://" + url[len("mysql+pymysql://"):]
+    if url.startswith("mysql://"):
+        return "mysql+" + DB_ASYNC_DRIVER + "://" + url[len("mysql://"):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+def get_async_engine():
+    """Lazy async engine — pehli call pe banta hai. Driver missing ho to None (sync fallback)."""
+    global _async_engine, _async_sessionmaker, _async_failed
+    if _async_engine is not None or _async_failed or not DB_ASYNC_ENABLED:
+        return _async_engine
+    with _lock:
+        if _async_engine is not None or _async_failed:
+            return _async_engine
+        try:
+            from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+            from sqlalchemy.orm import sessionmaker
+
+            url = _async_url(DATABASE_URL)
+            eng = create_async_engine(url, **engine_kwargs(url, is_async=True))
+            attach_metrics(eng.sync_engine, "primary_async")
+            _async_sessionmaker = sessionmaker(
+                bind=eng, class_=AsyncSession, autoflush=False, expire_on_commit=False
+            )
+            _async_engine = eng
+        except Exception as e:
+            print(f"[LPG] Async DB engine unavailable ({e}), using sync sessions")
+            _async_failed = True
+    return _async_engine
+
+
+def _run_sync_session(fn, *args, **kwargs):
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+async def run_db(fn, *args, **kwargs):
+    """fn(db, *args) chalao. Async engine ho to run_sync (greenlet, non-blocking I/O), warna threadpool.
+    fn normal sync ORM code likhta hai — dono modes mein same function."""
+    if get_async_engine() is not None:
+        async with _async_sessionmaker() as session:
+            return await session.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(_run_sync_session, fn, *args, **kwargs)
+
@@ -0,0 +1,305 @@
+"""Versioned schema migrations — har migration ek bar chalti hai, `schema_version` table mein record.
+Request path pe koi DDL nahi — deploy ke baad `python scripts/migrate.py` chalao.
+
+Naya migration: neeche @migration(<next version>, "description") ke saath function add karo.
+Function ko Connection milta hai; idempotent rakho (column/index pehle se ho to skip).
+"""
+import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, text
+
+from app.db.session import Base
+
+_version_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _version_metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+MIGRATIONS: list[tuple[int, str, object]] = []
+
+
+def migration(version: int, description: str):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+def _columns(conn, table: str) -> set[str]:
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def _index_names(conn, table: str) -> set[str]:
+    return {i["name"] for i in inspect(conn).get_indexes(table)}
+
+
+def _add_column_if_missing(conn, table: str, column: str, ddl: str) -> None:
+    if column not in _columns(conn, table):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _model_index(table: str, name: str):
+    import app.models  # noqa: F401 — migrate.py se chale to models abhi register nahi (migration 1 skip)
+
+    for idx in Base.metadata.tables[table].indexes:
+        if idx.name == name:
+            return idx
+    raise KeyError(f"{table}.{name} not declared on model")
+
+
+def _create_index_if_missing(conn, table: str, name: str) -> None:
+    if name not in _index_names(conn, table):
+        _model_index(table, name).create(bind=conn)
+
+
+# Hot-path indexes — models mein declared (fresh DB pe create_all bana deta hai)
+HOT_INDEXES = [
+    ("leads", "ix_leads_status_agent_assigned"),
+    ("leads", "ix_leads_created_at_id"),
+    ("chat_messages", "ix_chat_messages_thread_id_id"),
+    ("properties", "ix_properties_loc_type_price_created"),
+]
+
+
+@migration(1, "Base tables (create_all)")
+def _m001_base_tables(conn):
+    import app.models  # noqa: F401 — sab models Base pe register
+    Base.metadata.create_all(bind=conn)
+
+
+@migration(2, "leads: name, context, chat_history, assigned_at columns (old scripts/ ALTERs)")
+def _m002_lead_columns(conn):
+    _add_column_if_missing(conn, "leads", "name", "VARCHAR(100) NULL")
+    _add_column_if_missing(conn, "leads", "context", "TEXT NULL")
+    _add_column_if_missing(conn, "leads", "chat_history", "TEXT NULL")
+    dt = "DATETIME(6)" if conn.dialect.name == "mysql" else "DATETIME"
+    _add_column_if_missing(conn, "leads", "assigned_at", f"{dt} NULL")
+
+
+@migration(3, "Hot-path composite indexes (leads, chat_messages, properties)")
+def _m003_hot_indexes(conn):
+    for table, name in HOT_INDEXES:
+        _create_index_if_missing(conn, table, name)
+    # (thread_id, id) ne purane thread_id index ko cover kar liya — redundant index hatao
+    if "ix_chat_messages_thread_id" in _index_names(conn, "chat_messages"):
+        if conn.dialect.name == "mysql":
+            conn.execute(text("DROP INDEX ix_chat_messages_thread_id ON chat_messages"))
+        else:
+            conn.execute(text("DROP INDEX ix_chat_messages_thread_id"))
+
+
+@migration(4, "leads.sync_version + lead_sync counter (ETag / delta sync)")
+def _m004_lead_sync(conn):
+    from app.models.lead_sync import LeadSync
+
+    _add_column_if_missing(conn, "leads", "sync_version", "BIGINT NOT NULL DEFAULT 0")
+    _create_index_if_missing(conn, "leads", "ix_leads_sync_version")
+    LeadSync.__table__.create(bind=conn, checkfirst=True)
+    if conn.execute(text("SELECT COUNT(*) FROM lead_sync WHERE id = 1")).scalar() == 0:
+        conn.execute(text("INSERT INTO lead_sync (id, version) VALUES (1, 0)"))
+
+
+@migration(5, "leads (created_at, id) index for admin keyset pagination")
+def _m005_leads_keyset_index(conn):
+    _create_index_if_missing(conn, "leads", "ix_leads_created_at_id")
+    # (created_at, id) ne purane created_at index ko cover kar liya
+    if "ix_leads_created_at" in _index_names(conn, "leads"):
+        if conn.dialect.name == "mysql":
+            conn.execute(text("DROP INDEX ix_leads_created_at ON leads"))
+        else:
+            conn.execute(text("DROP INDEX ix_leads_created_at"))
+
+
+@migration(6, "Canonical ids — leads.assigned_agent_id 'A7' -> '7', purane numeric lead ids -> 'L<id>'")
+def _m006_canonical_ids(conn):
+    # Delta-sync clients ko badli rows milen
+    conn.execute(text("UPDATE lead_sync SET version = version + 1 WHERE id = 1"))
+    version = conn.execute(text("SELECT version FROM lead_sync WHERE id = 1")).scalar() or 0
+    conn.execute(
+        text(
+            "UPDATE leads SET assigned_agent_id = SUBSTR(assigned_agent_id, 2), sync_version = :v "
+            "WHERE assigned_agent_id LIKE 'A%'"
+        ),
+        {"v": version},
+    )
+    ids = {i for (i,) in conn.execute(text("SELECT id FROM leads")).all()}
+    # Sirf poore numeric ids — "L"/"LD" + hex wale pehle se canonical; collision ho to purana id rehne do
+    renames = [{"old": i, "new": f"L{i}", "v": version} for i in ids if i.isdigit() and f"L{i}" not in ids]
+    if renames:
+        conn.execute(text("UPDATE leads SET id = :new, sync_version = :v WHERE id = :old"), renames)
+
+
+@migration(7, "MySQL FULLTEXT indexes for admin search (SEARCH_BACKEND=mysql)")
+def _m007_fulltext_search(conn):
+    # SQLite pe trigram index (app.core.search_index) hi — FULLTEXT sirf MySQL
+    if conn.dialect.name != "mysql":
+        return
+    if "ft_leads_search" not in _index_names(conn, "leads"):
+        conn.execute(text("CREATE FULLTEXT INDEX ft_leads_search ON leads (name, user_name, property_interest, ai_summary)"))
+    if "ft_agents_search" not in _index_names(conn, "agents"):
+        conn.execute(text("CREATE FULLTEXT INDEX ft_agents_search ON agents (agent_name, agency_name, specialization, email)"))
+
+
+@migration(8, "leads.phone_key (E.164) + merged_into, phone dedupe index, phone_key backfill")
+def _m008_lead_phone_key(conn):
+    from app.core.phone import e164
+
+    _add_column_if_missing(conn, "leads", "phone_key", "VARCHAR(16) NULL")
+    _add_column_if_missing(conn, "leads", "merged_into", "VARCHAR(50) NULL")
+    _create_index_if_missing(conn, "leads", "ix_leads_phone_key_created")
+    last = ""
+    while True:
+        rows = conn.execute(
+            text("SELECT id, phone FROM leads WHERE id > :last AND phone IS NOT NULL ORDER BY id LIMIT 1000"),
+            {"last": last},
+        ).all()
+        if not rows:
+            break
+        keys = [{"id": i, "key": e164(phone)} for i, phone in rows if e164(phone)]
+        if keys:
+            conn.execute(text("UPDATE leads SET phone_key = :key WHERE id = :id"), keys)
+        last = rows[-1][0]
+
+
+@migration(9, "job_checkpoints table (lead scoring / background jobs)")
+def _m009_job_checkpoints(conn):
+    from app.models.job_checkpoint import JobCheckpoint
+
+    JobCheckpoint.__table__.create(bind=conn, checkfirst=True)
+
+
+@migration(10, "lead_stats rollup table (analytics dashboard) — backfill: scripts/backfill_analytics.py")
+def _m010_lead_stats(conn):
+    from app.models.lead_stat import LeadStat
+
+    LeadStat.__table__.create(bind=conn, checkfirst=True)
+
+
+@migration(11, "lead_events outbox table (lead state transitions)")
+def _m011_lead_events(conn):
+    from app.models.lead_event import LeadEvent
+
+    LeadEvent.__table__.create(bind=conn, checkfirst=True)
+
+
+@migration(12, "lead_sync_pending table (versions alag transaction mein, lead writes serialize nahi)")
+def _m012_lead_sync_pending(conn):
+    from app.models.lead_sync import LeadSyncPending
+
+    LeadSyncPending.__table__.create(bind=conn, checkfirst=True)
+
+
+@migration(13, "lead_funnel table (distinct leads per funnel stage) — backfill: scripts/backfill_analytics.py")
+def _m013_lead_funnel(conn):
+    from app.models.lead_funnel import LeadFunnel
+
+    LeadFunnel.__table__.create(bind=conn, checkfirst=True)
+
+
+def current_version(engine) -> int:
+    _version_metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        v = conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+    return int(v or 0)
+
+
+def pending(engine) -> list[tuple[int, str, object]]:
+    cur = current_version(engine)
+    return [m for m in MIGRATIONS if m[0] > cur]
+
+
+def run_migrations(engine, log=print) -> int:
+    """Pending migrations order mein apply. Returns final version."""
+    version = current_version(engine)
+    for v, desc, fn in pending(engine):
+        log(f"[LPG] migrate {v}: {desc}")
+        with engine.begin() as conn:
+            fn(conn)
+            conn.execute(
+                schema_version.insert().values(
+                    version=v, description=desc[:255], applied_at=datetime.datetime.utcnow()
+                )
+            )
+        version = v
+    return version
+
+
+def verify(engine) -> dict:
+    """Schema version + hot indexes maujood hain?"""
+    with engine.connect() as conn:
+        missing = [
+            f"{table}.{name}"
+            for table, name in HOT_INDEXES
+            if table in inspect(conn).get_table_names() and name not in _index_names(conn, table)
+        ]
+    return {
+        "version": current_version(engine),
+        "latest": MIGRATIONS[-1][0] if MIGRATIONS else 0,
+        "missingIndexes": missing,
+    }
+
+
+# EXPLAIN checks — hot queries wahi index use karein jo upar banaye
+HOT_QUERIES = [
+    (
+        "lead expiry sweep",
+        "ix_leads_status_agent_assigned",
+        "SELECT id FROM leads WHERE status = 'new' AND assigned_agent_id IS NOT NULL AND assigned_at < :cutoff",
+        {"cutoff": datetime.datetime(2000, 1, 1)},
+    ),
+    (
+        "admin lead list",
+        "ix_leads_created_at_id",
+        "SELECT id FROM leads WHERE created_at >= :since ORDER BY created_at DESC, id DESC LIMIT 50",
+        {"since": datetime.datetime(2000, 1, 1)},
+    ),
+    (
+        "lead phone dedupe",
+        "ix_leads_phone_key_created",
+        "SELECT id FROM leads WHERE phone_key = :key AND created_at >= :since ORDER BY created_at LIMIT 1",
+        {"key": "+923001234567", "since": datetime.datetime(2000, 1, 1)},
+    ),
+    (
+        "chat thread history",
+        "ix_chat_messages_thread_id_id",
+        "SELECT role, content FROM chat_messages WHERE thread_id = :tid ORDER BY id LIMIT 50",
+        {"tid": "t"},
+    ),
+    (
+        "area price summary",
+        "ix_properties_loc_type_price_created",
+        "SELECT location_name, COUNT(*), MIN(price), MAX(price) FROM properties "
+        "WHERE location_name IS NOT NULL GROUP BY location_name",
+        {},
+    ),
+]
+
+
+def explain_hot_queries(engine) -> list[dict]:
+    """Har hot query ka EXPLAIN — kaunsa index use hua. MySQL: `key` column; SQLite: QUERY PLAN detail."""
+    results = []
+    with engine.connect() as conn:
+        dialect = conn.dialect.name
+        for name, expected, sql, params in HOT_QUERIES:
+            if dialect == "sqlite":
+                rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql), params).fetchall()
+                plan = " ".join(str(r[-1]) for r in rows)
+                used = expected if expected in plan else None
+            else:
+                rows = conn.execute(text("EXPLAIN " + sql), params).mappings().all()
+                keys = [r.get("key") for r in rows if r.get("key")]
+                plan = ", ".join(keys)
+                used = expected if expected in keys else (keys[0] if keys else None)
+            results.append({
+                "query": name,
+                "expectedIndex": expected,
+                "usedIndex": used,
+                "ok": used == expected,
+                "plan": plan,
+            })
+    return results
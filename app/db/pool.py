@@ -0,0 +1,171 @@
+"""Connection pool — env se tuned settings, pre-ping/recycle, aur pool metrics.
+Shared hosting MySQL idle connections ko `wait_timeout` pe maar deta hai, is liye
+pool_recycle us se kam rakho aur pre_ping on — warna idle ke baad pehli request fail hoti hai.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # seconds — checkout wait limit
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "280"))  # seconds — MySQL wait_timeout se kam
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() not in ("false", "0", "no")
+# Is se lamba checkout = "wait" count (pool khali tha)
+POOL_WAIT_THRESHOLD_MS = float(os.getenv("DB_POOL_WAIT_THRESHOLD_MS", "5"))
+
+
+class PoolMetrics:
+    """Per-engine counters — checkouts, waits, timeouts, connects, invalidations."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.pool = None
+
+    def record_checkout(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            if elapsed_ms >= POOL_WAIT_THRESHOLD_MS:
+                self.waits += 1
+                self.wait_ms_total += elapsed_ms
+                self.wait_ms_max = max(self.wait_ms_max, elapsed_ms)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "waitMsAvg": round(self.wait_ms_total / self.waits, 2) if self.waits else 0.0,
+                "waitMsMax": round(self.wait_ms_max, 2),
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checkedOut": pool.checkedout(),
+                "checkedIn": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return data
+
+
+_metrics: dict[str, PoolMetrics] = {}
+_engines: list = []  # make_engine se bane sab sync engines (fork ke baad dispose)
+
+
+class _MeteredPoolMixin:
+    """QueuePool._do_get ko time karo — wait/timeout metrics ke liye."""
+
+    _lpg_metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            if self._lpg_metrics:
+                self._lpg_metrics.record_timeout()
+            raise
+        if self._lpg_metrics:
+            self._lpg_metrics.record_checkout((time.perf_counter() - start) * 1000)
+        return conn
+
+    def recreate(self):
+        # engine.dispose() naya pool banata hai — metrics saath le jao
+        new_pool = super().recreate()
+        new_pool._lpg_metrics = self._lpg_metrics
+        if self._lpg_metrics:
+            self._lpg_metrics.pool = new_pool
+        return new_pool
+
+
+class MeteredQueuePool(_MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(_MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_kwargs(url: str, is_async: bool = False) -> dict:
+    """create_engine kwargs — SQLite (local/tests) pe pool tuning skip."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": MeteredAsyncQueuePool if is_async else MeteredQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def attach_metrics(engine, name: str) -> PoolMetrics:
+    """Engine ke pool pe metrics lagao. Async engine ke liye sync_engine pass karo."""
+    metrics = _metrics.get(name) or PoolMetrics(name)
+    _metrics[name] = metrics
+    pool = engine.pool
+    metrics.pool = pool
+    if isinstance(pool, _MeteredPoolMixin):
+        pool._lpg_metrics = metrics
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_conn, conn_record):
+        metrics.record_connect()
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_conn, conn_record, exception):
+        metrics.record_invalidation()
+
+    return metrics
+
+
+def make_engine(url: str, name: str, **overrides):
+    """Tuned sync engine + metrics. overrides (pool_size, max_overflow …) sirf non-SQLite pe."""
+    kwargs = engine_kwargs(url)
+    if kwargs:
+        kwargs.update(overrides)
+    engine = create_engine(url, **kwargs)
+    attach_metrics(engine, name)
+    _engines.append(engine)
+    return engine
+
+
+def dispose_all(close: bool = True) -> None:
+    """Prefork: master fork se pehle close=True; worker post_fork mein close=False
+    (parent ke sockets ko touch kiye baghair naya pool — connections processes mein share na hon)."""
+    for engine in _engines:
+        engine.dispose(close=close)
+
+
+def pool_stats() -> dict:
+    """Sab engines ke pool metrics — /api/admin/system/db-pool."""
+    return {name: m.snapshot() for name, m in _metrics.items()}
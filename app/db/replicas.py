@@ -0,0 +1,173 @@
+"""Read/write splitting — read-only kaam replicas pe, lead/chat writes primary pe.
+
+Config (.env):
+- DB_REPLICA_URLS=mysql+pymysql://u:p@replica1/db,...   (full URLs; local test: sqlite:///replica.db)
+- DB_REPLICA_HOSTS=replica1,replica2                     (sirf host — user/pass/db primary wale)
+
+Read-your-writes: write ke baad pin_primary(key) — us key (chat thread, auth token) ki reads
+DB_READ_PIN_SECONDS tak primary pe jati hain. Replica down ho ya lag zyada ho to bhi primary.
+"""
+import hashlib
+import itertools
+import os
+import threading
+import time
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.pool import make_engine
+from app.db.session import DB_NAME, DB_PASS, DB_USER, SessionLocal
+
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "10"))
+DB_REPLICA_CHECK_SECONDS = float(os.getenv("DB_REPLICA_CHECK_SECONDS", "5"))  # health check interval
+DB_READ_PIN_SECONDS = float(os.getenv("DB_READ_PIN_SECONDS", "5"))
+
+
+def _replica_urls() -> list[str]:
+    urls = [u.strip() for u in os.getenv("DB_REPLICA_URLS", "").split(",") if u.strip()]
+    hosts = [h.strip() for h in os.getenv("DB_REPLICA_HOSTS", "").split(",") if h.strip()]
+    urls += [f"mysql+pymysql://{DB_USER}:{DB_PASS}@{h}/{DB_NAME}" for h in hosts]
+    return urls
+
+
+class Replica:
+    """Ek replica engine + health (reachable, replication lag)."""
+
+    def __init__(self, url: str, name: str):
+        self.name = name
+        self.engine = make_engine(url, name)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.healthy = True
+        self.lag_seconds: float | None = None
+        self.error: str | None = None
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _read_lag(self, conn) -> float | None:
+        """MySQL replica lag — SHOW REPLICA STATUS (8.0.22+) ya SHOW SLAVE STATUS. SQLite = None."""
+        if self.engine.dialect.name != "mysql":
+            return None
+        for stmt, col in (
+            ("SHOW REPLICA STATUS", "Seconds_Behind_Source"),
+            ("SHOW SLAVE STATUS", "Seconds_Behind_Master"),
+        ):
+            try:
+                row = conn.execute(text(stmt)).mappings().first()
+            except Exception:
+                continue
+            if row is None:
+                return None  # replication configured nahi (e.g. stand-in) — lag unknown
+            lag = row.get(col)
+            if lag is None:
+                raise RuntimeError("replication stopped")
+            return float(lag)
+        return None  # privilege nahi — lag unknown, reachable to hai
+
+    def check(self, force: bool = False) -> bool:
+        now = time.monotonic()
+        if not force and now - self.checked_at < DB_REPLICA_CHECK_SECONDS:
+            return self.healthy
+        with self._lock:
+            if not force and now - self.checked_at < DB_REPLICA_CHECK_SECONDS:
+                return self.healthy
+            try:
+                with self.engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                    self.lag_seconds = self._read_lag(conn)
+                lagging = self.lag_seconds is not None and self.lag_seconds > DB_REPLICA_MAX_LAG_SECONDS
+                self.healthy = not lagging
+                self.error = f"lag {self.lag_seconds:.0f}s" if lagging else None
+            except Exception as e:
+                self.healthy = False
+                self.error = str(e)[:200]
+            self.checked_at = time.monotonic()
+        return self.healthy
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lagSeconds": self.lag_seconds,
+            "error": self.error,
+        }
+
+
+class SessionRouter:
+    """Read sessions replicas pe (round-robin), pinned keys aur fallback primary pe."""
+
+    def __init__(self, replicas: list[Replica]):
+        self.replicas = replicas
+        self._rr = itertools.count()
+        self._pins: dict[str, float] = {}
+        self._pins_lock = threading.Lock()
+
+    def pin_primary(self, key: str | None, seconds: float = DB_READ_PIN_SECONDS) -> None:
+        """Write ke baad call — is key ki agli reads primary pe (replica lag se stale data na aaye)."""
+        if not key or not self.replicas:
+            return
+        now = time.monotonic()
+        with self._pins_lock:
+            self._pins[key] = now + seconds
+            if len(self._pins) > 10000:
+                self._pins = {k: exp for k, exp in self._pins.items() if exp > now}
+
+    def is_pinned(self, key: str | None) -> bool:
+        if not key:
+            return False
+        exp = self._pins.get(key)
+        return exp is not None and exp > time.monotonic()
+
+    def pick_replica(self) -> Replica | None:
+        n = len(self.replicas)
+        if not n:
+            return None
+        start = next(self._rr)
+        for i in range(n):
+            replica = self.replicas[(start + i) % n]
+            if replica.check():
+                return replica
+        return None
+
+    def read_session(self, key: str | None = None) -> Session:
+        """Read-only Session. Caller close kare."""
+        if not self.is_pinned(key):
+            replica = self.pick_replica()
+            if replica is not None:
+                return replica.SessionLocal()
+        return SessionLocal()
+
+    def status(self) -> dict:
+        return {
+            "replicas": [r.status() for r in self.replicas],
+            "pinnedKeys": sum(1 for exp in self._pins.values() if exp > time.monotonic()),
+        }
+
+
+session_router = SessionRouter([Replica(url, f"replica{i}") for i, url in enumerate(_replica_urls())])
+
+
+def pin_primary(key: str | None, seconds: float = DB_READ_PIN_SECONDS) -> None:
+    session_router.pin_primary(key, seconds)
+
+
+def read_session(key: str | None = None) -> Session:
+    return session_router.read_session(key)
+
+
+def request_pin_key(request: Request) -> str | None:
+    """Auth token se pin key — same admin/partner ki reads apni writes ke baad primary pe."""
+    auth = request.headers.get("authorization")
+    if not auth:
+        return None
+    return "auth:" + hashlib.sha1(auth.encode()).hexdigest()[:16]
+
+
+def get_read_db(request: Request):
+    """FastAPI dependency — read-only Session (replica ya primary)."""
+    db = read_session(request_pin_key(request))
+    try:
+        yield db
+    finally:
+        db.close()
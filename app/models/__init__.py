@@ -6,5 +6,10 @@ from app.models.agent import Agent
 from app.models.scraping_source import ScrapingSource
 from app.models.gemini_settings import GeminiSettings
 from app.models.admin_settings import AdminSettings
+from app.models.lead_sync import LeadSync, LeadSyncPending
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.lead_stat import LeadStat
+from app.models.lead_event import LeadEvent
+from app.models.lead_funnel import LeadFunnel
 
-__all__ = ["Lead", "Property", "Admin", "Agent", "ScrapingSource", "GeminiSettings", "ChatMessage", "AdminSettings"]
+__all__ = ["Lead", "Property", "Admin", "Agent", "ScrapingSource", "GeminiSettings", "ChatMessage", "AdminSettings", "LeadSync", "LeadSyncPending", "JobCheckpoint", "LeadStat", "LeadEvent", "LeadFunnel"]
@@ -1,13 +1,17 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
 from sqlalchemy.sql import func
 from app.db.session import Base
 
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Thread history: WHERE thread_id=? ORDER BY id (purana single-column index replace karta hai)
+        Index("ix_chat_messages_thread_id_id", "thread_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    thread_id = Column(String(100), nullable=False, index=True)
+    thread_id = Column(String(100), nullable=False)  # indexed via ix_chat_messages_thread_id_id
     role = Column(String(20), nullable=False)  # user | model
     content = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
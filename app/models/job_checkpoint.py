@@ -0,0 +1,12 @@
+from sqlalchemy import BigInteger, Column, DateTime, String
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+
+class JobCheckpoint(Base):
+    """Background jobs ka "yahan tak ho gaya" marker (app/core/checkpoints.py) — restart pe wahin se."""
+    __tablename__ = "job_checkpoints"
+
+    name = Column(String(64), primary_key=True)
+    position = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,15 +1,26 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import BigInteger, Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.db.session import Base
 
 
 class Lead(Base):
     __tablename__ = "leads"
+    __table_args__ = (
+        # Expiry sweep + partner lists: status='new' AND assigned_agent_id AND assigned_at < cutoff
+        Index("ix_leads_status_agent_assigned", "status", "assigned_agent_id", "assigned_at"),
+        # Admin list: ORDER BY created_at DESC, id DESC (keyset cursor) + date range
+        Index("ix_leads_created_at_id", "created_at", "id"),
+        # Delta sync: WHERE sync_version > :since
+        Index("ix_leads_sync_version", "sync_version"),
+        # Duplicate merge: WHERE phone_key = :key AND created_at >= :window_start
+        Index("ix_leads_phone_key_created", "phone_key", "created_at"),
+    )
 
     id = Column(String(50), primary_key=True, index=True)
     user_name = Column(String(100), nullable=True)  # Display name
     name = Column(String(100), nullable=True)
     phone = Column(String(30), nullable=True)
+    phone_key = Column(String(16), nullable=True)  # E.164 "+923001234567" — phone set pe khud (lead_dedupe)
     property_interest = Column(String(255), nullable=True)
     property_id = Column(String(50), nullable=True)
     property_link = Column(String(255), nullable=True)
@@ -17,10 +28,18 @@ class Lead(Base):
     lead_score = Column(Integer, nullable=True, default=0)
     assigned_agent_id = Column(String(50), nullable=True)  # matches agents.id (varchar)
     assigned_at = Column(DateTime(timezone=True), nullable=True)  # when assigned to agent (for expiry)
-    status = Column(String(30), default="new")  # new | contacted | site_visit | closed | in_progress
+    status = Column(String(30), default="new")  # new | contacted | site_visit | closed | in_progress | merged
     ai_summary = Column(Text, nullable=True)
     context = Column(Text, nullable=True)  # For /api/leads save
     chat_history = Column(Text, nullable=True)
     source = Column(String(50), default="AI Search")
     thread_id = Column(String(100), nullable=True, index=True)  # links to chat thread
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sync_version = Column(BigInteger, nullable=False, default=0, server_default="0")  # lead_sync version of last write
+    merged_into = Column(String(50), nullable=True)  # status=merged — is lead mein merge hua (same phone)
+
+
+# Lead writes pe sync_version stamp + ETag bump (session event listeners)
+import app.core.lead_versions  # noqa: E402,F401
+# phone set → phone_key (attribute event)
+import app.core.lead_dedupe  # noqa: E402,F401
@@ -0,0 +1,20 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, Text
+from app.db.session import Base
+
+
+class LeadEvent(Base):
+    """Lead state transitions ka append-only outbox (app/core/lead_events.py) — change ke saath usi transaction mein.
+    agent_id = jis agent se event ka taalluq (assigned: naya agent; unassigned / rejected / expired: jis se gaya)."""
+    __tablename__ = "lead_events"
+    __table_args__ = (
+        # Admin lead timeline: WHERE lead_id = :id ORDER BY id
+        Index("ix_lead_events_lead_id", "lead_id", "id"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    lead_id = Column(String(50), nullable=False)
+    event = Column(String(20), nullable=False)  # created | assigned | unassigned | status_changed | rejected | expired | merged
+    agent_id = Column(String(50), nullable=True)
+    status = Column(String(30), nullable=True)  # event ke baad lead ka status (jahan pata ho)
+    data = Column(Text, nullable=True)  # JSON — previousStatus, previousAgentId, source, mergedInto ...
+    created_at = Column(DateTime(timezone=True), nullable=False)
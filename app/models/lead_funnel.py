@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, String
+from app.db.session import Base
+
+
+class LeadFunnel(Base):
+    """Lead funnel stage pe pehli baar kab pahuncha (app/core/analytics.py) — stage counters distinct leads ginte hain,
+    dobara assign / status wapas-aage pe count nahi badhta."""
+    __tablename__ = "lead_funnel"
+
+    lead_id = Column(String(50), primary_key=True)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    assigned_at = Column(DateTime(timezone=True), nullable=True)  # pehla assignment
+    accepted_at = Column(DateTime(timezone=True), nullable=True)
+    site_visit_at = Column(DateTime(timezone=True), nullable=True)
+    closed_at = Column(DateTime(timezone=True), nullable=True)
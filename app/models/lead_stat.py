@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Date, Integer, String
+from app.db.session import Base
+
+
+class LeadStat(Base):
+    """Lead funnel rollup counters (app/core/analytics.py) — lead_events consumer day + month bucket += n karta hai.
+    agent_id / source "" = dimension laagu nahi."""
+    __tablename__ = "lead_stats"
+
+    period = Column(String(5), primary_key=True)  # day | month
+    bucket = Column(Date, primary_key=True)  # din ya mahine ki pehli tareekh (UTC)
+    metric = Column(String(20), primary_key=True)  # analytics.METRICS
+    agent_id = Column(String(50), primary_key=True, default="")
+    source = Column(String(50), primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer
+from app.db.session import Base
+
+
+class LeadSync(Base):
+    """Single-row counter (id=1) — har lead-writing transaction ek version leta hai (app/core/lead_versions.py)."""
+    __tablename__ = "lead_sync"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+class LeadSyncPending(Base):
+    """Allocate ho chuke lekin abhi commit / rollback na hue versions — `current_version()` in se neeche rukta hai."""
+    __tablename__ = "lead_sync_pending"
+
+    version = Column(BigInteger, primary_key=True, autoincrement=False)
+    started_at = Column(DateTime(timezone=True), nullable=False, index=True)
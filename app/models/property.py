@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Numeric, Text, DateTime
+from sqlalchemy import Column, Integer, String, Numeric, Text, DateTime, Index
 from app.db.session import Base
 import datetime
 
 class Property(Base):
     __tablename__ = "properties"
+    __table_args__ = (
+        # Area summary (GROUP BY location_name, min/max price) + area/type/budget filters
+        Index("ix_properties_loc_type_price_created", "location_name", "type", "price", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255))
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
 
@@ -37,3 +37,21 @@ class LeadRerouteRequest(BaseModel):
 
 class LeadStatusUpdateRequest(BaseModel):
     status: str  # new | in_progress | site_visit | closed
+
+
+class LeadBulkFilter(BaseModel):
+    """GET /api/admin/leads wale filters."""
+    status: Optional[str] = None
+    agentId: Optional[str] = None
+    from_date: Optional[str] = Field(None, alias="from")
+    to_date: Optional[str] = Field(None, alias="to")
+
+    model_config = {"populate_by_name": True}
+
+
+class LeadBulkRequest(BaseModel):
+    action: str  # reroute | set_status | unassign
+    ids: Optional[list[str]] = Field(None, max_length=50000)
+    filter: Optional[LeadBulkFilter] = None
+    agentId: Optional[str] = None  # reroute: "A2" / "2", ya "auto" (routing engine, pichla agent skip)
+    status: Optional[str] = None  # set_status
@@ -0,0 +1,46 @@
+"""Production ASGI entry — gunicorn prefork + uvicorn workers (Passenger a2wsgi bridge ki jagah).
+
+    gunicorn -c gunicorn.conf.py main:app
+
+preload_app: main + property snapshot master mein ek bar load, phir fork — workers
+copy-on-write share karte hain (har worker apna cache scratch se nahi banata).
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(4, multiprocessing.cpu_count() * 2 + 1))))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))  # Gemini calls lambi ho sakti hain
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))  # 0 = worker recycle off
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+accesslog = os.getenv("GUNICORN_ACCESSLOG") or None
+
+
+def when_ready(server):
+    """Master, fork se pehle: property snapshot load, DB connections band, heap freeze."""
+    from app.core.property_snapshot import load_snapshot
+    from app.db.pool import dispose_all
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        snap = load_snapshot(db)
+        server.log.info(f"[LPG] Property snapshot preloaded: {snap.property_count} properties, {len(snap.areas)} areas")
+    except Exception as e:
+        server.log.warning(f"[LPG] Property snapshot preload failed ({e}); workers lazy load karenge")
+    finally:
+        db.close()
+    dispose_all()
+    # Preloaded objects permanent generation mein — GC inhe touch karke pages copy na kare
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app.db.pool import dispose_all
+
+    dispose_all(close=False)
@@ -1,3 +1,7 @@
+# Sab se pehle — LPG_STARTUP_PROFILE=1 pe baaki imports time hote hain
+from app.core import startup_profile
+startup_profile.install()
+
 from pathlib import Path
 
 from fastapi import FastAPI, Request, Depends
@@ -6,19 +10,35 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 
+from app.core import analytics
 from app.core.ai_engine import get_ai_response
-from app.db.session import get_db, engine, Base
+from app.core.compression import CompressionMiddleware
+from app.core.responses import FastJSONResponse
+from app.core.lead_expiry import expiry_sweeper
+from app.core.lead_events import lead_events
+from app.core.lead_ingest import lead_ingest
+from app.core.lead_scoring import lead_scorer
+from app.core.search_index import search_service
+from app.core.settings_provider import settings_provider
+from app.db.session import get_db
+from app.db.async_session import run_db
+from app.db.replicas import read_session
 from app.models import Lead, Property, Admin, Agent, ScrapingSource, GeminiSettings, ChatMessage, AdminSettings  # noqa: F401
 from app.api.auth import router as auth_router
 from app.api.admin_leads import router as admin_leads_router
+from app.api.admin_analytics import router as admin_analytics_router
+from app.api.admin_export import router as admin_export_router
+from app.api.admin_search import router as admin_search_router
 from app.api.admin_agents import router as admin_agents_router
 from app.api.admin_scraping import router as admin_scraping_router
 from app.api.admin_settings import router as admin_settings_router
+from app.api.admin_system import router as admin_system_router
 from app.api.gemini import router as gemini_router
 from app.api.leads_public import router as leads_public_router
 from app.api.partner import router as partner_router
+from app.api.properties import router as properties_router
 
-app = FastAPI(title="Lahore Property Guide API")
+app = FastAPI(title="Lahore Property Guide API", default_response_class=FastJSONResponse)
 
 
 @app.middleware("http")
@@ -46,28 +66,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create tables
-Base.metadata.create_all(bind=engine)
-
+# gzip/brotli — listings aur lead lists mobile pe kam bytes
+app.add_middleware(CompressionMiddleware)
 
-def _run_migrations():
-    """Add assigned_at to leads if missing (fixes Internal Server Error after schema update)."""
-    from sqlalchemy import text
-    try:
-        with engine.connect() as conn:
-            conn.execute(text("ALTER TABLE leads ADD COLUMN assigned_at DATETIME(6) NULL"))
-            conn.commit()
-    except Exception as e:
-        if "Duplicate column" not in str(e) and "already exists" not in str(e).lower():
-            pass  # Ignore - column may already exist
-
-
-@app.on_event("startup")
-def startup_migration():
-    try:
-        _run_migrations()
-    except Exception:
-        pass  # Non-fatal - app runs even if migration fails
+# Schema (tables/columns/indexes): `python scripts/migrate.py` — import/startup pe koi DDL nahi
 
 # Property images — /property/48012653_cover.jpg -> property_images/48012653_cover.jpg
 _property_images_dir = Path(__file__).resolve().parent / "property_images"
@@ -75,14 +77,31 @@ if _property_images_dir.exists():
     app.mount("/property", StaticFiles(directory=str(_property_images_dir)), name="property")
 
 # Include routers
-app.include_router(auth_router)
-app.include_router(admin_leads_router)
-app.include_router(admin_agents_router)
-app.include_router(admin_scraping_router)
-app.include_router(admin_settings_router)
-app.include_router(gemini_router)
-app.include_router(leads_public_router)
-app.include_router(partner_router)
+with startup_profile.step("include routers"):
+    app.include_router(auth_router)
+    app.include_router(admin_leads_router)
+    app.include_router(admin_analytics_router)
+    app.include_router(admin_export_router)
+    app.include_router(admin_search_router)
+    app.include_router(admin_agents_router)
+    app.include_router(admin_scraping_router)
+    app.include_router(admin_settings_router)
+    app.include_router(admin_system_router)
+    app.include_router(gemini_router)
+    app.include_router(leads_public_router)
+    app.include_router(partner_router)
+    app.include_router(properties_router)
+
+
+@app.on_event("startup")
+def start_background_jobs():
+    # Lifespan wale servers (uvicorn/gunicorn) pe worker start hote hi; Passenger bridge pe pehli use pe
+    expiry_sweeper.ensure_started()
+    search_service.ensure_started()
+    lead_ingest.ensure_started()  # pichle run ka journal backlog bhi yehi flush karta hai
+    lead_scorer.ensure_started()
+    analytics.subscribe()
+    lead_events.ensure_started()
 
 
 @app.post("/api_new_ai")
@@ -92,16 +111,27 @@ async def chat_endpoint(request: Request, db: Session = Depends(get_db)):
     messages = data.get("messages", [])
     thread_id = data.get("threadId") or data.get("thread_id")
 
-    from app.models.gemini_settings import GeminiSettings
-    settings = db.query(GeminiSettings).first()
+    # Settings provider (memory) — stale ho tabhi DB, wo bhi async engine pe (event loop block nahi hota)
+    if settings_provider.is_fresh():
+        settings = settings_provider.gemini()
+    else:
+        settings = await run_db(settings_provider.gemini)
 
+    # Property/chat reads replica pe; thread pinned ho (abhi write hua) to primary
+    read_db = read_session(thread_id)
     try:
-        ai_data = await get_ai_response(query, messages, thread_id=thread_id, db=db, gemini_settings=settings)
+        ai_data = await get_ai_response(query, messages, thread_id=thread_id, db=db, gemini_settings=settings, read_db=read_db)
         return ai_data
     except Exception as e:
         import traceback
         traceback.print_exc()
         return {"question": "Internal Server Error", "listings": [], "message": "", "lead_info": None, "lead_id": None}
+    finally:
+        read_db.close()
+
+
+startup_profile.uninstall()
+startup_profile.print_report()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,29 @@
+"""Analytics rollups (lead_stats + lead_funnel) dobara banao — migration 13 ke baad ek baar, ya counters pe shak ho.
+
+    python scripts/backfill_analytics.py
+
+Maujooda rollups delete ho ke leads ki current halat se bante hain; rejected / expired / reassigned counts
+lead_events mein jitni history hai (retention) utni. Analytics consumer us ke baad ke events se aage.
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.analytics import rebuild
+from app.db.session import SessionLocal
+
+
+def main():
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        rows = rebuild(db)
+    finally:
+        db.close()
+    print(f"lead_stats rebuilt: {rows} rollup rows in {time.monotonic() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
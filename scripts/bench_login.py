@@ -0,0 +1,119 @@
+"""Login throughput benchmark — N concurrent partner logins + saath mein ek sync endpoint ki latency
+(dikhata hai ke bcrypt burst baaki requests ko starve karta hai ya nahi). Temp SQLite DB, in-process ASGI.
+
+    python scripts/bench_login.py [--logins 200] [--concurrency 20] [--rounds 10,12] [--workers 0,2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def _child(args) -> dict:
+    sys.path.insert(0, ROOT)
+    import httpx
+    from app.db.migrations import run_migrations
+    from app.db.session import SessionLocal, engine
+    from app.core.security import hash_password
+    from app.models.agent import Agent
+    from main import app
+
+    run_migrations(engine, log=lambda *a: None)
+    db = SessionLocal()
+    pw_hash = hash_password("secret123")
+    for i in range(args.agents):
+        db.add(Agent(id=str(i + 1), agent_name=f"A{i}", agency_name="Bench", email=f"a{i}@bench.lpg", password_hash=pw_hash))
+    db.commit()
+    db.close()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        sem = asyncio.Semaphore(args.concurrency)
+        login_ms: list[float] = []
+        probe_ms: list[float] = []
+        statuses: dict[int, int] = {}
+        done = False
+
+        async def login(i):
+            async with sem:
+                t = time.perf_counter()
+                r = await client.post("/api/auth/partner/login",
+                                      json={"email": f"a{i % args.agents}@bench.lpg", "password": "secret123"})
+                login_ms.append((time.perf_counter() - t) * 1000)
+                statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+        async def probe():
+            # Sync endpoint (threadpool) — bcrypt threadpool mein ho to yahi latency barhti hai
+            while not done:
+                t = time.perf_counter()
+                await client.get("/api/properties/facets")
+                probe_ms.append((time.perf_counter() - t) * 1000)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(args.logins)))
+        elapsed = time.perf_counter() - start
+        done = True
+        await probe_task
+
+    login_ms.sort()
+    probe_ms.sort()
+    return {
+        "logins_per_s": args.logins / elapsed,
+        "login_p50": statistics.median(login_ms),
+        "login_p99": login_ms[int(len(login_ms) * 0.99) - 1],
+        "probe_p50": statistics.median(probe_ms) if probe_ms else 0,
+        "probe_p99": probe_ms[max(0, int(len(probe_ms) * 0.99) - 1)] if probe_ms else 0,
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--agents", type=int, default=50)
+    parser.add_argument("--rounds", default="10,12", help="BCRYPT_ROUNDS values")
+    parser.add_argument("--workers", default="0,2", help="PASSWORD_HASH_WORKERS values (0 = dedicated threads)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_child(args))))
+        return
+
+    print(f"{args.logins} partner logins, concurrency {args.concurrency}")
+    print(f"{'rounds':>6} {'workers':>7} {'login/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'probe p50':>9} {'probe p99':>9}  statuses")
+    for rounds in args.rounds.split(","):
+        for workers in args.workers.split(","):
+            with tempfile.TemporaryDirectory() as tmp:
+                env = dict(
+                    os.environ,
+                    DATABASE_URL=f"sqlite:///{tmp}/bench.db",
+                    DB_ASYNC_ENABLED="false",
+                    CACHE_BACKEND="memory",
+                    BCRYPT_ROUNDS=rounds,
+                    PASSWORD_HASH_WORKERS=workers,
+                    PASSWORD_HASH_MAX_PENDING=str(max(32, args.concurrency)),
+                    LOGIN_MAX_FAILURES="1000000",
+                )
+                out = subprocess.run(
+                    [sys.executable, __file__, "--child", "--logins", str(args.logins),
+                     "--concurrency", str(args.concurrency), "--agents", str(args.agents)],
+                    cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+                ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{rounds:>6} {workers:>7} {r['logins_per_s']:8.1f} {r['login_p50']:8.1f} {r['login_p99']:8.1f} "
+                  f"{r['probe_p50']:9.1f} {r['probe_p99']:9.1f}  {r['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
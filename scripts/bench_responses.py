@@ -0,0 +1,127 @@
+"""Benchmark: JSON render CPU (stdlib vs FastJSONResponse) + bytes-on-wire (raw / gzip / br).
+Payload shapes real endpoints jaise: /api_new_ai (20 listings), /api/partner/leads, /api/admin/leads.
+
+    python scripts/bench_responses.py [--leads 5000] [--repeat 50]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.compression import BROTLI_QUALITY, GZIP_LEVEL, brotli
+from app.core.responses import dumps, orjson
+
+AREAS = ["DHA Phase 6", "DHA Phase 9 Prism", "Bahria Town", "Gulberg III", "Johar Town", "Model Town", "Askari 11"]
+TYPES = ["plot", "house", "flat", "commercial"]
+
+
+def _listing(i: int) -> dict:
+    area = random.choice(AREAS)
+    ptype = random.choice(TYPES)
+    return {
+        "id": 48000000 + i,
+        "title": f"{random.choice(['5', '10', '1'])} {random.choice(['Marla', 'Kanal'])} {ptype.title()} for sale in {area}",
+        "location_name": area,
+        "price": float(random.randint(30, 900) * 100000),
+        "area_size": f"{random.choice([5, 8, 10, 20])} Marla",
+        "type": ptype,
+        "cover_photo": f"/property/{48000000 + i}_cover.jpg",
+        "bedrooms": random.choice([None, 2, 3, 4, 5]),
+        "baths": random.choice([None, 2, 3, 4]),
+    }
+
+
+def chat_payload() -> dict:
+    listings = [_listing(i) for i in range(20)]
+    return {
+        "question": "DHA Phase 6 mein 2 crore tak ke 10 marla houses ye hain. Aap ka naam kya hai?",
+        "listings": listings,
+        "properties": listings,
+        "message": "",
+        "lead_info": None,
+        "lead_id": None,
+        "lead_collected": {},
+        "filter_criteria": {},
+        "sql_executed": "",
+        "area_summary": " | ".join(f"{a}: {random.randint(10, 900)} properties, 0.5 se 12.0 crore" for a in AREAS),
+        "db_schema": "properties: id, title, location_name, price(rupees), area_size, type, cover_photo, bedrooms, baths.",
+    }
+
+
+def _lead(i: int, admin: bool) -> dict:
+    d = {
+        "id": f"L{i:08X}",
+        "userName": f"Visitor {i}",
+        "name": f"Visitor {i}",
+        "phone": f"03{random.randint(0, 49):02d}{random.randint(1000000, 9999999)}",
+        "propertyInterest": f"{random.choice(TYPES)} in {random.choice(AREAS)}",
+        "budget": f"{random.randint(1, 9)} crore",
+        "leadScore": random.randint(0, 100),
+        "status": random.choice(["new", "in_progress", "site_visit", "closed"]),
+        "aiSummary": "User ne DHA mein 10 marla house ka poocha, budget 2 crore, site visit chahte hain weekend pe.",
+        "createdAt": "2026-03-01T10:15:30.123456+00:00",
+        "assignedAt": "2026-03-01T10:16:00+00:00",
+    }
+    if admin:
+        d.update({
+            "propertyId": str(48000000 + i),
+            "propertyLink": f"https://lahorepropertyguide.com/property/{48000000 + i}",
+            "assignedAgent": "Ahmed Khan",
+            "assignedAgentId": "2",
+        })
+    else:
+        d.update({"source": "AI Search", "expiresAt": "2026-03-01T10:21:00+00:00"})
+    return d
+
+
+def _stdlib_render(content) -> bytes:
+    # Starlette JSONResponse.render ke barabar
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _timeit(fn, payload, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(payload)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leads", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    random.seed(42)
+
+    payloads = {
+        "/api_new_ai (20 listings)": chat_payload(),
+        "/api/partner/leads (200)": {"leads": [_lead(i, admin=False) for i in range(200)]},
+        f"/api/admin/leads ({args.leads})": {"leads": [_lead(i, admin=True) for i in range(args.leads)]},
+    }
+
+    print(f"renderer: {'orjson' if orjson else 'stdlib json (orjson not installed)'}; "
+          f"brotli: {'yes' if brotli else 'no'}; gzip level {GZIP_LEVEL}, br quality {BROTLI_QUALITY}")
+    print(f"{'payload':34} {'stdlib ms':>10} {'fast ms':>8} {'raw KB':>8} {'gzip KB':>8} {'br KB':>7} {'gzip ms':>8} {'br ms':>6}")
+    for name, payload in payloads.items():
+        std_ms = _timeit(_stdlib_render, payload, args.repeat)
+        fast_ms = _timeit(dumps, payload, args.repeat)
+        raw = dumps(payload)
+        t = time.perf_counter()
+        gz = zlib.compress(raw, GZIP_LEVEL)
+        gz_ms = (time.perf_counter() - t) * 1000
+        br_kb, br_ms = "-", "-"
+        if brotli:
+            t = time.perf_counter()
+            br = brotli.compress(raw, quality=BROTLI_QUALITY)
+            br_ms = f"{(time.perf_counter() - t) * 1000:.2f}"
+            br_kb = f"{len(br) / 1024:.1f}"
+        print(f"{name:34} {std_ms:10.3f} {fast_ms:8.3f} {len(raw) / 1024:8.1f} {len(gz) / 1024:8.1f} {br_kb:>7} {gz_ms:8.2f} {br_ms:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark: lead scoring throughput (leads/second).
+Synthetic rows (real budget / interest / phone shapes) — feature extraction + NumPy scoring, DB ke baghair.
+`--db` pe asli DB pe full run (queries + bulk UPDATE samet).
+
+    python scripts/bench_scoring.py [--leads 100000] [--repeat 3] [--db]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.lead_scoring import LEAD_SCORING_BATCH_SIZE, Inventory, lead_scorer, score_rows
+
+AREAS = ["DHA Phase 6", "DHA Phase 9 Prism", "Bahria Town", "Gulberg III", "Johar Town", "Model Town", "Askari 11"]
+BUDGETS = ["2 crore", "50 lac", "1.5 cr", "25,00,000", "80 lakh", "", None, "1-2 crore", "10 marla"]
+PHONES = ["0300-1234567", "+92 321 7654321", "03451234567", "12345", None]
+
+
+def _row(i: int):
+    return SimpleNamespace(
+        id=f"L{i:012X}",
+        budget=random.choice(BUDGETS),
+        property_interest=f"{random.choice(['5', '10'])} marla {random.choice(['plot', 'house'])} in {random.choice(AREAS)}",
+        property_id=random.choice([None, None, None, "48012653"]),
+        context=None,
+        phone=random.choice(PHONES),
+        thread_id=None,  # engagement query nahi — pure compute
+        lead_score=0,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leads", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--db", action="store_true", help="DATABASE_URL wale DB pe full scoring run")
+    args = parser.parse_args()
+
+    if args.db:
+        from app.db.session import SessionLocal
+
+        db = SessionLocal()
+        try:
+            r = lead_scorer.run(db, full=True)
+        finally:
+            db.close()
+        print(f"DB full run: {r['scored']} leads, {r['updated']} updated, {r['seconds']}s → {r['leadsPerSecond']} leads/s")
+        return
+
+    inventory = Inventory([(a, random.randint(10, 2000), random.randint(30, 500) * 100000.0) for a in AREAS])
+    rows = [_row(i) for i in range(args.leads)]
+    best = float("inf")
+    for _ in range(args.repeat):
+        t = time.perf_counter()
+        for start in range(0, len(rows), LEAD_SCORING_BATCH_SIZE):
+            score_rows(None, rows[start:start + LEAD_SCORING_BATCH_SIZE], inventory)
+        best = min(best, time.perf_counter() - t)
+    print(f"{args.leads} leads in {best:.3f}s (best of {args.repeat}) → {args.leads / best:,.0f} leads/s")
+
+
+if __name__ == "__main__":
+    main()
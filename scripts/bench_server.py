@@ -0,0 +1,173 @@
+"""Benchmark: Passenger-style WSGI bridge (a2wsgi) vs native prefork ASGI (gunicorn.conf.py).
+Dono same worker count pe chalte hain; throughput, latency aur per-worker memory (RSS / PSS / private) report.
+
+    python scripts/bench_server.py [--workers 2] [--seconds 10] [--concurrency 16] [--path /robots.txt]
+    python scripts/bench_server.py --header "Authorization: Bearer <token>" --path /api/partner/leads
+
+Linux only (memory /proc/<pid>/smaps_rollup se). gunicorn + uvicorn installed hone chahiye.
+"""
+import argparse
+import http.client
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(port: int, path: str, timeout: float = 60) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            c = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            c.request("GET", path)
+            c.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on {port} not ready")
+
+
+def _children(pid: int) -> list[int]:
+    out = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        if ppid == pid:
+            out.append(int(entry))
+    return out
+
+
+def _memory_kb(pid: int) -> dict:
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":"):
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return {}
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def _load(port: int, path: str, headers: dict, seconds: float, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    stop = time.time() + seconds
+
+    def worker():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local = []
+        while time.time() < stop:
+            t = time.perf_counter()
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status >= 500:
+                    errors[0] += 1
+            except OSError:
+                errors[0] += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            local.append((time.perf_counter() - t) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "requests": n,
+        "rps": n / seconds,
+        "p50": latencies[n // 2] if n else 0,
+        "p99": latencies[int(n * 0.99)] if n else 0,
+        "errors": errors[0],
+    }
+
+
+def run(name: str, cmd: list[str], port: int, args, headers: dict) -> dict:
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_ready(port, args.path)
+        _load(port, args.path, headers, min(2, args.seconds), args.concurrency)  # warm-up
+        result = _load(port, args.path, headers, args.seconds, args.concurrency)
+        mems = [_memory_kb(pid) for pid in _children(proc.pid)]
+        mems = [m for m in mems if m]
+        result["workers"] = len(mems)
+        for key in ("rss", "pss", "private"):
+            result[key] = statistics.mean(m[key] for m in mems) / 1024 if mems else 0
+        result["name"] = name
+        return result
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4, help="bridge mode threads per worker (Passenger jaisa)")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--path", default="/robots.txt")
+    parser.add_argument("--header", action="append", default=[], help='"Name: value"')
+    args = parser.parse_args()
+    headers = dict(h.split(":", 1) for h in args.header)
+    headers = {k.strip(): v.strip() for k, v in headers.items()}
+
+    gunicorn = [sys.executable, "-m", "gunicorn"]
+    p1, p2 = _free_port(), _free_port()
+    results = [
+        run(
+            # -c /dev/null: cwd ka gunicorn.conf.py (preload/uvicorn) bridge mode pe na lage
+            "passenger bridge (a2wsgi, sync)",
+            gunicorn + ["-c", "/dev/null", "-w", str(args.workers), "--threads", str(args.threads), "-k", "gthread",
+                        "-b", f"127.0.0.1:{p1}", "passenger_wsgi:application"],
+            p1, args, headers,
+        ),
+        run(
+            "native ASGI prefork (preload)",
+            gunicorn + ["-c", "gunicorn.conf.py", "-w", str(args.workers), "-b", f"127.0.0.1:{p2}", "main:app"],
+            p2, args, headers,
+        ),
+    ]
+    print(f"GET {args.path}, {args.workers} workers, concurrency {args.concurrency}, {args.seconds:.0f}s")
+    print(f"{'mode':34} {'req/s':>8} {'p50 ms':>7} {'p99 ms':>7} {'err':>4} {'RSS MB':>7} {'PSS MB':>7} {'priv MB':>8}")
+    for r in results:
+        print(f"{r['name']:34} {r['rps']:8.0f} {r['p50']:7.1f} {r['p99']:7.1f} {r['errors']:4d} "
+              f"{r['rss']:7.1f} {r['pss']:7.1f} {r['private']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Property columnar store build karo (scraper run ke baad / cron). Workers `current` swap khud pakad lete hain.
+
+    python scripts/build_property_store.py
+    python scripts/build_property_store.py --bench   # store vs DB filter latency
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal
+from app.core.property_store import PropertyStore, build_store
+
+
+def _bench(store: PropertyStore, db, rounds: int = 50) -> None:
+    from app.models.property import Property
+
+    cases = [{}, {"area": store.areas[0] if store.areas else "dha"}, {"type": "house", "budget_max_lac": 500}]
+    for fc in cases:
+        t = time.perf_counter()
+        for _ in range(rounds):
+            idx = store.query(area=fc.get("area"), ptype=fc.get("type"),
+                              max_price=fc["budget_max_lac"] * 100000 if "budget_max_lac" in fc else None)
+            [store.listing(int(i)) for i in idx]
+        store_ms = (time.perf_counter() - t) * 1000 / rounds
+        q = db.query(Property)
+        if fc.get("area"):
+            q = q.filter(Property.location_name.ilike(f"%{fc['area']}%"))
+        if fc.get("type"):
+            q = q.filter(Property.type.ilike(f"%{fc['type']}%"))
+        if "budget_max_lac" in fc:
+            q = q.filter(Property.price <= fc["budget_max_lac"] * 100000)
+        t = time.perf_counter()
+        for _ in range(rounds):
+            q.order_by(Property.created_at.desc()).limit(20).all()
+        db_ms = (time.perf_counter() - t) * 1000 / rounds
+        print(f"{fc or 'no filter'}: store {store_ms:.2f} ms, db {db_ms:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", action="store_true", help="build ke baad store vs DB latency")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        t = time.perf_counter()
+        path = build_store(db)
+        store = PropertyStore(path)
+        size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        print(f"Built {path}: {len(store)} properties, {len(store.areas)} areas, "
+              f"{size / 1024:.0f} KB in {(time.perf_counter() - t) * 1000:.0f} ms")
+        if args.bench:
+            _bench(store, db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
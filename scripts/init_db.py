@@ -4,11 +4,12 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.db.session import SessionLocal, engine, Base
+from app.db.session import SessionLocal, engine
+from app.db.migrations import run_migrations
 from app.models import Admin, Agent, ScrapingSource, GeminiSettings, Lead, Property
 from app.core.security import hash_password
 
-Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 db = SessionLocal()
 
 # Default admin: admin@lpg.com / admin123
@@ -0,0 +1,40 @@
+"""Same phone ke purane duplicate leads merge karo (migration 8 ke baad ek bar, phir chahe to cron).
+
+    python scripts/merge_duplicate_leads.py               # LEAD_DEDUPE_WINDOW_HOURS window
+    python scripts/merge_duplicate_leads.py --hours 168   # window override
+    python scripts/merge_duplicate_leads.py --dry-run     # sirf ginti
+"""
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.lead_dedupe import merge_duplicates
+from app.core.lead_stream import lead_stream, publish_assigned
+from app.db.session import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, default=None, help="dedupe window (default LEAD_DEDUPE_WINDOW_HOURS)")
+    parser.add_argument("--dry-run", action="store_true", help="kuch badlo nahi, sirf duplicates gino")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = merge_duplicates(db, hours=args.hours, dry_run=args.dry_run)
+        if not args.dry_run:
+            # Partner dashboards (CACHE_BACKEND=sqlite|redis pe live workers tak) — merged lead list se hatao
+            for lead_id, agent_id in result["unassigned"]:
+                lead_stream.publish(agent_id, "unassigned", leadId=lead_id)
+            for lead_id, agent_id, _ in result["inherited"]:
+                publish_assigned(db, lead_id, agent_id)  # expiry: server ka fallback sweep pakar leta hai
+    finally:
+        db.close()
+    verb = "would merge" if args.dry_run else "merged"
+    print(f"{result['duplicates']} duplicate leads {verb} into {result['keptLeads']} leads.")
+
+
+if __name__ == "__main__":
+    main()
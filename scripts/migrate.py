@@ -0,0 +1,48 @@
+"""Schema migrations apply karo (deploy ke baad ek bar). Request path pe DDL nahi hota.
+
+    python scripts/migrate.py            # pending migrations apply
+    python scripts/migrate.py --status   # current version + missing indexes
+    python scripts/migrate.py --explain  # hot queries ka EXPLAIN — index use na ho to exit 1
+"""
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import engine
+from app.db.migrations import explain_hot_queries, pending, run_migrations, verify
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--status", action="store_true", help="sirf version + index check")
+    parser.add_argument("--explain", action="store_true", help="hot queries EXPLAIN check")
+    args = parser.parse_args()
+
+    if args.status:
+        info = verify(engine)
+        print(f"Schema version {info['version']} (latest {info['latest']}), pending: {len(pending(engine))}")
+        if info["missingIndexes"]:
+            print("Missing indexes: " + ", ".join(info["missingIndexes"]))
+            sys.exit(1)
+        return
+
+    if args.explain:
+        failed = False
+        for r in explain_hot_queries(engine):
+            mark = "OK  " if r["ok"] else "MISS"
+            print(f"{mark} {r['query']}: expected {r['expectedIndex']}, used {r['usedIndex']} — {r['plan']}")
+            failed = failed or not r["ok"]
+        sys.exit(1 if failed else 0)
+
+    version = run_migrations(engine)
+    info = verify(engine)
+    if info["missingIndexes"]:
+        print("Missing indexes after migrate: " + ", ".join(info["missingIndexes"]))
+        sys.exit(1)
+    print(f"Schema at version {version}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Cold start naapo — naya process spawn → passenger_wsgi import → pehla response (GET /robots.txt).
+Passenger process on-demand spawn karta hai, to ye time pehli user request pe lagta hai.
+
+    python scripts/profile_startup.py [--runs 5] [--target-ms 1500] [--path /robots.txt]
+
+Exit 1 agar median target se zyada ho. Har module ka import time: LPG_STARTUP_PROFILE=1 report (neeche print).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_TARGET_MS = float(os.getenv("STARTUP_TARGET_MS", "1500"))
+
+CHILD = r"""
+import io, json, sys, time
+t0 = time.perf_counter()
+from passenger_wsgi import application
+t_import = time.perf_counter()
+environ = {
+    "REQUEST_METHOD": "GET", "PATH_INFO": sys.argv[1], "QUERY_STRING": "", "SCRIPT_NAME": "",
+    "SERVER_NAME": "localhost", "SERVER_PORT": "80", "SERVER_PROTOCOL": "HTTP/1.1",
+    "REMOTE_ADDR": "127.0.0.1", "wsgi.input": io.BytesIO(b""), "wsgi.errors": sys.stderr,
+    "wsgi.url_scheme": "http", "wsgi.version": (1, 0), "wsgi.multithread": True,
+    "wsgi.multiprocess": True, "wsgi.run_once": False,
+}
+status = []
+body = b"".join(application(environ, lambda s, h, exc_info=None: status.append(s)))
+t_resp = time.perf_counter()
+from app.core import startup_profile
+print("@@" + json.dumps({
+    "importMs": (t_import - t0) * 1000,
+    "firstResponseMs": (t_resp - t_import) * 1000,
+    "status": status[0] if status else None,
+    "genaiLoaded": "google.generativeai" in sys.modules,
+    "profile": startup_profile.report(),
+}))
+"""
+
+
+def run_once(path: str) -> dict:
+    env = dict(os.environ, LPG_STARTUP_PROFILE="1", PYTHONDONTWRITEBYTECODE="0")
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, path], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    total_ms = (time.perf_counter() - start) * 1000
+    line = next(l for l in out.stdout.splitlines() if l.startswith("@@"))
+    data = json.loads(line[2:])
+    data["spawnToResponseMs"] = total_ms
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=STARTUP_TARGET_MS)
+    parser.add_argument("--path", default="/robots.txt")
+    args = parser.parse_args()
+
+    run_once(args.path)  # warm-up — .pyc files ban jayein (Passenger restart ke baad bhi hoti hain)
+    runs = [run_once(args.path) for _ in range(args.runs)]
+    total = statistics.median(r["spawnToResponseMs"] for r in runs)
+    imp = statistics.median(r["importMs"] for r in runs)
+    first = statistics.median(r["firstResponseMs"] for r in runs)
+    last = runs[-1]
+
+    print(f"status {last['status']}; google.generativeai loaded at startup: {last['genaiLoaded']}")
+    print(f"median over {args.runs} runs: spawn→response {total:.0f} ms (import main {imp:.0f} ms, first request {first:.1f} ms)")
+    for s in last["profile"]["steps"]:
+        print(f"  step {s['step']}: {s['ms']} ms")
+    print("  slowest packages (self time):")
+    for pkg, ms in list(last["profile"]["importsByPackage"].items())[:12]:
+        print(f"    {pkg:28} {ms:8.1f} ms")
+    ok = total <= args.target_ms
+    print(f"target {args.target_ms:.0f} ms: {'OK' if ok else 'OVER'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Lead scores (leads.lead_score) compute karo — cron / deploy ke baad.
+
+    python scripts/score_leads.py          # incremental (checkpoint ke baad badle leads)
+    python scripts/score_leads.py --full   # poori table (recency decay refresh — nightly)
+"""
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.lead_scoring import lead_scorer
+from app.db.session import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--full", action="store_true", help="sab leads dobara score")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        r = lead_scorer.run(db, full=args.full)
+    finally:
+        db.close()
+    print(f"{r['mode']}: {r['scored']} leads scored, {r['updated']} updated in {r['seconds']}s ({r['leadsPerSecond']} leads/s)")
+
+
+if __name__ == "__main__":
+    main()
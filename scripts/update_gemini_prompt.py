@@ -6,7 +6,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.db.session import SessionLocal
 from app.models.gemini_settings import GeminiSettings
-from app.core.ai_engine import LEAD_COLLECT_PROMPT
+from app.core.ai_engine import LEAD_COLLECT_PROMPT, invalidate_gemini_cache
+from app.core.settings_provider import settings_provider
 
 db = SessionLocal()
 settings = db.query(GeminiSettings).first()
@@ -19,4 +20,7 @@ settings.system_instructions = LEAD_COLLECT_PROMPT
 db.commit()
 db.refresh(settings)
 db.close()
+# Shared cache backend (sqlite/redis) ho to running workers bhi reload karte hain
+settings_provider.notify_changed()
+invalidate_gemini_cache()
 print("✅ Gemini prompt DB mein update ho gaya (system_instructions).")